@@ -4,15 +4,29 @@ from import_export.admin import ImportExportModelAdmin
 from tinymce.widgets import TinyMCE
 from tinymce.models import HTMLField
 from django.db import models
-from .models import Blog, Post, Tag
+from .deletion import schedule_blog_deletion
+from .models import Blog, DeletionJob, Post, Tag
 
 @admin.register(Blog)
 class BlogAdmin(admin.ModelAdmin):
     """
     Admin configuration for Blog model with user-based permissions.
     """
-    list_display = ('title', 'user')
+    list_display = ('title', 'user', 'deleted_at')
     search_fields = ('title', 'user__username')
+    actions = ['schedule_deletion', 'schedule_deletion_with_user']
+    
+    @admin.action(description='Delete in background (batches)')
+    def schedule_deletion(self, request, queryset):
+        for blog in queryset.visible():
+            schedule_blog_deletion(blog)
+        self.message_user(request, 'Deletion scheduled; run "manage.py process_deletions".')
+    
+    @admin.action(description='Delete in background, with their users')
+    def schedule_deletion_with_user(self, request, queryset):
+        for blog in queryset.visible():
+            schedule_blog_deletion(blog, delete_user=True)
+        self.message_user(request, 'Deletion scheduled; run "manage.py process_deletions".')
     
     def save_model(self, request, obj, form, change):
         # Automatically assign user to blog if creating new blog
@@ -36,7 +50,8 @@ class PostAdmin(ImportExportModelAdmin):
     list_filter = ('is_published', 'created_at', 'tags', 'blog')
     search_fields = ('title', 'content', 'excerpt')
     list_editable = ('is_published',)
-    filter_horizontal = ('tags',)
+    # Searched by name prefix as the user types, instead of listing every tag
+    autocomplete_fields = ('tags',)
     
     # Configure TinyMCE for HTML content
     formfield_overrides = {
@@ -62,9 +77,24 @@ class TagAdmin(admin.ModelAdmin):
     Admin configuration for Tag model.
     """
     list_display = ('name', 'posts_count')
-    search_fields = ('name',)
+    # Prefix search (istartswith), served by tag_name_prefix_idx on PostgreSQL;
+    # also used by the tags autocomplete of PostAdmin
+    search_fields = ('^name',)
     
     def posts_count(self, obj):
         """Display number of posts using this tag"""
         return obj.posts.count()
-    posts_count.short_description = 'Posts'
\ No newline at end of file
+    posts_count.short_description = 'Posts'
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    """
+    Admin configuration for DeletionJob model (progress of background deletions).
+    """
+    list_display = ('title', 'status', 'deleted_posts', 'total_posts', 'progress', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = [field.name for field in DeletionJob._meta.fields]
+    
+    def has_add_permission(self, request):
+        # Jobs are created by the Blog admin action or the API
+        return False
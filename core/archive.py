@@ -0,0 +1,99 @@
+# core/archive.py
+"""
+Monthly archive of published posts.
+
+PostArchiveMonth holds, per blog, the number of published posts of each
+month of publication (in the current time zone, as ExtractYear/ExtractMonth
+use). The post signals move a post between months when it is published,
+unpublished, re-dated, moved to another blog or deleted, with a single
+UPDATE per affected month, so the archive of a blog is an indexed read of
+its few rows. The site-wide archive adds those rows up and is cached until a
+count changes. ``rebuild_archive`` recomputes the table from the posts.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .cache import bump_version, single_flight
+from .models import Blog, Post, PostArchiveMonth
+
+
+def archive_key(blog_id, is_published, published_at):
+    """(blog_id, year, month) a post is counted under, or None."""
+    if not is_published or published_at is None:
+        return None
+    local = timezone.localtime(published_at)
+    return blog_id, local.year, local.month
+
+
+def move_post(old_key, new_key):
+    """Move one post between archive months (None: not counted)."""
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        blog_id, year, month = old_key
+        PostArchiveMonth.objects.filter(blog_id=blog_id, year=year, month=month, count__gt=0).update(
+            count=F('count') - 1
+        )
+    if new_key is not None:
+        blog_id, year, month = new_key
+        rows = PostArchiveMonth.objects.filter(blog_id=blog_id, year=year, month=month)
+        if not rows.update(count=F('count') + 1):
+            try:
+                with transaction.atomic():
+                    PostArchiveMonth.objects.create(blog_id=blog_id, year=year, month=month, count=1)
+            except IntegrityError:
+                # Created by a concurrent publication in the meantime
+                rows.update(count=F('count') + 1)
+    transaction.on_commit(lambda: bump_version('posts:archive'))
+
+
+def group_by_year(rows):
+    """[(year, month, count)] newest first -> [{year, count, months}]."""
+    years = []
+    for year, month, count in rows:
+        if not years or years[-1]['year'] != year:
+            years.append({'year': year, 'count': 0, 'months': []})
+        years[-1]['count'] += count
+        years[-1]['months'].append({'month': month, 'count': count})
+    return years
+
+
+def blog_archive(blog_id):
+    """Archive of one blog, read from its rollup rows."""
+    rows = (
+        PostArchiveMonth.objects.filter(blog_id=blog_id, count__gt=0)
+        .order_by('-year', '-month').values_list('year', 'month', 'count')
+    )
+    return group_by_year(rows)
+
+
+def site_archive():
+    """Archive of every visible blog, cached until a count changes."""
+    def compute():
+        rows = (
+            PostArchiveMonth.objects.filter(count__gt=0)
+            .exclude(blog__in=Blog.objects.filter(deleted_at__isnull=False).values('pk'))
+            .values('year', 'month').annotate(total=Sum('count'))
+            .order_by('-year', '-month').values_list('year', 'month', 'total')
+        )
+        return group_by_year(rows)
+
+    return single_flight('posts:archive', compute, ['posts:archive'], timeout=settings.ARCHIVE_CACHE_TIMEOUT)
+
+
+def rebuild_archive():
+    """Recompute every rollup row from the posts. Returns the number of rows."""
+    rows = (
+        Post.objects.filter(is_published=True, published_at__isnull=False)
+        .annotate(year=ExtractYear('published_at'), month=ExtractMonth('published_at'))
+        .values('blog_id', 'year', 'month').annotate(count=Count('pk')).order_by()
+    )
+    months = [PostArchiveMonth(**row) for row in rows]
+    with transaction.atomic():
+        PostArchiveMonth.objects.all().delete()
+        PostArchiveMonth.objects.bulk_create(months, batch_size=1000)
+        transaction.on_commit(lambda: bump_version('posts:archive'))
+    return len(months)
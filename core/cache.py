@@ -0,0 +1,116 @@
+# core/cache.py
+"""
+Cache helpers shared by the views.
+
+Invalidation is done with version counters: cached entries embed the
+current version of their namespace in the key, and bumping the version
+makes every older entry unreachable without having to enumerate them.
+
+Expensive entries go through single_flight() instead, which keeps the
+version inside the cached value so an outdated copy can still be served
+while a single worker recomputes it.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from .metrics import record_cache
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(namespace):
+    """Return the current version of a cache namespace."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Start from a timestamp so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+def get_version_map(namespaces):
+    """Return {namespace: version} reading all the counters in one round trip."""
+    keys = {_version_key(namespace): namespace for namespace in namespaces}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    for namespace in keys.values():
+        if namespace not in versions:
+            versions[namespace] = get_version(namespace)
+    return versions
+
+
+def get_versions(namespaces):
+    """Return a key fragment combining the versions of several namespaces."""
+    return '.'.join(str(get_version(namespace)) for namespace in namespaces)
+
+
+def bump_version(*namespaces):
+    """Invalidate every entry cached under the given namespaces."""
+    for namespace in namespaces:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            cache.set(_version_key(namespace), time.time_ns(), timeout=None)
+
+
+def single_flight(key, compute, namespaces, timeout, stale_timeout=None, lock_timeout=30, wait=5, beta=1.0):
+    """
+    Return compute() cached under `key`, recomputing it in one worker at a
+    time (per cache: per process with LocMemCache, global with a shared
+    backend).
+
+    The entry records the namespace versions and the time compute() took.
+    It is refreshed when a version was bumped, after `timeout` seconds, or
+    earlier with a probability that grows as expiry approaches (XFetch).
+    The worker that wins the cache.add() lock recomputes; the others serve
+    the outdated value, which is kept `stale_timeout` seconds longer, or
+    wait up to `wait` seconds for a fresh one when there is none.
+    """
+    version = get_versions(namespaces)
+    entry = cache.get(key)
+    if entry is not None and entry['version'] == version:
+        # XFetch: -log(random()) is exponentially distributed, so the slower
+        # compute() is, the earlier some request refreshes ahead of expiry
+        early = entry['delta'] * beta * -math.log(1.0 - random.random())
+        if time.time() + early < entry['expires']:
+            record_cache('single_flight', hits=1)
+            return entry['value']
+
+    lock_key = f'lock:{key}'
+    if cache.add(lock_key, True, timeout=lock_timeout):
+        record_cache('single_flight', misses=1)
+        try:
+            return _compute_and_store(key, compute, version, timeout, stale_timeout)
+        finally:
+            cache.delete(lock_key)
+    if entry is not None:
+        record_cache('single_flight', stale=1)
+        return entry['value']
+    record_cache('single_flight', misses=1)
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None and entry['version'] == version:
+            return entry['value']
+    # The lock holder is too slow (or died): do not keep the client waiting
+    return _compute_and_store(key, compute, version, timeout, stale_timeout)
+
+
+def _compute_and_store(key, compute, version, timeout, stale_timeout):
+    started = time.monotonic()
+    value = compute()
+    entry = {
+        'value': value,
+        'version': version,
+        'expires': time.time() + timeout,
+        'delta': time.monotonic() - started,
+    }
+    cache.set(key, entry, timeout + (timeout if stale_timeout is None else stale_timeout))
+    return value
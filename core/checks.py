@@ -0,0 +1,27 @@
+# core/checks.py
+"""
+System checks for the deployment settings.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    The cache holds the version counters every worker reads to see
+    invalidations, so a per-process cache with several workers serves stale
+    posts, feeds and listings until their timeout.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    # Test runs are a single process whatever the deployment says
+    if backend == LOCMEM_BACKEND and settings.WEB_CONCURRENCY > 1 and not settings.TESTING:
+        return [Warning(
+            f'The cache is local to each process but WEB_CONCURRENCY is {settings.WEB_CONCURRENCY}: '
+            'invalidations made by one worker will not reach the others.',
+            hint='Set REDIS_URL or CACHE_BACKEND=db, or run a single worker (WEB_CONCURRENCY=1).',
+            id='core.W001',
+        )]
+    return []
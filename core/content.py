@@ -0,0 +1,135 @@
+# core/content.py
+"""
+Content processing for Post bodies.
+
+TinyMCE stores raw HTML in ``Post.content``. On save it is run once through
+``render_content`` which returns a sanitized HTML version (allowlisted tags
+and attributes only), a plain-text version, and the word count, so the API
+can serve them without re-parsing or exposing unsafe markup.
+"""
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'caption', 'code', 'div', 'em', 'figcaption',
+    'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol',
+    'p', 'pre', 's', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto'}
+# Elements dropped together with everything inside them
+DROPPED_TAGS = {'script', 'style', 'template', 'iframe', 'object', 'embed', 'noscript', 'textarea'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Elements implicitly closed by a sibling of the same type (<li>a<li>b)
+SELF_CLOSING_SIBLINGS = {'li', 'p', 'tr', 'td', 'th'}
+BLOCK_TAGS = {
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'figure', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'li', 'p', 'pre', 'tr',
+}
+
+SUMMARY_WORDS = 50
+WORDS_PER_MINUTE = 200
+
+_URL_SCHEME = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+_CONTROL_CHARS = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def _is_safe_url(url):
+    match = _URL_SCHEME.match(_CONTROL_CHARS.sub('', url))
+    return match is None or match.group(1).lower() in ALLOWED_URL_SCHEMES
+
+
+class _ContentParser(HTMLParser):
+    """Single pass producing sanitized HTML and plain text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        if tag in SELF_CLOSING_SIBLINGS and self.open_tags and self.open_tags[-1] == tag:
+            self.html.append(f'</{self.open_tags.pop()}>')
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = ''.join(
+            f' {name}="{escape(value, quote=True)}"'
+            for name, value in attrs
+            if name in allowed and value is not None
+            and (name not in URL_ATTRIBUTES or _is_safe_url(value))
+        )
+        self.html.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in self.open_tags:
+            return
+        # Close anything left open inside this element
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+
+
+def render_content(html):
+    """
+    Return ``(sanitized_html, plain_text, word_count)`` for an HTML body.
+    """
+    parser = _ContentParser()
+    parser.feed(html or '')
+    parser.close()
+    lines = (' '.join(line.split()) for line in ''.join(parser.text).splitlines())
+    text = '\n'.join(line for line in lines if line)
+    return ''.join(parser.html), text, len(text.split())
+
+
+def make_summary(text, words=SUMMARY_WORDS):
+    """Truncate plain text to a number of words."""
+    parts = text.split()
+    if len(parts) <= words:
+        return ' '.join(parts)
+    return ' '.join(parts[:words]) + '…'
+
+
+def reading_time(word_count):
+    """Estimated reading time in minutes."""
+    return math.ceil(word_count / WORDS_PER_MINUTE)
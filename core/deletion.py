@@ -0,0 +1,87 @@
+# core/deletion.py
+"""
+Asynchronous deletion of blogs and their users.
+
+Deleting a blog through the ORM makes the collector load every post and
+delete them (and their tag rows) in one long transaction. For large blogs
+the deletion can be queued instead (DELETE /api/blogs/{id}/?background=true
+or the admin actions): the blog is hidden right away and a DeletionJob is
+created; the ``process_deletions`` command (run periodically, or as a
+worker with --interval) then deletes posts in bounded batches, each in its
+own short transaction, and finally the blog (and user) themselves.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Blog, CoverBlob, DeletionJob, Post
+from .signals import invalidate_post_feeds
+
+
+def schedule_blog_deletion(blog, delete_user=False):
+    """Hide the blog now and queue its deletion. Returns the job."""
+    with transaction.atomic():
+        blog.deleted_at = timezone.now()
+        blog.save(update_fields=['deleted_at'])
+        if delete_user:
+            # Inactive users cannot authenticate (tokens included)
+            User.objects.filter(pk=blog.user_id).update(is_active=False)
+        tag_ids = set(
+            Post.tags.through.objects.filter(post__blog=blog).values_list('tag_id', flat=True).distinct()
+        )
+        # Its posts disappear from the site, blog and tag feeds
+        invalidate_post_feeds([blog.pk], tag_ids)
+        return DeletionJob.objects.create(
+            blog_id=blog.pk,
+            user_id=blog.user_id if delete_user else None,
+            owner_id=blog.user_id,
+            title=blog.title,
+            total_posts=blog.posts.count(),
+        )
+
+
+def run_deletion_job(job, batch_size=500, progress=None):
+    """
+    Delete the job's posts `batch_size` at a time, then the blog and, if
+    requested, the user. Safe to re-run after an interruption.
+    """
+    job.status = DeletionJob.RUNNING
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+    try:
+        while True:
+            ids = list(Post.objects.filter(blog_id=job.blog_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            covers = set(
+                Post.objects.filter(pk__in=ids).exclude(cover='').exclude(cover__isnull=True)
+                .values_list('cover', flat=True)
+            )
+            with transaction.atomic():
+                tag_rows = Post.tags.through.objects.filter(post_id__in=ids)
+                tag_ids = set(tag_rows.values_list('tag_id', flat=True))
+                # Tag rows first, in one statement, so the collector has no M2M to cascade
+                tag_rows.delete()
+                # Per-post signals still run: tombstones, cover counts, cache invalidation
+                Post.objects.filter(pk__in=ids).delete()
+                # pre_delete found no tag rows left: invalidate the tag feeds here
+                invalidate_post_feeds([job.blog_id], tag_ids)
+                job.deleted_posts += len(ids)
+                job.save(update_fields=['deleted_posts'])
+            job.deleted_covers += sum(CoverBlob.delete_if_unreferenced(name) for name in covers)
+            job.save(update_fields=['deleted_covers'])
+            if progress:
+                progress(job)
+
+        with transaction.atomic():
+            Blog.objects.filter(pk=job.blog_id).delete()
+            if job.user_id:
+                User.objects.filter(pk=job.user_id).delete()
+            job.status = DeletionJob.DONE
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'finished_at'])
+    except Exception as exc:
+        job.status = DeletionJob.FAILED
+        job.error = repr(exc)
+        job.save(update_fields=['status', 'error'])
+        raise
@@ -0,0 +1,216 @@
+# core/feeds.py
+"""
+RSS, Atom and JSON Feed output for published posts.
+
+Feeds are generated once per (scope, format) and kept in the cache until a
+post, blog or tag in their scope changes (see core/signals.py), so polling
+readers are served from memory or with a 304.
+"""
+import hashlib
+import json
+import mimetypes
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Enclosure, Rss201rev2Feed, SyndicationFeed
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_versions
+from .metrics import record_cache
+from .models import Blog, Post, Tag
+
+
+class ContentRssFeed(Rss201rev2Feed):
+    """RSS 2.0 with the full HTML body in <content:encoded>."""
+
+    def rss_attributes(self):
+        attrs = super().rss_attributes()
+        attrs['xmlns:content'] = 'http://purl.org/rss/1.0/modules/content/'
+        return attrs
+
+    def add_item_elements(self, handler, item):
+        super().add_item_elements(handler, item)
+        if item.get('content'):
+            handler.addQuickElement('content:encoded', item['content'])
+
+
+class ContentAtomFeed(Atom1Feed):
+    """Atom 1.0 with the full HTML body in <content>."""
+
+    def add_item_elements(self, handler, item):
+        super().add_item_elements(handler, item)
+        if item.get('content'):
+            handler.addQuickElement('content', item['content'], {'type': 'html'})
+
+
+class JSONFeed(SyndicationFeed):
+    """JSON Feed 1.1 (https://jsonfeed.org/version/1.1)."""
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        feed = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'items': [self.item_as_json(item) for item in self.items],
+        }
+        outfile.write(json.dumps(feed, ensure_ascii=False))
+
+    def item_as_json(self, item):
+        data = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_html': item.get('content') or '',
+            'summary': item['description'],
+            'tags': list(item['categories']),
+        }
+        if item.get('image'):
+            data['image'] = item['image']
+        if item['author_name']:
+            data['authors'] = [{'name': item['author_name']}]
+        if item['pubdate']:
+            data['date_published'] = item['pubdate'].isoformat()
+        if item['updateddate']:
+            data['date_modified'] = item['updateddate'].isoformat()
+        return data
+
+
+FEED_TYPES = {
+    'rss': ContentRssFeed,
+    'atom': ContentAtomFeed,
+    'json': JSONFeed,
+}
+
+
+def latest_published_posts(obj=None):
+    """
+    Latest published posts of a scope, bounded to FEED_MAX_ITEMS.
+    Answered by the published-feed, per-blog and tag indexes.
+    """
+    posts = Post.objects.visible().filter(is_published=True)
+    if isinstance(obj, Blog):
+        posts = posts.filter(blog=obj)
+    elif isinstance(obj, Tag):
+        posts = posts.filter(tags=obj)
+    return (
+        posts.defer('content', 'content_text')
+        .select_related('blog__user')
+        .prefetch_related('tags')
+        .order_by('-published_at', '-created_at')[:settings.FEED_MAX_ITEMS]
+    )
+
+
+class PostFeed(Feed):
+    """
+    Published posts of the whole site, a blog (Blog) or a tag (Tag).
+    Instantiated per request, so it can keep the request around.
+    """
+
+    def __init__(self, feed_type, request):
+        self.feed_type = feed_type
+        self.request = request
+
+    def title(self, obj):
+        if isinstance(obj, Blog):
+            return obj.title
+        if isinstance(obj, Tag):
+            return f'Posts tagged "{obj.name}"'
+        return settings.SPECTACULAR_SETTINGS['TITLE']
+
+    def link(self, obj):
+        return f'/{settings.PUBLIC_SITE_PREFIX}'
+
+    def description(self, obj):
+        if isinstance(obj, Blog):
+            return obj.bio
+        return self.title(obj)
+
+    def items(self, obj):
+        return latest_published_posts(obj)
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.summary
+
+    def item_pubdate(self, item):
+        return item.published_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.blog.user.username
+
+    def item_categories(self, item):
+        return [tag.name for tag in item.tags.all()]
+
+    def item_enclosures(self, item):
+        if not item.cover:
+            return []
+        try:
+            length = str(item.cover.size)
+        except OSError:
+            length = '0'
+        mime_type = mimetypes.guess_type(item.cover.name)[0] or 'application/octet-stream'
+        return [Enclosure(self.request.build_absolute_uri(item.cover.url), length, mime_type)]
+
+    def item_extra_kwargs(self, item):
+        return {
+            'content': item.content_html,
+            'image': self.request.build_absolute_uri(item.cover.url) if item.cover else None,
+        }
+
+
+def feed_namespaces(obj=None):
+    """Cache version namespaces a feed depends on."""
+    if isinstance(obj, Blog):
+        return [f'feed:blog:{obj.pk}']
+    if isinstance(obj, Tag):
+        return [f'feed:tag:{obj.pk}']
+    return ['feed:site']
+
+
+def post_feed(request, feed_format, blog_pk=None, tag_name=None):
+    """
+    Serve a cached feed, answering If-Modified-Since / If-None-Match with 304.
+    """
+    if feed_format not in FEED_TYPES:
+        raise Http404('Unknown feed format')
+    obj = None
+    if blog_pk is not None:
+        obj = get_object_or_404(Blog.objects.visible(), pk=blog_pk)
+    elif tag_name is not None:
+        obj = get_object_or_404(Tag, name=tag_name)
+
+    scope = feed_namespaces(obj)[0]
+    key = f'{scope}:{feed_format}:{request.get_host()}:{get_versions(feed_namespaces(obj))}'
+    cached = cache.get(key)
+    record_cache('feed', hits=cached is not None, misses=cached is None)
+    if cached is None:
+        feedgen = PostFeed(FEED_TYPES[feed_format], request).get_feed(obj, request)
+        response = HttpResponse(content_type=feedgen.content_type)
+        feedgen.write(response, 'utf-8')
+        cached = {
+            'content': response.content,
+            'content_type': feedgen.content_type,
+            'last_modified': int(feedgen.latest_post_date().timestamp()),
+        }
+        cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+
+    etag = quote_etag(hashlib.md5(f'{key}:{cached["last_modified"]}'.encode()).hexdigest())
+    response = get_conditional_response(request, etag=etag, last_modified=cached['last_modified'])
+    if response is None:
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(cached['last_modified'])
+    patch_cache_control(response, public=True, max_age=settings.FEED_MAX_AGE)
+    return response
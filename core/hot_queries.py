@@ -0,0 +1,61 @@
+"""
+Registry of the hot read queries served by the API.
+
+Each entry builds the queryset exactly as the views do, so the
+``explain_hot_queries`` management command can check that every one of
+them is answered from an index instead of a sequential scan.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Post
+
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    """Register a queryset factory under ``name``."""
+    def decorator(func):
+        HOT_QUERIES[name] = func
+        return func
+    return decorator
+
+
+@hot_query('published_feed')
+def published_feed(sample):
+    return Post.objects.visible().filter(is_published=True).order_by('-published_at', '-created_at')[:20]
+
+
+@hot_query('blog_feed')
+def blog_feed(sample):
+    return Post.objects.visible().filter(blog_id=sample['blog_id']).order_by('-published_at', '-created_at')[:20]
+
+
+@hot_query('tag_posts')
+def tag_posts(sample):
+    return Post.objects.visible().filter(tags__id=sample['tag_id'])
+
+
+@hot_query('post_by_slug')
+def post_by_slug(sample):
+    return Post.objects.filter(slug=sample['slug'])
+
+
+@hot_query('blog_posts')
+def blog_posts(sample):
+    return Post.objects.visible().filter(blog_id=sample['blog_id']).order_by('-created_at', '-id')[:21]
+
+
+@hot_query('blog_published_posts')
+def blog_published_posts(sample):
+    return (
+        Post.objects.visible().filter(blog_id=sample['blog_id'], is_published=True)
+        .order_by('-published_at', '-created_at', '-id')[:21]
+    )
+
+
+@hot_query('post_changes')
+def post_changes(sample):
+    since = timezone.now() - timedelta(days=1)
+    return Post.objects.visible().filter(updated_at__gt=since).order_by('updated_at', 'id')[:101]
@@ -0,0 +1,50 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.pages import published_posts
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the public pages (rendered pages per second in this process, queries each).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help='Renders of each page.')
+
+    def handle(self, *args, **options):
+        post = published_posts().first()
+        if post is None:
+            raise CommandError('There are no published posts to render.')
+        tag = post.tags.first()
+        pages = {
+            'home': reverse('post_list'),
+            'blog': reverse('blog_page', args=[post.blog_id]),
+            'post': post.get_absolute_url(),
+        }
+        if tag:
+            pages['tag'] = reverse('tag_page', args=[tag.name])
+
+        client = Client()
+        count = options['count']
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for name, url in pages.items():
+                # Cold: empty cache before every render; warm: fragments and objects cached
+                for mode in ('cold', 'warm'):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        for _ in range(count):
+                            if mode == 'cold':
+                                cache.clear()
+                            response = client.get(url)
+                            if response.status_code != 200:
+                                raise CommandError(f'{url} returned {response.status_code}')
+                        elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'{name:5} {mode}: {count / elapsed:7.1f} pages/s, '
+                        f'{elapsed / count * 1000:6.2f} ms each, {len(queries) / count:.1f} queries each'
+                    )
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark users once they are measured."""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark POST /api/users/register/ (registrations per second, queries each).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50, help='Registrations to perform.')
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Use MD5 password hashing to measure the database work alone.',
+        )
+
+    def handle(self, *args, **options):
+        overrides = {'ALLOWED_HOSTS': ['testserver']}
+        if options['fast_hasher']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        client = APIClient()
+        count = options['count']
+        prefix = f'bench{time.time_ns()}'
+        try:
+            # Everything is rolled back: the benchmark leaves no users behind
+            with override_settings(**overrides), transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for i in range(count):
+                        response = client.post('/api/users/register/', {
+                            'username': f'{prefix}_{i}',
+                            'email': f'{prefix}_{i}@example.com',
+                            'password': 'benchmark-pass-123',
+                            'password_confirm': 'benchmark-pass-123',
+                        })
+                        if response.status_code != 201:
+                            self.stderr.write(f'Registration failed: {response.data}')
+                            break
+                    elapsed = time.perf_counter() - started
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(
+            f'{count} registrations in {elapsed:.2f}s: {count / elapsed:.1f} registrations/s, '
+            f'{len(queries) / count:.1f} queries each'
+        )
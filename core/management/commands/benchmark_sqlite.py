@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SCHEMA = """
+CREATE TABLE bench_post (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def connect(path, tuned):
+    """Open a connection the way Django does for the given mode."""
+    if not tuned:
+        # Django defaults: rollback journal, deferred transactions, 5s timeout
+        return sqlite3.connect(path, timeout=5, isolation_level=None), 'DEFERRED'
+    options = settings.SQLITE_OPTIONS
+    connection = sqlite3.connect(path, timeout=options['timeout'], isolation_level=None)
+    for pragma in options['init_command'].split(';'):
+        connection.execute(pragma)
+    return connection, options['transaction_mode']
+
+
+def worker(path, tuned, duration, write_ratio, rows, results):
+    connection, transaction_mode = connect(path, tuned)
+    reads = writes = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            if random.random() < write_ratio:
+                # Read-modify-write, as a Django view saving a model in atomic()
+                connection.execute(f'BEGIN {transaction_mode}')
+                pk = random.randint(1, rows)
+                (views,) = connection.execute('SELECT views FROM bench_post WHERE id = ?', (pk,)).fetchone()
+                connection.execute('UPDATE bench_post SET views = ? WHERE id = ?', (views + 1, pk))
+                connection.execute('COMMIT')
+                writes += 1
+            else:
+                start = random.randint(1, rows)
+                connection.execute(
+                    'SELECT id, title, body FROM bench_post WHERE id >= ? ORDER BY id LIMIT 20', (start,)
+                ).fetchall()
+                reads += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+    connection.close()
+    results.put((reads, writes, errors))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark mixed read/write throughput of SQLite across worker processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=3, help='Processes (gunicorn workers).')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per run.')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Share of write transactions.')
+        parser.add_argument('--rows', type=int, default=5000, help='Rows in the benchmark table.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['workers']} workers, {options['duration']}s, "
+            f"{options['write_ratio']:.0%} writes, {options['rows']} rows"
+        )
+        for label, tuned in (('default', False), ('tuned', True)):
+            reads, writes, errors = self.run(tuned, options)
+            self.stdout.write(
+                f'{label:>8}: {reads / options["duration"]:10.0f} reads/s '
+                f'{writes / options["duration"]:8.0f} writes/s '
+                f'{errors:6d} "database is locked" errors'
+            )
+
+    def run(self, tuned, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            connection, _ = connect(path, tuned)
+            connection.execute(SCHEMA)
+            connection.executemany(
+                'INSERT INTO bench_post (title, body) VALUES (?, ?)',
+                ((f'Post {i}', 'x' * 2000) for i in range(options['rows']))
+            )
+            connection.close()
+
+            results = multiprocessing.Queue()
+            processes = [
+                multiprocessing.Process(
+                    target=worker,
+                    args=(path, tuned, options['duration'], options['write_ratio'], options['rows'], results),
+                )
+                for _ in range(options['workers'])
+            ]
+            for process in processes:
+                process.start()
+            totals = [sum(values) for values in zip(*(results.get() for _ in processes))]
+            for process in processes:
+                process.join()
+            return totals
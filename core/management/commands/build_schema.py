@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.schema import RENDERERS, code_version, render_schema, write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema for the current code version into OPENAPI_SCHEMA_DIR.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep-old', action='store_true',
+            help='Do not delete schema files generated for other code versions.',
+        )
+
+    def handle(self, *args, **options):
+        version = code_version()
+        for fmt in RENDERERS:
+            started = time.perf_counter()
+            path = write_schema(fmt, render_schema(fmt))
+            self.stdout.write(f'{path} ({path.stat().st_size} bytes, {time.perf_counter() - started:.2f}s)')
+            if not options['keep_old']:
+                for old in path.parent.glob(f'openapi-*.{fmt}'):
+                    if old != path:
+                        old.unlink()
+        self.stdout.write(self.style.SUCCESS(f'Schema built for code version {version}'))
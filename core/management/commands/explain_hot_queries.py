@@ -0,0 +1,101 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.hot_queries import HOT_QUERIES
+from core.models import Blog, Post, Tag
+
+# "SCAN core_post" without "USING ... INDEX" is a full table scan in SQLite
+SQLITE_SEQ_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)')
+POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded dataset once the plans are checked."""
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on every registered hot query and fail on sequential scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Seed this many posts (rolled back afterwards) before explaining.',
+        )
+        parser.add_argument(
+            '--query', action='append', dest='queries',
+            help='Only explain the given hot query (can be repeated).',
+        )
+
+    def handle(self, *args, **options):
+        names = options['queries'] or sorted(HOT_QUERIES)
+        unknown = set(names) - set(HOT_QUERIES)
+        if unknown:
+            raise CommandError(f"Unknown hot queries: {', '.join(sorted(unknown))}")
+
+        failures = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.seed(options['seed'])
+                sample = self.get_sample()
+                for name in names:
+                    plan = HOT_QUERIES[name](sample).explain()
+                    scanned = self.sequential_scans(plan)
+                    if scanned:
+                        failures.append(name)
+                        self.stdout.write(self.style.ERROR(f"{name}: sequential scan on {', '.join(scanned)}"))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+                    if options['verbosity'] > 1:
+                        self.stdout.write(plan)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Sequential scans in: {', '.join(failures)}")
+
+    def sequential_scans(self, plan):
+        if connection.vendor == 'postgresql':
+            return POSTGRES_SEQ_SCAN.findall(plan)
+        if connection.vendor == 'sqlite':
+            return [table for table in SQLITE_SEQ_SCAN.findall(plan) if table != 'CONSTANT']
+        raise CommandError(f'EXPLAIN checks are not supported on {connection.vendor}')
+
+    def get_sample(self):
+        post = Post.objects.order_by('pk').first()
+        tag = Tag.objects.order_by('pk').first()
+        return {
+            'blog_id': post.blog_id if post else 0,
+            'tag_id': tag.pk if tag else 0,
+            'slug': post.slug if post else '',
+        }
+
+    def seed(self, count):
+        """Create a dataset large enough for the planner to prefer indexes."""
+        blogs = []
+        for i in range(max(count // 100, 1)):
+            user = User.objects.create(username=f'explain-seed-{i}')
+            blogs.append(Blog.objects.create(user=user, title=f'Seed blog {i}'))
+        tags = Tag.objects.bulk_create([Tag(name=f'explain-seed-{i}') for i in range(50)])
+        posts = Post.objects.bulk_create([
+            Post(
+                blog=blogs[i % len(blogs)],
+                title=f'Seed post {i}',
+                slug=f'explain-seed-{i}',
+                content='<p>Seed</p>',
+                is_published=i % 3 != 0,
+            )
+            for i in range(count)
+        ])
+        Through = Post.tags.through
+        Through.objects.bulk_create([
+            Through(post_id=post.pk, tag_id=tags[(post.pk + offset) % len(tags)].pk)
+            for post in posts
+            for offset in range(3)
+        ], ignore_conflicts=True)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,72 @@
+import os
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from core.models import CoverBlob, Post
+from core.storage import is_content_addressed, modified_within
+
+
+class Command(BaseCommand):
+    help = 'Recount cover references and delete content-addressed covers no post uses.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=CoverBlob.GRACE_SECONDS // 60,
+            help='Keep unreferenced files written or reused more recently than this (uploads still being saved).',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted.')
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('cover').storage
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+        dry_run = options['dry_run']
+
+        # The Post table is authoritative: fix any drift in the counters first
+        counts = {
+            row['cover']: row['refs']
+            for row in Post.objects.exclude(cover='').exclude(cover__isnull=True)
+            .values('cover').annotate(refs=Count('id'))
+        }
+        fixed = 0
+        for blob in CoverBlob.objects.iterator():
+            refs = counts.pop(blob.name, 0)
+            if blob.ref_count != refs:
+                fixed += 1
+                if not dry_run:
+                    CoverBlob.objects.filter(pk=blob.pk).update(ref_count=refs, updated_at=timezone.now())
+        if not dry_run:
+            CoverBlob.objects.bulk_create([CoverBlob(name=name, ref_count=refs) for name, refs in counts.items()])
+
+        grace_seconds = options['grace_minutes'] * 60
+        deleted = 0
+        for blob in CoverBlob.objects.filter(ref_count=0, updated_at__lt=cutoff).iterator():
+            if modified_within(storage, blob.name, grace_seconds):
+                continue  # Reused by an upload whose post is not saved yet
+            self.stdout.write(f'Deleting {blob.name}')
+            if dry_run:
+                deleted += 1
+                continue
+            # Only remove the file if nothing referenced it in the meantime
+            if CoverBlob.delete_if_unreferenced(blob.name, grace_seconds):
+                deleted += 1
+
+        # Files on disk that never got a reference (e.g. abandoned uploads)
+        known = set(CoverBlob.objects.values_list('name', flat=True))
+        upload_to = Post._meta.get_field('cover').upload_to.rstrip('/')
+        root = storage.path(upload_to)
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                stale = os.path.getmtime(path) < time.time() - options['grace_minutes'] * 60
+                if stale and name not in known and (is_content_addressed(name) or filename.startswith('.upload-')):
+                    self.stdout.write(f'Deleting unreferenced {name}')
+                    if not dry_run:
+                        os.remove(path)
+                    deleted += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{fixed} counters fixed, {deleted} files deleted'))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.deletion import run_deletion_job
+from core.models import DeletionJob
+
+
+class Command(BaseCommand):
+    help = 'Run queued blog/user deletions, deleting posts in bounded batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Posts deleted per transaction.')
+        parser.add_argument('--job', type=int, action='append', dest='jobs', help='Only run this job id.')
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running, looking for queued jobs every this many seconds (for a worker process).',
+        )
+
+    def handle(self, *args, **options):
+        self.run_jobs(options)
+        while options['interval'] > 0:
+            time.sleep(options['interval'])
+            close_old_connections()
+            self.run_jobs(options)
+
+    def run_jobs(self, options):
+        # Running and failed jobs are resumed: each batch is committed on its own
+        jobs = DeletionJob.objects.exclude(status=DeletionJob.DONE)
+        if options['jobs']:
+            jobs = jobs.filter(pk__in=options['jobs'])
+        for job in jobs:
+            self.stdout.write(f'Deleting {job.title} ({job.total_posts} posts)')
+            try:
+                run_deletion_job(
+                    job,
+                    batch_size=options['batch_size'],
+                    progress=lambda job: self.stdout.write(f'  {job.deleted_posts}/{job.total_posts} posts'),
+                )
+            except Exception as exc:
+                if not options['interval']:
+                    raise
+                # A worker keeps going: the failed job is retried on the next round
+                self.stderr.write(f'Failed {job.title}: {exc!r}')
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'Deleted {job.title}: {job.deleted_posts} posts, {job.deleted_covers} cover files'
+            ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.models import PostTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete post tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS.'
+
+    def handle(self, *args, **options):
+        deleted = PostTombstone.prune()
+        self.stdout.write(self.style.SUCCESS(f'{deleted} tombstones deleted'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.archive import rebuild_archive
+
+
+class Command(BaseCommand):
+    help = 'Recompute the monthly archive counts of every blog from the published posts.'
+
+    def handle(self, *args, **options):
+        months = rebuild_archive()
+        self.stdout.write(self.style.SUCCESS(f'{months} archive months rebuilt'))
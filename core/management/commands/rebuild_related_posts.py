@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from core.models import Post
+from core.related import refresh_related
+
+# Refreshing a list marks the posts that entered or left it stale; a few
+# passes are enough for the changes to settle
+MAX_PASSES = 10
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related posts that are stale or were never computed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Recompute every post, not only stale ones.')
+
+    def handle(self, *args, **options):
+        refreshed = 0
+        for _ in range(1 if options['all'] else MAX_PASSES):
+            posts = Post.objects.only('pk').order_by('pk')
+            if not options['all']:
+                posts = posts.filter(Q(relations__isnull=True) | Q(relations__stale=True))
+            count = 0
+            for post in posts.iterator():
+                refresh_related(post)
+                count += 1
+            refreshed += count
+            if not count:
+                break
+        self.stdout.write(self.style.SUCCESS(f'{refreshed} related post lists recomputed'))
@@ -0,0 +1,141 @@
+# core/metrics.py
+"""
+Prometheus metrics.
+
+Request counts and latencies per view, database queries, cache hits and
+authentication failures are recorded with prometheus_client. Under
+gunicorn (see gunicorn.conf.py) ``PROMETHEUS_MULTIPROC_DIR`` is set and every
+worker writes its samples to memory-mapped files in that directory, so
+``/metrics`` reports the totals of all workers whichever one serves it.
+Recording a sample is an in-memory (or mmap) update with no I/O or locking
+across processes.
+"""
+import ipaddress
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework.views import exception_handler as drf_exception_handler
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by view, method and status code.',
+    ['view', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time spent serving requests, by view.',
+    ['view'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request, by view.',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Database query duration, by connection alias.',
+    ['alias'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Application cache lookups by cache and result (hit, miss, stale).',
+    ['cache', 'result'],
+)
+AUTH_FAILURES = Counter(
+    'auth_failures_total', 'Failed authentications, by reason.',
+    ['reason'],
+)
+# One series per live worker: the multiprocess collector adds a pid label
+WORKER_STARTED = Gauge(
+    'worker_start_time_seconds', 'Start time of the worker process.',
+    multiprocess_mode='liveall',
+)
+WORKER_STARTED.set(time.time())
+# Anything else is recorded as 'other': the method is client input and
+# every distinct label value would be a new time series
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'}
+
+
+def record_cache(cache, hits=0, misses=0, stale=0):
+    """Count application cache lookups."""
+    for result, count in (('hit', hits), ('miss', misses), ('stale', stale)):
+        if count:
+            CACHE_REQUESTS.labels(cache, result).inc(count)
+
+
+class MetricsMiddleware:
+    """Record count, latency and database queries of every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count_query(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                QUERY_DURATION.labels(context['connection'].alias).observe(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(count_query))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        method = request.method if request.method in HTTP_METHODS else 'other'
+        REQUESTS.labels(view, method, response.status_code).inc()
+        LATENCY.labels(view).observe(duration)
+        REQUEST_QUERIES.labels(view).observe(queries)
+        return response
+
+
+def exception_handler(exc, context):
+    """DRF exception handler that also counts authentication failures."""
+    if isinstance(exc, AuthenticationFailed):
+        AUTH_FAILURES.labels('invalid_credentials').inc()
+    elif isinstance(exc, NotAuthenticated):
+        AUTH_FAILURES.labels('not_authenticated').inc()
+    return drf_exception_handler(exc, context)
+
+
+def _allowed(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        address = None
+    if address and any(address in ipaddress.ip_network(net, strict=False) for net in settings.METRICS_ALLOWED_IPS):
+        return True
+    if request.user.is_authenticated:
+        return request.user.is_staff
+    try:
+        auth = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return auth is not None and auth[0].is_staff
+
+
+def metrics_view(request):
+    """Expose the metrics to staff users and to METRICS_ALLOWED_IPS."""
+    if not _allowed(request):
+        return HttpResponseForbidden()
+    registry = REGISTRY
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_post_slug'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='blog',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AlterModelOptions(
+            name='tag',
+            options={'ordering': ['name']},
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-created_at'], name='post_published_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['blog', '-published_at', '-created_at'], name='post_blog_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the auto-created Post.tags through table by (tag_id, post_id).
+
+    The implicit unique constraint is (post_id, tag_id), which cannot serve
+    "posts for a tag" lookups without an extra table access per row.
+    """
+
+    dependencies = [
+        ('core', '0004_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX post_tags_tag_post_idx ON core_post_tags (tag_id, post_id);',
+            reverse_sql='DROP INDEX post_tags_tag_post_idx;',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_published_at(apps, schema_editor):
+    # Keyset pagination of published feeds needs a non-null published_at
+    Post = apps.get_model('core', 'Post')
+    Post.objects.filter(is_published=True, published_at__isnull=True).update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_post_tags_tag_post_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['blog', '-created_at', '-id'], name='post_blog_created_idx'),
+        ),
+        migrations.RunPython(backfill_published_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,171 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:52
+
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from django.db import migrations, models
+
+# Frozen copy of core.content as of this migration, so the backfill does not
+# change (or break) when the live sanitizer does.
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'caption', 'code', 'div', 'em', 'figcaption',
+    'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol',
+    'p', 'pre', 's', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan', 'scope'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_URL_SCHEMES = {'http', 'https', 'mailto'}
+DROPPED_TAGS = {'script', 'style', 'template', 'iframe', 'object', 'embed', 'noscript', 'textarea'}
+VOID_TAGS = {'br', 'hr', 'img'}
+SELF_CLOSING_SIBLINGS = {'li', 'p', 'tr', 'td', 'th'}
+BLOCK_TAGS = {
+    'blockquote', 'br', 'caption', 'div', 'figcaption', 'figure', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'li', 'p', 'pre', 'tr',
+}
+SUMMARY_WORDS = 50
+WORDS_PER_MINUTE = 200
+
+URL_SCHEME = re.compile(r'^([a-zA-Z][a-zA-Z0-9+.-]*):')
+CONTROL_CHARS = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def is_safe_url(url):
+    match = URL_SCHEME.match(CONTROL_CHARS.sub('', url))
+    return match is None or match.group(1).lower() in ALLOWED_URL_SCHEMES
+
+
+class ContentParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        if tag in SELF_CLOSING_SIBLINGS and self.open_tags and self.open_tags[-1] == tag:
+            self.html.append(f'</{self.open_tags.pop()}>')
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        rendered = ''.join(
+            f' {name}="{escape(value, quote=True)}"'
+            for name, value in attrs
+            if name in allowed and value is not None
+            and (name not in URL_ATTRIBUTES or is_safe_url(value))
+        )
+        self.html.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in self.open_tags:
+            return
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.dropping:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.html.append(f'</{self.open_tags.pop()}>')
+
+
+def render_content(html):
+    parser = ContentParser()
+    parser.feed(html or '')
+    parser.close()
+    lines = (' '.join(line.split()) for line in ''.join(parser.text).splitlines())
+    text = '\n'.join(line for line in lines if line)
+    return ''.join(parser.html), text, len(text.split())
+
+
+def make_summary(text):
+    parts = text.split()
+    if len(parts) <= SUMMARY_WORDS:
+        return ' '.join(parts)
+    return ' '.join(parts[:SUMMARY_WORDS]) + '…'
+
+
+def reading_time(word_count):
+    return math.ceil(word_count / WORDS_PER_MINUTE)
+
+
+def render_existing_posts(apps, schema_editor):
+    Post = apps.get_model('core', 'Post')
+    batch = []
+    for post in Post.objects.only('content', 'excerpt').iterator(chunk_size=500):
+        post.content_html, post.content_text, post.word_count = render_content(post.content)
+        post.reading_time = reading_time(post.word_count)
+        post.summary = post.excerpt or make_summary(post.content_text)
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ['content_html', 'content_text', 'summary', 'word_count', 'reading_time'])
+            batch = []
+    Post.objects.bulk_update(batch, ['content_html', 'content_text', 'summary', 'word_count', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_post_blog_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='summary',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_post_rendered_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.BigIntegerField(unique=True)),
+                ('blog_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated_at', 'id'], name='post_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='posttombstone',
+            index=models.Index(fields=['deleted_at', 'post_id'], name='tombstone_sync_idx'),
+        ),
+    ]
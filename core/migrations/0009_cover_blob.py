@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:55
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_covers(apps, schema_editor):
+    Post = apps.get_model('core', 'Post')
+    CoverBlob = apps.get_model('core', 'CoverBlob')
+    counts = Post.objects.exclude(cover='').exclude(cover__isnull=True).values('cover').annotate(refs=Count('id'))
+    CoverBlob.objects.bulk_create([CoverBlob(name=row['cover'], ref_count=row['refs']) for row in counts])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_post_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoverBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='cover',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.get_cover_storage, upload_to='posts/covers/'),
+        ),
+        migrations.RunPython(count_existing_covers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing_posts(apps, schema_editor):
+    # Version 1 of every existing post, the base of later patches
+    Post = apps.get_model('core', 'Post')
+    PostRevision = apps.get_model('core', 'PostRevision')
+    batch = []
+    for post in Post.objects.only('content').iterator(chunk_size=500):
+        batch.append(PostRevision(post=post, version=1, is_snapshot=True, data=post.content))
+        if len(batch) == 500:
+            PostRevision.objects.bulk_create(batch)
+            batch = []
+    PostRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_blog_deletion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.CreateModel(
+            name='PostRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('data', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='core.post')),
+            ],
+            options={
+                'ordering': ['-version'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'version'), name='post_revision_version_uniq')],
+            },
+        ),
+        migrations.RunPython(snapshot_existing_posts, migrations.RunPython.noop),
+    ]
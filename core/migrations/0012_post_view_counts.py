@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_post_revisions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewCount',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_count', serialize=False, to='core.post')),
+                ('views', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-views'], name='post_view_count_views_idx')],
+            },
+        ),
+    ]
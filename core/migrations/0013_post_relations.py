@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_post_view_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRelations',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='relations', serialize=False, to='core.post')),
+                ('related_ids', models.JSONField(default=list)),
+                ('stale', models.BooleanField(default=False)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('stale', True)), fields=['post'], name='post_relations_stale_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:45
+
+from django.db import migrations
+
+
+def create_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS tag_name_prefix_idx ON core_tag (UPPER(name) text_pattern_ops);'
+        )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS tag_name_prefix_idx;')
+
+
+class Migration(migrations.Migration):
+    """
+    Index tag names for case-insensitive prefix searches on PostgreSQL.
+
+    name__istartswith (the admin's '^name' search) compiles to
+    UPPER(name) LIKE UPPER('q%'); the unique index on name uses the
+    database collation, which LIKE cannot use outside the C locale.
+    SQLite has no operator classes, so nothing is created there.
+    """
+
+    dependencies = [
+        ('core', '0013_post_relations'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
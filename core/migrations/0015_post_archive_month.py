@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def fill_archive(apps, schema_editor):
+    # Same aggregate as core.archive.rebuild_archive, over the historical models
+    Post = apps.get_model('core', 'Post')
+    PostArchiveMonth = apps.get_model('core', 'PostArchiveMonth')
+    rows = (
+        Post.objects.filter(is_published=True, published_at__isnull=False)
+        .annotate(year=ExtractYear('published_at'), month=ExtractMonth('published_at'))
+        .values('blog_id', 'year', 'month').annotate(count=Count('pk')).order_by()
+    )
+    PostArchiveMonth.objects.bulk_create([PostArchiveMonth(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_tag_name_prefix_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('blog', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archive_months', to='core.blog')),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('blog', 'year', 'month'), name='post_archive_month_unique')],
+            },
+        ),
+        migrations.RunPython(fill_archive, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 20:40
+
+from django.db import migrations, models
+
+
+def fill_owner(apps, schema_editor):
+    # Jobs whose blog is already gone keep no owner (superusers only)
+    Blog = apps.get_model('core', 'Blog')
+    DeletionJob = apps.get_model('core', 'DeletionJob')
+    for job in DeletionJob.objects.filter(owner_id__isnull=True):
+        owner_id = Blog.objects.filter(pk=job.blog_id).values_list('user_id', flat=True).first()
+        if owner_id is not None:
+            DeletionJob.objects.filter(pk=job.pk).update(owner_id=owner_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_post_archive_month'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deletionjob',
+            name='owner_id',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(fill_owner, migrations.RunPython.noop),
+    ]
@@ -1,22 +1,49 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed
 from django.conf import settings
+from django.utils import timezone
+from django.urls import reverse
 from django.utils.text import slugify
+from diff_match_patch import diff_match_patch
 from tinymce.models import HTMLField
+from .content import make_summary, reading_time, render_content
+from .storage import get_cover_storage, is_content_addressed, modified_within
 
 User = settings.AUTH_USER_MODEL
 
+class BlogQuerySet(models.QuerySet):
+    def visible(self):
+        """Blogs not scheduled for deletion."""
+        return self.filter(deleted_at__isnull=True)
+
+
 class Blog(models.Model):
     """
     Blog model representing a user's personal blog.
     Each user can have only one blog (OneToOne relationship).
+    A blog scheduled for deletion is hidden (deleted_at) until the
+    process_deletions command removes it in batches.
     """
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='blog')
     title = models.CharField(max_length=200)
     bio = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = BlogQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']  # Ordenar por fecha de creación descendente
+        indexes = [
+            # Only the (few) blogs being deleted, for Post.objects.visible()
+            models.Index(
+                fields=['deleted_at'],
+                name='blog_deleted_idx',
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
@@ -36,6 +63,15 @@ class Tag(models.Model):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    def visible(self):
+        """
+        Posts whose blog is not scheduled for deletion. Excludes against
+        the partial index of deleted blogs instead of joining every row.
+        """
+        return self.exclude(blog__in=Blog.objects.filter(deleted_at__isnull=False).values('pk'))
+
+
 class Post(models.Model):
     """
     Post model representing a blog post.
@@ -46,21 +82,84 @@ class Post(models.Model):
     slug = models.SlugField(max_length=260, unique=True, blank=True)
     content = HTMLField()
     excerpt = models.TextField(blank=True)
-    cover = models.ImageField(upload_to='posts/covers/', null=True, blank=True)
+    # Derived from content on save (see core/content.py)
+    content_html = models.TextField(blank=True, editable=False)
+    content_text = models.TextField(blank=True, editable=False)
+    summary = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False)
+    cover = models.ImageField(upload_to='posts/covers/', storage=get_cover_storage, null=True, blank=True)
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True)
     is_published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
+    # Incremented on every content change; base of content patches
+    content_version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    DERIVED_CONTENT_FIELDS = ['content_html', 'content_text', 'summary', 'word_count', 'reading_time']
 
     class Meta:
         ordering = ['-published_at', '-created_at']  # Ordenar por fecha de publicación
+        indexes = [
+            # Published feed (/api/posts/published/): partial index so drafts never enter it
+            models.Index(
+                fields=['-published_at', '-created_at'],
+                name='post_published_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            # Per-blog feed ordered by date
+            models.Index(
+                fields=['blog', '-published_at', '-created_at'],
+                name='post_blog_feed_idx',
+            ),
+            # Per-blog listing including drafts (keyset paginated)
+            models.Index(
+                fields=['blog', '-created_at', '-id'],
+                name='post_blog_created_idx',
+            ),
+            # Change feed for sync clients (/api/posts/changes/)
+            models.Index(
+                fields=['updated_at', 'id'],
+                name='post_sync_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         """
         Override save method to automatically generate slug from title.
         If slug already exists, append a number to make it unique.
+        Published posts always get a publication date.
+
+        A content change locks the row and numbers the new version after the
+        stored one, so concurrent edits get consecutive versions instead of
+        colliding on the revision of the version they both loaded.
         """
+        if self.pk is not None and self.content_changed(kwargs.get('update_fields')):
+            with transaction.atomic(using=kwargs.get('using')):
+                self.lock_content()
+                self._save(*args, **kwargs)
+        else:
+            self._save(*args, **kwargs)
+
+    def lock_content(self):
+        """Lock the row and take the stored content as the loaded one."""
+        current = Post.objects.select_for_update().values('content', 'content_version').get(pk=self.pk)
+        self._loaded_values = {**getattr(self, '_loaded_values', {}), **current}
+        self.content_version = current['content_version']
+
+    def _save(self, *args, **kwargs):
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if self.pk is not None and self.content_changed(update_fields):
+            self.content_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = {*update_fields, 'content_version'}
+        if self.process_content(update_fields) and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.DERIVED_CONTENT_FIELDS}
         if not self.slug:
             self.slug = slugify(self.title)
             # If slug already exists, add a number
@@ -70,6 +169,292 @@ class Post(models.Model):
                 self.slug = f"{original_slug}-{counter}"
                 counter += 1
         super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def content_changed(self, update_fields=None):
+        """Whether saving would store a different content than was loaded."""
+        if update_fields is not None and 'content' not in update_fields:
+            return False
+        if 'content' not in self.__dict__:
+            return False  # Deferred: content was not loaded, so it cannot have changed
+        return getattr(self, '_loaded_values', {}).get('content') != self.content
+
+    def process_content(self, update_fields=None):
+        """
+        Refresh the sanitized HTML, plain text, summary, word count and
+        reading time from content and excerpt. Returns whether it ran.
+        """
+        if update_fields is not None and not {'content', 'excerpt'} & set(update_fields):
+            return False
+        if 'content' not in self.__dict__:
+            return False  # Deferred: content was not loaded, so it cannot have changed
+        if self.pk is None or self.content_changed() or not self.content_html:
+            self.content_html, self.content_text, self.word_count = render_content(self.content)
+            self.reading_time = reading_time(self.word_count)
+        self.summary = self.excerpt or make_summary(self.content_text)
+        return True
+
+    def set_tags(self, tags, created=False):
+        """
+        Replace the post's tags writing only the difference: one bulk INSERT
+        for the added through rows and one DELETE for the removed ones.
+        Sends the same m2m_changed signals as tags.set() so cache
+        invalidation keeps working. `created` skips reading the current
+        tags of a post that was just inserted.
+        """
+        through = Post.tags.through
+        current = set() if created else set(
+            through.objects.filter(post_id=self.pk).values_list('tag_id', flat=True)
+        )
+        wanted = {tag.pk for tag in tags}
+        removed, added = current - wanted, wanted - current
+        db = self._state.db
+        signal_kwargs = {'sender': through, 'instance': self, 'reverse': False, 'model': Tag, 'using': db}
+        if removed:
+            m2m_changed.send(action='pre_remove', pk_set=removed, **signal_kwargs)
+            through.objects.using(db).filter(post_id=self.pk, tag_id__in=removed).delete()
+            m2m_changed.send(action='post_remove', pk_set=removed, **signal_kwargs)
+        if added:
+            m2m_changed.send(action='pre_add', pk_set=added, **signal_kwargs)
+            through.objects.using(db).bulk_create(
+                [through(post_id=self.pk, tag_id=pk) for pk in added], ignore_conflicts=True
+            )
+            m2m_changed.send(action='post_add', pk_set=added, **signal_kwargs)
+        # Drop stale prefetched tags, as the related manager does
+        getattr(self, '_prefetched_objects_cache', {}).pop('tags', None)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so save() and signals can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def get_absolute_url(self):
+        return reverse('post_detail', args=[self.slug])
+
+    def __str__(self):
+        return self.title
+
+
+class PostRevision(models.Model):
+    """
+    One version of a post's content. Every SNAPSHOT_INTERVAL-th revision
+    stores the full content; the others a diff-match-patch patch from the
+    previous version, so rebuilding any version applies a bounded number
+    of patches to the closest earlier snapshot.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='revisions')
+    version = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.TextField()  # Full content or patch text
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-version']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'version'], name='post_revision_version_uniq'),
+        ]
+
+    @classmethod
+    def record(cls, post, previous_content):
+        """Store the post's current content version."""
+        version = post.content_version
+        snapshot = previous_content is None or (version - 1) % settings.POST_REVISION_SNAPSHOT_INTERVAL == 0
+        if snapshot:
+            data = post.content
+        else:
+            dmp = diff_match_patch()
+            data = dmp.patch_toText(dmp.patch_make(previous_content, post.content))
+        return cls.objects.create(post=post, version=version, is_snapshot=snapshot, data=data)
+
+    @classmethod
+    def content_at(cls, post_id, version):
+        """Rebuild the content of a version, or None if it is not stored."""
+        revisions = cls.objects.filter(post_id=post_id, version__lte=version)
+        snapshot = revisions.filter(is_snapshot=True).order_by('-version').first()
+        if snapshot is None:
+            return None
+        content = snapshot.data
+        patches = revisions.filter(version__gt=snapshot.version).order_by('version').values_list('version', 'data')
+        expected = snapshot.version
+        dmp = diff_match_patch()
+        for number, data in patches:
+            expected += 1
+            if number != expected:
+                return None  # A gap: the chain cannot be rebuilt
+            content, _ = dmp.patch_apply(dmp.patch_fromText(data), content)
+        return content if expected == version else None
+
+    def __str__(self):
+        return f"{self.post_id} v{self.version}"
+
+
+class PostTombstone(models.Model):
+    """
+    Record of a deleted post, so sync clients can drop their local copy.
+    Keeps only the ids: the post row itself is gone. Kept for
+    SYNC_TOMBSTONE_RETENTION_DAYS (see ``prune_tombstones``).
+    """
+    post_id = models.BigIntegerField(unique=True)
+    blog_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'post_id'], name='tombstone_sync_idx'),
+        ]
+
+    @classmethod
+    def prune(cls):
+        """Delete the tombstones older than the retention. Returns how many."""
+        cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        deleted, _ = cls.objects.filter(deleted_at__lt=cutoff).delete()
+        return deleted
+
+    def __str__(self):
+        return f"Deleted post {self.post_id}"
+
+
+class PostViewCount(models.Model):
+    """
+    Number of times a post was read. Kept out of the Post row so counting a
+    read neither locks the post nor invalidates its caches; increments are
+    buffered per worker and added in batches (see core/view_counts.py).
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='view_count')
+    views = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-views'], name='post_view_count_views_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id}: {self.views} views"
+
+
+class PostRelations(models.Model):
+    """
+    Precomputed related posts of a post (core/related.py): the ids of the
+    most similar posts, best first. Rows are marked stale when tags or
+    publication change and recomputed on the next read or by
+    ``rebuild_related_posts``; a post without a row has not been computed.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='relations')
+    related_ids = models.JSONField(default=list)
+    stale = models.BooleanField(default=False)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post'], name='post_relations_stale_idx', condition=models.Q(stale=True)),
+        ]
+
+    def __str__(self):
+        return f"Related to {self.post_id}: {self.related_ids}"
+
+
+class PostArchiveMonth(models.Model):
+    """
+    Number of published posts of a blog per month of publication, kept up
+    to date by signals on publish, unpublish, re-dating and delete (see
+    core/archive.py), so archive widgets read a few rows instead of
+    grouping the posts table. ``rebuild_archive`` recomputes it.
+    """
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='archive_months')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-year', '-month']
+        constraints = [
+            models.UniqueConstraint(fields=['blog', 'year', 'month'], name='post_archive_month_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.blog_id} {self.year}-{self.month:02d}: {self.count}"
+
+
+class CoverBlob(models.Model):
+    """
+    Reference count of a content-addressed cover file shared by posts.
+    Files whose count drops to zero are removed by `manage.py gc_covers`.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+    # Files written or reused more recently than this are kept (see core/storage.py)
+    GRACE_SECONDS = 3600
+
+    @classmethod
+    def delete_if_unreferenced(cls, name, grace_seconds=GRACE_SECONDS):
+        """
+        Delete the counter and the file if no post references it; returns
+        whether a file was deleted. The conditional DELETE makes a
+        concurrent new reference win, and a file touched within
+        `grace_seconds` may be an upload about to be referenced.
+        """
+        if is_content_addressed(name) and modified_within(get_cover_storage(), name, grace_seconds):
+            return False
+        removed, _ = cls.objects.filter(name=name, ref_count=0).delete()
+        if removed and is_content_addressed(name):
+            get_cover_storage().delete(name)
+            return True
+        return False
+
+
+class DeletionJob(models.Model):
+    """
+    Background deletion of a blog (and optionally its user): posts and
+    their tag rows are removed in bounded batches by process_deletions.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    # Plain ids: the blog and the user are gone once the job is done
+    blog_id = models.BigIntegerField()
+    user_id = models.BigIntegerField(null=True, blank=True)  # Set when the user is deleted too
+    owner_id = models.BigIntegerField(null=True, blank=True, db_index=True)  # Blog owner, who may follow the job
+    title = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total_posts = models.PositiveIntegerField(default=0)
+    deleted_posts = models.PositiveIntegerField(default=0)
+    deleted_covers = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='deletion_job_status_idx'),
+        ]
+
+    @property
+    def progress(self):
+        """Percentage of the posts deleted so far."""
+        if self.status == self.DONE or not self.total_posts:
+            return 100 if self.status == self.DONE else 0
+        return min(100, self.deleted_posts * 100 // self.total_posts)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"Deletion of {self.title} ({self.status})"
@@ -0,0 +1,199 @@
+# core/object_cache.py
+"""
+Cache-aside object cache for Post, Blog and Tag rows.
+
+Objects are cached by primary key together with the versions of every
+namespace their data depends on (a post embeds its blog, the blog's user and
+its tags). Signals bump those namespaces, and an entry whose recorded
+versions are not all current is treated as a miss. Lookups by another
+unique field (Post.slug, Blog.user_id) go through alias entries that point
+to the primary key.
+
+A request-scoped layer, enabled by ObjectCacheMiddleware, keeps the objects
+already fetched during the current request, so repeated lookups (view,
+permission checks, serializers) cost a single cache round trip.
+"""
+import hashlib
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .cache import bump_version, get_version_map
+from .metrics import record_cache
+from .models import Blog, Post, Tag
+
+# Bump when the cached model shape changes, so old pickles are ignored
+SCHEMA_VERSION = 1
+
+_request_objects = ContextVar('request_objects', default=None)
+
+
+class ObjectCache:
+    """
+    Cached access to one model. `dependencies(obj)` lists the namespaces
+    the cached object depends on, the first one being its own.
+    """
+
+    def __init__(self, model, namespace, dependencies, related=(), prefetch=(), aliases=()):
+        self.model = model
+        self.namespace = namespace
+        self.dependencies = dependencies
+        self.related = related
+        self.prefetch = prefetch
+        self.aliases = aliases
+
+    def object_namespace(self, pk):
+        return f'obj:{self.namespace}:{pk}'
+
+    def key(self, pk):
+        return f'obj:{self.namespace}:v{SCHEMA_VERSION}:{pk}'
+
+    def alias_key(self, field, value):
+        # Hashed: slugs and tag names are not always valid memcached keys
+        digest = hashlib.md5(str(value).encode()).hexdigest()
+        return f'obj:{self.namespace}:v{SCHEMA_VERSION}:{field}:{digest}'
+
+    def get_queryset(self):
+        # Fill from the primary: a lagging replica could cache old data
+        # under a version that is already current
+        return (
+            self.model.objects.using(DEFAULT_DB_ALIAS)
+            .select_related(*self.related)
+            .prefetch_related(*self.prefetch)
+        )
+
+    def get(self, pk):
+        """Return the object with this primary key, or None."""
+        return self.get_many([pk]).get(_to_pk(pk))
+
+    def get_many(self, pks):
+        """
+        Return {pk: object} for the existing objects, with one cache
+        round trip for the entries, one for their versions and a single
+        IN query for the misses. Invalid primary keys are ignored.
+        """
+        pks = [pk for pk in dict.fromkeys(map(_to_pk, pks)) if pk is not None]
+        local = _request_objects.get()
+        found = {}
+        if local is not None:
+            found = {pk: local[(self.namespace, pk)] for pk in pks if (self.namespace, pk) in local}
+        remaining = [pk for pk in pks if pk not in found]
+        if remaining:
+            fetched = self._fetch(remaining)
+            found.update(fetched)
+            if local is not None:
+                local.update({(self.namespace, pk): obj for pk, obj in fetched.items()})
+        return found
+
+    def _fetch(self, pks):
+        entries = cache.get_many([self.key(pk) for pk in pks])
+        # Own namespaces are read before the database, so a write committed
+        # in between leaves the filled entry already outdated
+        namespaces = {self.object_namespace(pk) for pk in pks}
+        for entry in entries.values():
+            namespaces.update(entry['versions'])
+        versions = get_version_map(namespaces)
+
+        found = {}
+        for pk in pks:
+            entry = entries.get(self.key(pk))
+            if entry is not None and all(versions.get(ns) == v for ns, v in entry['versions'].items()):
+                found[pk] = entry['object']
+        missing = [pk for pk in pks if pk not in found]
+        record_cache(f'object:{self.namespace}', hits=len(found), misses=len(missing))
+        if missing:
+            loaded = {obj.pk: obj for obj in self.get_queryset().filter(pk__in=missing)}
+            dependencies = {pk: self.dependencies(obj) for pk, obj in loaded.items()}
+            unknown = {ns for deps in dependencies.values() for ns in deps} - versions.keys()
+            versions.update(get_version_map(unknown))
+            cache.set_many({
+                self.key(pk): {'object': obj, 'versions': {ns: versions[ns] for ns in dependencies[pk]}}
+                for pk, obj in loaded.items()
+            }, settings.OBJECT_CACHE_TIMEOUT)
+            found.update(loaded)
+        return found
+
+    def get_by(self, field, value):
+        """Return the object whose unique `field` equals value, or None."""
+        return self.get_many_by(field, [value]).get(value)
+
+    def get_many_by(self, field, values):
+        """Return {value: object} looking objects up by a unique field."""
+        assert field in self.aliases, f'{field} is not a cached alias of {self.namespace}'
+        values = list(dict.fromkeys(values))
+        keys = {self.alias_key(field, value): value for value in values}
+        pks = {keys[key]: pk for key, pk in cache.get_many(keys).items()}
+        objects = self.get_many(pks.values())
+        # Aliases are not versioned: check the (current) object still matches
+        result = {
+            value: objects[pk] for value, pk in pks.items()
+            if pk in objects and getattr(objects[pk], field) == value
+        }
+        unresolved = [value for value in values if value not in result]
+        if unresolved:
+            resolved = dict(
+                self.model.objects.using(DEFAULT_DB_ALIAS)
+                .filter(**{f'{field}__in': unresolved})
+                .values_list(field, 'pk')
+            )
+            cache.set_many(
+                {self.alias_key(field, value): pk for value, pk in resolved.items()},
+                settings.OBJECT_CACHE_TIMEOUT
+            )
+            objects = self.get_many(resolved.values())
+            result.update({value: objects[pk] for value, pk in resolved.items() if pk in objects})
+        return result
+
+
+def _to_pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def invalidate_objects(*namespaces):
+    """
+    Make cached objects depending on these namespaces ('obj:post:1', ...)
+    stale once the transaction commits.
+    """
+    local = _request_objects.get()
+    if local is not None:
+        local.clear()
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+post_cache = ObjectCache(
+    Post, 'post',
+    dependencies=lambda post: [
+        f'obj:post:{post.pk}', f'obj:blog:{post.blog_id}', f'obj:user:{post.blog.user_id}',
+        *(f'obj:tag:{tag.pk}' for tag in post.tags.all()),
+    ],
+    related=['blog__user'], prefetch=['tags'], aliases=['slug'],
+)
+blog_cache = ObjectCache(
+    Blog, 'blog',
+    dependencies=lambda blog: [f'obj:blog:{blog.pk}', f'obj:user:{blog.user_id}'],
+    related=['user'], aliases=['user_id'],
+)
+tag_cache = ObjectCache(
+    Tag, 'tag',
+    dependencies=lambda tag: [f'obj:tag:{tag.pk}'],
+    aliases=['name'],
+)
+
+
+class ObjectCacheMiddleware:
+    """Give each request its own layer of already fetched objects."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request_objects.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _request_objects.reset(token)
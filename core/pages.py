@@ -0,0 +1,113 @@
+# core/pages.py
+"""
+Server-rendered public pages under PUBLIC_SITE_PREFIX: the home feed, a
+blog, a tag and a post.
+
+Listings load each page of posts with one query (blog and user joined, the
+large content columns deferred) plus one for their tags. The home and blog
+pages take their number of posts from the archive rollups (core/archive.py)
+instead of counting them. The post, blog or tag named by the URL comes from
+the object cache.
+
+The markup of every post is cached as a template fragment keyed on the
+post's id and updated_at, so an edit re-renders only that post.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import Http404
+from django.shortcuts import render
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+from .archive import blog_archive, site_archive
+from .models import Post
+from .object_cache import blog_cache, post_cache, tag_cache
+from .view_counts import record_view
+
+
+def published_posts():
+    """Published posts of visible blogs, ready to be listed."""
+    return (
+        Post.objects.visible().filter(is_published=True)
+        .defer('content', 'content_html', 'content_text')
+        .select_related('blog__user')
+        .prefetch_related('tags')
+        .order_by('-published_at', '-created_at')
+    )
+
+
+class CountedPaginator(Paginator):
+    """Paginator told the number of posts instead of running COUNT(*)."""
+
+    def __init__(self, object_list, per_page, count):
+        super().__init__(object_list, per_page)
+        self.known_count = count
+
+    @cached_property
+    def count(self):
+        return self.known_count
+
+
+def archive_total(archive):
+    return sum(year['count'] for year in archive)
+
+
+def render_list(request, posts, heading, feed_url, count=None, **context):
+    """
+    Render a page of `posts`. `count`, when given, is the total taken from
+    the archive rollups, which saves counting every published post.
+    """
+    if count is None:
+        paginator = Paginator(posts, settings.PUBLIC_PAGE_SIZE)
+    else:
+        paginator = CountedPaginator(posts, settings.PUBLIC_PAGE_SIZE, count)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'core/post_list.html', {
+        'page_obj': page_obj,
+        'heading': heading,
+        'feed_url': feed_url,
+        'fragment_timeout': settings.PAGE_FRAGMENT_TIMEOUT,
+        **context,
+    })
+
+
+def post_list(request):
+    """Home page: the latest published posts of every blog."""
+    return render_list(
+        request, published_posts(), 'Últimos posts', reverse('feed', args=['rss']),
+        count=archive_total(site_archive()),
+    )
+
+
+def blog_page(request, pk):
+    """Published posts of one blog."""
+    blog = blog_cache.get(pk)
+    if blog is None or blog.deleted_at:
+        raise Http404('No Blog matches the given query.')
+    return render_list(
+        request, published_posts().filter(blog=blog), blog.title,
+        reverse('blog-feed', args=[blog.pk, 'rss']), count=archive_total(blog_archive(blog.pk)), blog=blog,
+    )
+
+
+def tag_page(request, name):
+    """Published posts with one tag."""
+    tag = tag_cache.get_by('name', name)
+    if tag is None:
+        raise Http404('No Tag matches the given query.')
+    return render_list(
+        request, published_posts().filter(tags=tag), f'Posts con la etiqueta "{tag.name}"',
+        reverse('tag-feed', args=[tag.name, 'rss']), tag=tag,
+    )
+
+
+def post_detail(request, slug):
+    """A published post, read through the object cache."""
+    post = post_cache.get_by('slug', slug)
+    if post is None or not post.is_published or post.blog.deleted_at:
+        raise Http404('No Post matches the given query.')
+    record_view(post.pk)
+    return render(request, 'core/post_detail.html', {
+        'post': post,
+        'fragment_timeout': settings.PAGE_FRAGMENT_TIMEOUT,
+    })
@@ -0,0 +1,145 @@
+# core/pagination.py
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    """Encode a list of key values as an opaque URL-safe cursor."""
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('ascii')).decode('ascii')
+
+
+def decode_cursor(encoded):
+    """Decode a cursor made by encode_cursor(); raises ValueError if invalid."""
+    values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over the queryset's own ordering.
+
+    Instead of OFFSET, each page continues strictly after the last row of the
+    previous one, so fetching page N costs a single index range scan no matter
+    how deep the client has paged. The queryset must be explicitly ordered by
+    non-nullable fields ending in a unique one (e.g. ``('-created_at', '-id')``).
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = queryset.query.order_by
+        assert self.ordering, 'KeysetPagination requires an explicitly ordered queryset.'
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(position))
+
+        page = list(queryset[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_seek_filter(self, position):
+        """
+        Expand ``(f1, f2, ...) < (v1, v2, ...)`` into ORed prefix comparisons.
+        """
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = [Q(**{prev.lstrip('-'): value}) for prev, value in zip(self.ordering[:index], position)]
+            conditions.append(reduce(and_, equal + [Q(**{f'{name}__{lookup}': position[index]})]))
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            values = decode_cursor(encoded)
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        return encode_cursor([
+            getattr(instance, instance._meta.get_field(field.lstrip('-')).attname)
+            for field in self.ordering
+        ])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                    'example': f'http://api.example.org/blogs/1/posts/?{self.cursor_query_param}=WyIyMDI1LTAxLTAxIiwgNDJd',
+                },
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -22,7 +22,8 @@ class IsOwnerOrSuperuser(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        return obj.blog.user == request.user
+        # Compare ids: no need to load the blog's user
+        return obj.blog.user_id == request.user.pk
 
 class IsOwnerOrSuperuserForBlog(permissions.BasePermission):
     """
@@ -46,7 +47,7 @@ class IsOwnerOrSuperuserForBlog(permissions.BasePermission):
         if request.user.is_superuser:
             return True
         
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
 
 class IsSuperuserOrReadOnly(permissions.BasePermission):
     """
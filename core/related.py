@@ -0,0 +1,108 @@
+# core/related.py
+"""
+Related posts by weighted tag overlap.
+
+A candidate scores the sum of the weights of the tags it shares with the
+post, where rarer tags weigh more (1 / ln(2 + posts using the tag)), decayed
+by the candidate's age with a half-life of RELATED_POSTS_HALF_LIFE_DAYS. The
+top RELATED_POSTS_COUNT ids are stored in PostRelations, so reading them is a
+primary key lookup instead of a self-join of the tag table.
+
+When a post's tags or publication change, its row and the rows of its
+current neighbours are marked stale, and its own row is recomputed once the
+transaction commits. Recomputing a row marks stale the posts that entered or
+left its list, so the posts that now share tags with it are reached too
+(neighbourhoods are nearly symmetric), and changes spread to the lists they
+affect and stop once those are stable.
+``rebuild_related_posts --all`` recomputes everything from scratch.
+"""
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, FloatField, Sum, Value, When
+from django.utils import timezone
+
+from .models import Post, PostRelations
+
+# Candidates ranked by overlap before applying the recency decay
+CANDIDATE_FACTOR = 4
+
+
+def compute_related(post):
+    """Return the ids of the posts most related to `post`, best first."""
+    through = Post.tags.through
+    tag_ids = list(through.objects.filter(post_id=post.pk).values_list('tag_id', flat=True))
+    if not tag_ids:
+        return []
+    usage = dict(
+        through.objects.filter(tag_id__in=tag_ids).values('tag_id')
+        .annotate(posts=Count('post_id')).values_list('tag_id', 'posts')
+    )
+    weights = {tag_id: 1 / math.log(2 + usage.get(tag_id, 0)) for tag_id in tag_ids}
+
+    count = settings.RELATED_POSTS_COUNT
+    # Aggregated over the tag rows (tag_id index), grouped by post only
+    candidates = (
+        through.objects
+        .filter(tag_id__in=tag_ids, post__is_published=True, post__blog__deleted_at__isnull=True)
+        .exclude(post_id=post.pk)
+        .values('post_id', 'post__published_at', 'post__created_at')
+        .annotate(overlap=Sum(Case(
+            *(When(tag_id=tag_id, then=Value(weight)) for tag_id, weight in weights.items()),
+            output_field=FloatField(),
+        )))
+        .order_by('-overlap', '-post_id')
+        .values_list('post_id', 'overlap', 'post__published_at', 'post__created_at')[:count * CANDIDATE_FACTOR]
+    )
+    now = timezone.now()
+    half_life = settings.RELATED_POSTS_HALF_LIFE_DAYS
+    scored = []
+    for pk, overlap, published_at, created_at in candidates:
+        age_days = max((now - (published_at or created_at)).total_seconds(), 0) / 86400
+        scored.append((overlap * 0.5 ** (age_days / half_life), pk))
+    scored.sort(reverse=True)
+    return [pk for _, pk in scored[:count]]
+
+
+def refresh_related(post):
+    """Recompute and store the related posts of `post`. Returns the ids."""
+    previous = PostRelations.objects.filter(post_id=post.pk).values_list('related_ids', flat=True).first()
+    related_ids = compute_related(post)
+    PostRelations.objects.update_or_create(post_id=post.pk, defaults={'related_ids': related_ids, 'stale': False})
+    changed = set(related_ids).symmetric_difference(previous or [])
+    if changed:
+        mark_stale(changed)
+    return related_ids
+
+
+def refresh_on_commit(post_ids):
+    """
+    Recompute the lists of the published posts among `post_ids` after the
+    current transaction commits, reaching the posts they now relate to.
+    """
+    def refresh():
+        for post in Post.objects.filter(pk__in=post_ids, is_published=True).only('pk'):
+            refresh_related(post)
+
+    transaction.on_commit(refresh)
+
+
+def get_related_ids(post):
+    """Stored related ids of `post`, recomputing them if stale or missing."""
+    row = PostRelations.objects.filter(post_id=post.pk).values_list('related_ids', 'stale').first()
+    if row is None or row[1]:
+        return refresh_related(post)
+    return row[0]
+
+
+def mark_stale(post_ids):
+    PostRelations.objects.filter(post_id__in=post_ids, stale=False).update(stale=True)
+
+
+def mark_neighbourhood_stale(post_ids):
+    """Mark stale the given posts and the posts currently related to them."""
+    post_ids = set(post_ids)
+    for related_ids in PostRelations.objects.filter(post_id__in=post_ids).values_list('related_ids', flat=True):
+        post_ids.update(related_ids)
+    mark_stale(post_ids)
@@ -0,0 +1,113 @@
+# core/schema.py
+"""
+Precomputed OpenAPI schema.
+
+Generating the schema introspects every view and serializer, and the
+Swagger and Redoc pages request it on each load. The rendered documents
+only change when the code does, so they are built once per code version
+(by the ``build_schema`` command at image build, or by the first request)
+and kept on disk under ``OPENAPI_SCHEMA_DIR`` and in process memory, and
+served with an ETag.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.views import SpectacularAPIView
+
+RENDERERS = {'yaml': OpenApiYamlRenderer, 'json': OpenApiJsonRenderer}
+
+# {format: (code version, etag, content)} for this worker
+_documents = {}
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    CODE_VERSION when set (e.g. the deployed commit), otherwise a digest of
+    the project's Python sources and the schema-related library versions.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    digest = hashlib.sha256(f'{drf_spectacular.__version__}:{rest_framework.__version__}'.encode())
+    roots = {Path(settings.BASE_DIR, settings.ROOT_URLCONF.split('.')[0])}
+    roots.update(
+        Path(app.path) for app in apps.get_app_configs()
+        if Path(app.path).is_relative_to(settings.BASE_DIR)
+    )
+    for root in sorted(roots):
+        for path in sorted(root.rglob('*.py')):
+            digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(fmt, version=None):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f'openapi-{version or code_version()}.{fmt}'
+
+
+def render_schema(fmt):
+    """Generate the public schema and render it as `fmt` ('yaml' or 'json')."""
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return RENDERERS[fmt]().render(schema, renderer_context={})
+
+
+def write_schema(fmt, content):
+    """Store a rendered document for the current code version. Returns its path."""
+    path = schema_path(fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+    return path
+
+
+def get_schema_document(fmt):
+    """Return (etag, content) for the current code version, building it if needed."""
+    version = code_version()
+    cached = _documents.get(fmt)
+    if cached is None or cached[0] != version:
+        path = schema_path(fmt, version)
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            content = render_schema(fmt)
+            try:
+                write_schema(fmt, content)
+            except OSError:
+                pass  # Read-only filesystem: keep it in memory only
+        etag = quote_etag(hashlib.md5(content).hexdigest())
+        cached = _documents[fmt] = (version, etag, content)
+    return cached[1:]
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """SpectacularAPIView serving the precomputed default schema."""
+
+    def _get_schema_response(self, request):
+        renderer = request.accepted_renderer
+        if self.api_version or request.version or request.GET.get('version') or request.GET.get('lang'):
+            # Variants other than the default one are generated as before
+            return super()._get_schema_response(request)
+        etag, content = get_schema_document(renderer.format)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+            response.headers['Content-Disposition'] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response.headers['ETag'] = etag
+        return response
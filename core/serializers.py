@@ -1,7 +1,27 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from .models import Blog, Post, Tag
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import APIException
+from diff_match_patch import diff_match_patch
+from drf_spectacular.utils import extend_schema_field
+from .models import Blog, DeletionJob, Post, PostRevision, Tag
+from .signals import invalidate_tags
+
+
+class Conflict(APIException):
+    """The resource changed since the version the client based its edit on."""
+    status_code = 409
+    default_detail = 'The resource was modified.'
+    default_code = 'conflict'
+    
+    def __init__(self, detail=None, code=None, content_version=None):
+        super().__init__(detail, code)
+        if content_version is not None:
+            # Kept as a number so the client can rebase on it
+            self.detail = {'detail': self.detail, 'content_version': content_version}
 
 
 class UserLoginSerializer(serializers.Serializer):
@@ -53,9 +73,23 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return data
     
     def create(self, validated_data):
+        """
+        Create the user, its blog and its token as one atomic unit
+        (three INSERTs, no lookups: a fresh user has neither).
+        """
         # Remove password_confirm before creating user
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(**validated_data)
+                Blog.objects.create(user=user, title=f"Blog de {user.username}")
+                Token.objects.create(user=user)  # Also cached as user.auth_token
+        except IntegrityError:
+            # A concurrent registration took the username after validation;
+            # any other constraint failure is a bug and must surface
+            if User.objects.filter(username=validated_data['username']).exists():
+                raise serializers.ValidationError({'username': ['A user with that username already exists.']})
+            raise
         return user
 
 class UserSerializer(serializers.ModelSerializer):
@@ -74,6 +108,21 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ['id', 'name']
 
+class DeletionJobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the progress of a background blog deletion.
+    """
+    progress = serializers.IntegerField(read_only=True)
+    url = serializers.HyperlinkedIdentityField(view_name='deletionjob-detail')
+    
+    class Meta:
+        model = DeletionJob
+        fields = [
+            'id', 'url', 'blog_id', 'status', 'total_posts', 'deleted_posts',
+            'progress', 'created_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
 class BlogSerializer(serializers.ModelSerializer):
     """
     Serializer for blog data with nested user information.
@@ -94,19 +143,185 @@ class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = [
-            'id', 'title', 'slug', 'content', 'excerpt', 
-            'cover', 'tags', 'is_published', 'created_at', 
-            'updated_at', 'published_at', 'blog'
+            'id', 'title', 'slug', 'content', 'content_html', 'excerpt', 
+            'summary', 'cover', 'tags', 'is_published', 'created_at', 
+            'updated_at', 'published_at', 'word_count', 'reading_time', 'blog'
+        ]
+        read_only_fields = [
+            'slug', 'content_html', 'summary', 'created_at', 'updated_at',
+            'word_count', 'reading_time'
+        ]
+
+class PostListSerializer(serializers.ModelSerializer):
+    """
+    Serializer for post listings: precomputed summary and reading stats
+    instead of the (large) HTML content.
+    """
+    blog = BlogSerializer(read_only=True)
+    tags = TagSerializer(many=True, read_only=True)
+    # Columns the listing querysets should not load
+    deferred_fields = ['content', 'content_html', 'content_text']
+    
+    class Meta:
+        model = Post
+        fields = [
+            'id', 'title', 'slug', 'excerpt', 'summary', 'cover', 'tags',
+            'is_published', 'created_at', 'updated_at', 'published_at',
+            'word_count', 'reading_time', 'blog'
         ]
-        read_only_fields = ['slug', 'created_at', 'updated_at']
+        read_only_fields = fields
+
+class PostRevisionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a post's revision history entries.
+    """
+    class Meta:
+        model = PostRevision
+        fields = ['version', 'is_snapshot', 'created_at']
+        read_only_fields = fields
+
+@extend_schema_field({
+    'oneOf': [
+        {'type': 'integer'},
+        {'type': 'string'},
+        {'type': 'object', 'properties': {'id': {'type': 'integer'}}, 'required': ['id']},
+        {'type': 'object', 'properties': {'name': {'type': 'string'}}, 'required': ['name']},
+    ]
+})
+class TagReferenceField(serializers.Field):
+    """
+    One tag, given as an id (a JSON integer or a string of ASCII digits), a
+    name, or an explicit {"id": ...} or {"name": ...} object; the object form
+    names a tag whose name is made of digits, such as "2024".
+    Validated as ('id', pk) or ('name', name).
+    """
+    default_error_messages = {
+        'invalid': 'Expected a tag id, a tag name or an object with either "id" or "name".',
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.id_field = serializers.IntegerField(min_value=1)
+        self.name_field = serializers.CharField(max_length=Tag._meta.get_field('name').max_length)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            if data.keys() == {'id'}:
+                return 'id', self.id_field.run_validation(data['id'])
+            if data.keys() == {'name'}:
+                return 'name', self.name_field.run_validation(data['name'])
+            self.fail('invalid')
+        if isinstance(data, bool) or not isinstance(data, (int, str)):
+            self.fail('invalid')
+        if isinstance(data, int) or (data.isascii() and data.isdecimal()):
+            return 'id', self.id_field.run_validation(data)
+        return 'name', self.name_field.run_validation(data)
+
+class TagReferencesField(serializers.ListField):
+    """
+    Tags given as ids or names (see TagReferenceField). Represented as the
+    list of tag ids.
+    """
+    child = TagReferenceField()
+
+    def to_representation(self, value):
+        return [tag.pk for tag in value.all()]
 
 class PostCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating/updating posts (simplified fields).
+    Tags are resolved in one query and unknown names are created.
+    Content can be updated with a diff-match-patch patch (content_patch)
+    against the version the client last saw (base_version).
     """
+    tags = TagReferencesField(required=False)
+    content_patch = serializers.CharField(write_only=True, required=False, trim_whitespace=False)
+    base_version = serializers.IntegerField(write_only=True, required=False, min_value=1)
+    
     class Meta:
         model = Post
         fields = [
             'title', 'content', 'excerpt', 'cover', 
-            'tags', 'is_published'
-        ]
\ No newline at end of file
+            'tags', 'is_published', 'content_version',
+            'content_patch', 'base_version'
+        ]
+        read_only_fields = ['content_version']
+    
+    def validate(self, attrs):
+        if 'content_patch' in attrs:
+            if 'content' in attrs:
+                raise serializers.ValidationError({'content_patch': 'Send either content or content_patch.'})
+            if self.instance is None:
+                raise serializers.ValidationError({'content_patch': 'Patches only apply to existing posts.'})
+            if 'base_version' not in attrs:
+                raise serializers.ValidationError({'base_version': 'This field is required with content_patch.'})
+            try:
+                attrs['content_patch'] = diff_match_patch().patch_fromText(attrs['content_patch'])
+            except ValueError:
+                raise serializers.ValidationError({'content_patch': 'Invalid patch.'})
+        return attrs
+    
+    def validate_tags(self, value):
+        """
+        Resolve every id and name with a single IN query. Returns the
+        references in order, Tag instances or names still to be created.
+        """
+        ids = {ref for kind, ref in value if kind == 'id'}
+        names = {ref for kind, ref in value if kind == 'name'}
+        found = Tag.objects.filter(Q(pk__in=ids) | Q(name__in=names)) if value else []
+        by_id = {tag.pk: tag for tag in found}
+        by_name = {tag.name: tag for tag in by_id.values()}
+        missing = sorted(ids - by_id.keys())
+        if missing:
+            raise serializers.ValidationError(
+                [f'Invalid pk "{pk}" - object does not exist.' for pk in missing]
+            )
+        return [by_id[ref] if kind == 'id' else by_name.get(ref, ref) for kind, ref in value]
+    
+    def create(self, validated_data):
+        tags = validated_data.pop('tags', None)
+        with transaction.atomic():
+            post = super().create(validated_data)
+            if tags is not None:
+                post.set_tags(self.upsert_tags(tags), created=True)
+        return post
+    
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        patches = validated_data.pop('content_patch', None)
+        base_version = validated_data.pop('base_version', None)
+        with transaction.atomic():
+            if base_version is not None:
+                # Lock the row: two edits of the same base cannot both win
+                # (without base_version, Post.save takes the lock itself)
+                current = Post.objects.select_for_update().only('content', 'content_version').get(pk=instance.pk)
+                if current.content_version != base_version:
+                    raise Conflict(
+                        'The content changed since base_version.',
+                        content_version=current.content_version
+                    )
+                if patches is not None:
+                    content, applied = diff_match_patch().patch_apply(patches, current.content)
+                    if not all(applied):
+                        raise serializers.ValidationError({'content_patch': 'The patch does not apply.'})
+                    validated_data['content'] = content
+            post = super().update(instance, validated_data)
+            if tags is not None:
+                post.set_tags(self.upsert_tags(tags))
+        return post
+    
+    def upsert_tags(self, refs):
+        """
+        Create the tags that were named but do not exist in one INSERT.
+        ignore_conflicts lets a concurrent request create the same name
+        first; the rows are then read back, whoever inserted them.
+        """
+        tags = [ref for ref in refs if isinstance(ref, Tag)]
+        names = {ref for ref in refs if not isinstance(ref, Tag)}
+        if names:
+            Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+            created = list(Tag.objects.filter(name__in=names))
+            # bulk_create sends no post_save, so invalidate like tag_saved does
+            invalidate_tags([tag.pk for tag in created])
+            tags += created
+        return tags
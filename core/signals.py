@@ -0,0 +1,170 @@
+# core/signals.py
+"""
+Signal handlers keeping derived and cached data in sync with the models.
+Cache invalidation runs on commit, so a concurrent request cannot re-cache
+the old state between the bump and the end of the transaction.
+"""
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_login_failed
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .archive import archive_key, move_post
+from .cache import bump_version
+from .metrics import AUTH_FAILURES
+from .models import Blog, CoverBlob, Post, PostRevision, PostTombstone, Tag
+from .object_cache import invalidate_objects
+from .related import mark_neighbourhood_stale, refresh_on_commit
+from .sitemaps import chunk_of
+
+
+def invalidate_post_feeds(blog_ids, tag_ids):
+    namespaces = ['feed:site', 'posts:published']
+    namespaces += [f'feed:blog:{pk}' for pk in blog_ids]
+    namespaces += [f'feed:tag:{pk}' for pk in tag_ids]
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+def invalidate_sitemap(post_id):
+    # The post's chunk (its id range) and the index, which shows its lastmod
+    namespaces = [f'sitemap:{chunk_of(post_id)}', 'sitemap:index']
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+def was_published(post):
+    return post.is_published or getattr(post, '_loaded_values', {}).get('is_published', False)
+
+
+def loaded_archive_key(post):
+    # Fields that were not loaded (deferred) cannot have changed
+    loaded = getattr(post, '_loaded_values', {})
+    return archive_key(
+        loaded.get('blog_id', post.blog_id),
+        loaded.get('is_published', post.is_published),
+        loaded.get('published_at', post.published_at),
+    )
+
+
+def change_cover_refs(name, delta):
+    if not name:
+        return
+    CoverBlob.objects.get_or_create(name=name)
+    CoverBlob.objects.filter(name=name).update(ref_count=F('ref_count') + delta, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    invalidate_objects(f'obj:post:{instance.pk}')
+    loaded = getattr(instance, '_loaded_values', {})
+    if created or instance.content_version != loaded.get('content_version', instance.content_version):
+        PostRevision.record(instance, None if created else loaded.get('content'))
+    old_cover = getattr(instance, '_loaded_values', {}).get('cover')
+    if instance.cover.name != old_cover:
+        change_cover_refs(instance.cover.name, 1)
+        change_cover_refs(old_cover, -1)
+    if not created and instance.is_published != loaded.get('is_published', instance.is_published):
+        mark_neighbourhood_stale([instance.pk])
+        refresh_on_commit([instance.pk])
+    move_post(None if created else loaded_archive_key(instance), archive_key(
+        instance.blog_id, instance.is_published, instance.published_at
+    ))
+    if was_published(instance):
+        tag_ids = [] if created else list(instance.tags.values_list('pk', flat=True))
+        invalidate_post_feeds([instance.blog_id], tag_ids)
+        invalidate_sitemap(instance.pk)
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, so collect the tags now
+    instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    invalidate_objects(f'obj:post:{instance.pk}')
+    PostTombstone.objects.create(post_id=instance.pk, blog_id=instance.blog_id)
+    change_cover_refs(instance.cover.name, -1)
+    move_post(loaded_archive_key(instance), None)
+    if was_published(instance):
+        invalidate_post_feeds([instance.blog_id], getattr(instance, '_deleted_tag_ids', []))
+        invalidate_sitemap(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if reverse:
+            instance._cleared_pks = list(instance.posts.values_list('pk', flat=True))
+        else:
+            instance._cleared_pks = list(instance.tags.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    pks = getattr(instance, '_cleared_pks', []) if action == 'post_clear' else list(pk_set)
+    post_ids = pks if reverse else [instance.pk]
+    invalidate_objects(*(f'obj:post:{pk}' for pk in post_ids))
+    # Old neighbours now; the posts that newly share tags once recomputed
+    mark_neighbourhood_stale(post_ids)
+    refresh_on_commit(post_ids)
+    if reverse:
+        # tag.posts.add(...): the tag's feed and the blogs of published posts
+        blog_ids = set(
+            Post.objects.filter(pk__in=pks, is_published=True).values_list('blog_id', flat=True)
+        )
+        invalidate_post_feeds(blog_ids, [instance.pk])
+    elif instance.is_published:
+        invalidate_post_feeds([instance.blog_id], pks)
+
+
+@receiver(post_save, sender=Blog)
+def blog_saved(sender, instance, **kwargs):
+    invalidate_objects(f'obj:blog:{instance.pk}')
+    # The blog is nested in every post of the published listing; the site
+    # archive and the sitemaps leave out blogs being deleted
+    transaction.on_commit(lambda: bump_version(
+        f'feed:blog:{instance.pk}', 'posts:published', 'posts:archive', 'sitemap'
+    ))
+
+
+def invalidate_tags(tag_ids):
+    """Bump the caches that show tags; also used after Tag bulk_create."""
+    namespaces = ['feed:site', 'posts:published', 'tags:index', *(f'feed:tag:{pk}' for pk in tag_ids)]
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, **kwargs):
+    invalidate_objects(f'obj:tag:{instance.pk}')
+    invalidate_tags([instance.pk])
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Tag)
+def blog_or_tag_deleted(sender, instance, **kwargs):
+    # Tag deletion removes through rows without m2m_changed; cached posts
+    # depend on their tags' namespaces, so they go stale too
+    invalidate_objects(f'obj:{sender._meta.model_name}:{instance.pk}')
+    if sender is Tag:
+        transaction.on_commit(lambda: bump_version('tags:index'))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Logging in only touches last_login, which cached blogs do not show
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    invalidate_objects(f'obj:user:{instance.pk}')
+    # Users are nested in the published listing as well
+    transaction.on_commit(lambda: bump_version('posts:published'))
+
+
+@receiver(user_login_failed)
+def login_failed(sender, **kwargs):
+    # Password logins (admin, browsable API); token failures are counted
+    # by core.metrics.exception_handler
+    AUTH_FAILURES.labels('invalid_credentials').inc()
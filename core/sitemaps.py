@@ -0,0 +1,123 @@
+# core/sitemaps.py
+"""
+XML sitemaps of the published posts.
+
+/sitemap.xml is a sitemap index pointing to /sitemap-posts-<n>.xml, where
+chunk n holds the published posts with ids in ((n-1)*SITEMAP_SIZE,
+n*SITEMAP_SIZE]. Id ranges never hold more than SITEMAP_SIZE posts, so every
+file stays within the protocol's 50,000 URL limit, and a post never moves to
+another chunk when it is edited; within a chunk the URLs are ordered by
+updated_at.
+
+A chunk is streamed from a database cursor while it is generated and kept in
+the cache afterwards, until a published post of its range changes (see
+core/signals.py), so one edit rebuilds one chunk and the index.
+"""
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+
+from .cache import get_versions, single_flight
+from .metrics import record_cache
+from .models import Post
+
+# Limit of the sitemaps protocol, per file
+MAX_URLS = 50000
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+
+
+def chunk_size():
+    return min(settings.SITEMAP_SIZE, MAX_URLS)
+
+
+def chunk_of(post_id):
+    """Number of the sitemap chunk listing this post."""
+    return (post_id - 1) // chunk_size() + 1
+
+
+def chunk_namespaces(number):
+    return ['sitemap', f'sitemap:{number}']
+
+
+def sitemap_posts():
+    return Post.objects.visible().filter(is_published=True)
+
+
+def chunk_lastmods():
+    """[(chunk number, latest updated_at)] of the chunks with posts."""
+    size = chunk_size()
+    return list(
+        sitemap_posts().order_by()
+        .annotate(chunk=(F('id') - 1) / size + 1)
+        .values('chunk').annotate(lastmod=Max('updated_at'))
+        .order_by('chunk').values_list('chunk', 'lastmod')
+    )
+
+
+def sitemap_index(request):
+    """Sitemap index listing every non-empty chunk and its last change."""
+    key = f'sitemap:index:{chunk_size()}'
+    chunks = single_flight(
+        key, chunk_lastmods, ['sitemap', 'sitemap:index'], timeout=settings.SITEMAP_CACHE_TIMEOUT
+    )
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for number, lastmod in chunks:
+        loc = request.build_absolute_uri(reverse('sitemap-posts', args=[number]))
+        parts.append(f'<sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod.isoformat()}</lastmod></sitemap>\n')
+    parts.append('</sitemapindex>\n')
+    return HttpResponse(''.join(parts), content_type=CONTENT_TYPE)
+
+
+def url_entries(request, number):
+    """Yield the <url> entries of a chunk, reading the posts from a cursor."""
+    size = chunk_size()
+    posts = (
+        sitemap_posts()
+        .filter(pk__gt=(number - 1) * size, pk__lte=number * size)
+        .only('id', 'slug', 'updated_at', 'cover')
+        .order_by('updated_at', 'id')
+    )
+    # Post URLs are site-relative: prefix them without parsing each one
+    origin = request.build_absolute_uri('/')[:-1]
+    for post in posts.iterator(chunk_size=2000):
+        loc = escape(origin + post.get_absolute_url())
+        entry = f'<url><loc>{loc}</loc><lastmod>{post.updated_at.isoformat()}</lastmod>'
+        if post.cover:
+            image = escape(request.build_absolute_uri(post.cover.url))
+            entry += f'<image:image><image:loc>{image}</image:loc></image:image>'
+        yield entry + '</url>\n'
+
+
+def sitemap_chunk(request, number):
+    """
+    One chunk of the post sitemap: served from the cache, or streamed from
+    the database and cached once it has been sent completely.
+    """
+    size = chunk_size()
+    key = f'sitemap:{size}:{number}:{request.get_host()}:{get_versions(chunk_namespaces(number))}'
+    cached = cache.get(key)
+    record_cache('sitemap', hits=cached is not None, misses=cached is None)
+    if cached is not None:
+        return HttpResponse(cached, content_type=CONTENT_TYPE)
+    if number < 1 or not sitemap_posts().filter(pk__gt=(number - 1) * size, pk__lte=number * size).exists():
+        raise Http404('Empty sitemap')
+
+    def generate():
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+            'xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">\n'
+        ]
+        yield parts[0]
+        for entry in url_entries(request, number):
+            parts.append(entry)
+            yield entry
+        parts.append('</urlset>\n')
+        yield parts[-1]
+        cache.set(key, ''.join(parts).encode(), settings.SITEMAP_CACHE_TIMEOUT)
+
+    return StreamingHttpResponse(generate(), content_type=CONTENT_TYPE)
@@ -0,0 +1,84 @@
+# core/storage.py
+"""
+Content-addressed file storage for post covers.
+
+Uploads are hashed while they are streamed to a temporary file, then moved
+to ``<upload_to>/<2 hex chars>/<sha256><ext>``. Identical images therefore
+share a single file; ``CoverBlob`` keeps a reference count per file and the
+``gc_covers`` management command deletes the ones no post uses any more.
+
+An upload that matches an existing file touches it, and files modified
+recently are never collected: between the upload and the post being saved
+the file is still counted as unused.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+DIGEST_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$')
+
+
+def is_content_addressed(name):
+    """Whether a stored name was produced by ContentAddressedStorage."""
+    return bool(DIGEST_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files after the SHA-256 of their content.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed in _save()
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        fd, temp_path = tempfile.mkstemp(dir=self.path(directory), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            final_name = os.path.join(directory, hexdigest[:2], hexdigest + extension).replace('\\', '/')
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                os.remove(temp_path)
+                # Reused: keep it out of gc_covers until the post references it
+                os.utime(final_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(temp_path, final_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(final_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return final_name
+
+
+def modified_within(storage, name, seconds):
+    """Whether a stored file was written or reused in the last `seconds`."""
+    try:
+        return time.time() - os.path.getmtime(storage.path(name)) < seconds
+    except FileNotFoundError:
+        return False
+
+
+def get_cover_storage():
+    return ContentAddressedStorage()
@@ -0,0 +1,84 @@
+# core/tag_index.py
+"""
+In-memory prefix index for tag autocomplete.
+
+Each worker keeps every tag name (case-folded) in a sorted list, so the tags
+starting with a prefix are a contiguous slice found with two binary
+searches; the slice is ranked by the number of posts using each tag. The
+best matches for the empty, one- and two-character prefixes, whose slices can
+hold a large part of the vocabulary, are precomputed when the index is
+built.
+
+The index is rebuilt when the 'tags:index' namespace is bumped (a tag was
+created, renamed or deleted) or after TAG_INDEX_REFRESH_SECONDS, which bounds
+how outdated the usage counts can be.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count
+
+from .cache import get_version
+from .models import Tag
+
+# Longest prefix whose top matches are precomputed
+SHORT_PREFIX = 2
+# Largest number of suggestions a request may ask for
+MAX_RESULTS = 50
+
+_index = None
+_lock = threading.Lock()
+
+
+class TagIndex:
+    """Immutable snapshot of the tag vocabulary, sorted by folded name."""
+
+    def __init__(self, rows, version):
+        # (folded name, -uses, name, pk, uses), ranked by usage, then name
+        entries = sorted((name.casefold(), -uses, name, pk, uses) for pk, name, uses in rows)
+        self.keys = [entry[0] for entry in entries]
+        self.entries = entries
+        self.version = version
+        self.built_at = time.monotonic()
+        groups = defaultdict(list)
+        for entry in entries:
+            for length in range(SHORT_PREFIX + 1):
+                if length <= len(entry[0]):
+                    groups[entry[0][:length]].append(entry)
+        self.top = {prefix: heapq.nsmallest(MAX_RESULTS, group, key=_rank) for prefix, group in groups.items()}
+
+    def search(self, prefix, limit):
+        """[(pk, name, uses)] of the most used tags starting with prefix."""
+        prefix = prefix.casefold()
+        if len(prefix) <= SHORT_PREFIX:
+            matches = self.top.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + '\U0010ffff', start)
+            matches = heapq.nsmallest(limit, self.entries[start:end], key=_rank)
+        return [(pk, name, uses) for _, _, name, pk, uses in matches]
+
+
+def _rank(entry):
+    return entry[1], entry[0], entry[2]
+
+
+def get_tag_index():
+    """This worker's index, rebuilt if tags changed or it is too old."""
+    global _index
+    version = get_version('tags:index')
+    index = _index
+    if (
+        index is None or index.version != version
+        or time.monotonic() - index.built_at > settings.TAG_INDEX_REFRESH_SECONDS
+    ):
+        with _lock:
+            if _index is index:
+                rows = Tag.objects.annotate(uses=Count('posts')).values_list('pk', 'name', 'uses')
+                _index = TagIndex(rows, version)
+            index = _index
+    return index
@@ -1,7 +1,11 @@
+from unittest import mock
+
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError
 from ..models import Blog, Post, Tag
 
 class APITestCase(APITestCase):
@@ -9,6 +13,7 @@ class APITestCase(APITestCase):
     
     def setUp(self):
         """Set up test data"""
+        cache.clear()  # /api/posts/published/ is cached
         self.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
@@ -190,4 +195,60 @@ class APITestCase(APITestCase):
         response = self.client.get('/api/posts/by_tag/?tag=Django')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Django Post')
\ No newline at end of file
+        self.assertEqual(response.data[0]['title'], 'Django Post')
+    
+    def test_user_registration_is_atomic(self):
+        """
+        Test that registration creates user, blog and token in few queries.
+        
+        PURPOSE: Verifica que el registro crea el usuario, su blog y su token
+        en una única transacción con el mínimo de consultas (comprobación de
+        unicidad + tres INSERT), y que un nombre de usuario repetido devuelve
+        400 sin dejar datos a medias.
+        """
+        data = {
+            'username': 'newuser',
+            'email': 'newuser@example.com',
+            'password': 'newpass123',
+            'password_confirm': 'newpass123'
+        }
+        self.client.credentials()  # Anonymous, as a real sign-up
+        # Exists check, SAVEPOINT, 3 INSERTs, RELEASE SAVEPOINT
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/users/register/', data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(username='newuser')
+        self.assertEqual(user.blog.title, 'Blog de newuser')
+        self.assertEqual(response.data['token'], user.auth_token.key)
+        
+        response = self.client.post('/api/users/register/', data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Blog.objects.filter(user__username='newuser').count(), 1)
+    
+    def test_registration_integrity_errors(self):
+        """
+        Test how registration reports database constraint failures.
+        
+        PURPOSE: Verifica que si otra petición registra el mismo nombre de
+        usuario entre la comprobación y el INSERT se devuelve 400 en el
+        campo username, y que cualquier otro error de integridad no se
+        disfraza de nombre repetido sino que se propaga.
+        """
+        data = {
+            'username': 'racer',
+            'password': 'newpass123',
+            'password_confirm': 'newpass123'
+        }
+        self.client.credentials()
+        # The other sign-up commits after this one passed the uniqueness check
+        User.objects.create_user(username='racer', password='otherpass123')
+        with mock.patch('rest_framework.validators.UniqueValidator.__call__', return_value=None):
+            response = self.client.post('/api/users/register/', data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('username', response.data)
+        
+        data['username'] = 'unlucky'
+        with mock.patch.object(Token.objects, 'create', side_effect=IntegrityError('other constraint')):
+            with self.assertRaises(IntegrityError):
+                self.client.post('/api/users/register/', data)
+        self.assertFalse(User.objects.filter(username='unlucky').exists())
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import Blog, Post, PostArchiveMonth
+
+
+def month(year, number):
+    return datetime(year, number, 15, 12, tzinfo=dt_timezone.utc)
+
+
+class ArchiveTest(APITestCase):
+    """Test the monthly archive rollups and endpoints"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.other_blog = Blog.objects.create(user=other, title='Other Blog')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.march = self.create(self.blog, month(2025, 3))
+            self.create(self.blog, month(2025, 3))
+            self.create(self.blog, month(2024, 12))
+            self.create(self.other_blog, month(2025, 3))
+            self.draft = Post.objects.create(blog=self.blog, title='Draft', content='<p>x</p>')
+
+    def create(self, blog, published_at):
+        return Post.objects.create(
+            blog=blog, title='Post', content='<p>x</p>', is_published=True, published_at=published_at
+        )
+
+    def counts(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(y['year'], m['month'], m['count']) for y in response.data for m in y['months']]
+
+    def test_archive_endpoints(self):
+        """
+        Test GET /api/posts/archive/ and /api/blogs/{id}/archive/.
+
+        PURPOSE: Verifica que el archivo agrupa los posts publicados por
+        año y mes (del más reciente al más antiguo) con el total de cada
+        año, que el de un blog solo cuenta sus posts y que se lee de la
+        tabla precalculada sin agrupar la tabla de posts.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/posts/archive/')
+        self.assertFalse([q for q in queries if 'core_post"' in q['sql']])
+        self.assertEqual(response.data[0], {
+            'year': 2025, 'count': 3, 'months': [{'month': 3, 'count': 3}],
+        })
+        self.assertEqual(self.counts('/api/posts/archive/'), [(2025, 3, 3), (2024, 12, 1)])
+        self.assertEqual(self.counts(f'/api/blogs/{self.blog.pk}/archive/'), [(2025, 3, 2), (2024, 12, 1)])
+        self.assertEqual(self.counts(f'/api/blogs/{self.other_blog.pk}/archive/'), [(2025, 3, 1)])
+
+    def test_rollups_follow_publication_changes(self):
+        """
+        Test that publishing, unpublishing, re-dating and deleting update the counts.
+
+        PURPOSE: Verifica que las señales mueven cada post al mes que le
+        corresponde al publicarlo, despublicarlo, cambiar su fecha de
+        publicación o borrarlo, y que el archivo del sitio en caché se
+        invalida al confirmarse el cambio.
+        """
+        self.counts('/api/posts/archive/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.is_published = True
+            self.draft.published_at = month(2025, 1)
+            self.draft.save()
+            self.march.published_at = month(2025, 1)
+            self.march.save()
+        self.assertEqual(self.counts('/api/posts/archive/'), [(2025, 3, 2), (2025, 1, 2), (2024, 12, 1)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.draft.is_published = False
+            self.draft.save()
+            self.march.delete()
+        self.assertEqual(self.counts('/api/posts/archive/'), [(2025, 3, 2), (2024, 12, 1)])
+
+    def test_rebuild_command(self):
+        """
+        Test rebuild_archive.
+
+        PURPOSE: Verifica que el comando recalcula los totales a partir de
+        los posts publicados, corrigiendo filas perdidas o desajustadas.
+        """
+        PostArchiveMonth.objects.filter(blog=self.other_blog).delete()
+        PostArchiveMonth.objects.filter(blog=self.blog, year=2025).update(count=7)
+        call_command('rebuild_archive', stdout=StringIO())
+        self.assertEqual(self.counts('/api/posts/archive/'), [(2025, 3, 3), (2024, 12, 1)])
+        self.assertEqual(self.counts(f'/api/blogs/{self.blog.pk}/archive/'), [(2025, 3, 2), (2024, 12, 1)])
@@ -0,0 +1,81 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from ..models import Blog, Post, Tag
+
+
+class BatchTest(APITestCase):
+    """Test the batch request endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.post = Post.objects.create(blog=self.blog, title='Batched', content='<p>x</p>')
+        Tag.objects.create(name='python')
+
+    def batch(self, *requests):
+        return self.client.post('/api/batch/', {'requests': list(requests)}, format='json')
+
+    def test_runs_subrequests_in_order(self):
+        """
+        Test that several API calls are answered in one response.
+
+        PURPOSE: Verifica que /api/batch/ ejecuta varias peticiones (lectura
+        y escritura) en orden, autenticando una sola vez, y devuelve el
+        estado y el cuerpo de cada una.
+        """
+        response = self.batch(
+            {'method': 'GET', 'path': f'/api/posts/{self.post.pk}/'},
+            {'method': 'GET', 'path': f'/api/blogs/{self.blog.pk}/'},
+            {'method': 'GET', 'path': '/api/tags/?page=1'},
+            {'method': 'PATCH', 'path': f'/api/posts/{self.post.pk}/', 'body': {'title': 'Renamed'}},
+            {'method': 'GET', 'path': '/api/posts/999999/'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['responses']
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 200, 404])
+        self.assertEqual(results[0]['body']['title'], 'Batched')
+        self.assertEqual(results[1]['body']['title'], 'Test Blog')
+        self.assertEqual(results[2]['body']['results'][0]['name'], 'python')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.title, 'Renamed')
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_limits_and_allowed_paths(self):
+        """
+        Test batch size limit and path restrictions.
+
+        PURPOSE: Verifica que se rechazan los lotes demasiado grandes, las
+        rutas fuera de /api/ o a /api/batch/ (anidar lotes), y que sin
+        autenticación no se puede usar el endpoint.
+        """
+        get = {'method': 'GET', 'path': '/api/tags/'}
+        self.assertEqual(self.batch(get, get, get).status_code, status.HTTP_400_BAD_REQUEST)
+        results = self.batch(
+            {'method': 'GET', 'path': '/admin/'},
+            {'method': 'POST', 'path': '/api/batch/'},
+        ).data['responses']
+        self.assertEqual([result['status'] for result in results], [400, 400])
+        self.client.credentials()
+        self.assertEqual(self.batch(get).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_plain_django_views(self):
+        """
+        Test sub-requests answered by non-DRF views.
+
+        PURPOSE: Verifica que una sub-petición a una vista de Django que
+        devuelve una TemplateResponse (el login de la API navegable) se
+        renderiza y devuelve su HTML en lugar de provocar un error 500.
+        """
+        response = self.batch({'method': 'GET', 'path': '/api/api-auth/login/'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['responses'][0]
+        self.assertEqual(result['status'], 200)
+        self.assertIn('<form', result['body'])
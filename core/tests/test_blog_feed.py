@@ -0,0 +1,107 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from ..models import Blog, Post
+
+
+class BlogFeedTest(APITestCase):
+    """Test the per-blog post feed endpoints"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        other_user = User.objects.create_user(username='otheruser', password='otherpass123')
+        self.other_blog = Blog.objects.create(user=other_user, title='Other Blog')
+
+        for i in range(5):
+            Post.objects.create(
+                blog=self.blog,
+                title=f'Post {i}',
+                content='<p>Test content</p>',
+                is_published=i % 2 == 0
+            )
+        Post.objects.create(blog=self.other_blog, title='Other Post', content='<p>Other</p>')
+
+    def test_blog_posts_only_lists_that_blog(self):
+        """
+        Test that the feed only contains posts of the requested blog.
+
+        PURPOSE: Verifica que /api/blogs/<id>/posts/ devuelve los posts de
+        ese blog (incluidos los de otros autores) y nunca los de otro blog.
+        """
+        response = self.client.get(f'/api/blogs/{self.other_blog.id}/posts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['title'] for post in response.data['results']], ['Other Post'])
+
+    def test_blog_published_posts(self):
+        """
+        Test the published posts feed of a blog.
+
+        PURPOSE: Verifica que /api/blogs/<id>/posts/published/ devuelve solo
+        los posts publicados del blog, del más reciente al más antiguo.
+        """
+        response = self.client.get(f'/api/blogs/{self.blog.id}/posts/published/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['title'] for post in response.data['results']],
+            ['Post 4', 'Post 2', 'Post 0']
+        )
+
+    def test_keyset_pagination_walks_all_posts(self):
+        """
+        Test that following the cursors returns every post exactly once.
+
+        PURPOSE: Verifica que la paginación por cursor (keyset) recorre todos
+        los posts del blog sin repetir ni saltarse ninguno.
+        """
+        url = f'/api/blogs/{self.blog.id}/posts/?page_size=2'
+        titles = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(post['title'] for post in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(titles, [f'Post {i}' for i in reversed(range(5))])
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor is rejected.
+
+        PURPOSE: Verifica que un cursor manipulado devuelve 404 en lugar
+        de un error del servidor.
+        """
+        response = self.client.get(f'/api/blogs/{self.blog.id}/posts/?cursor=nope')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unknown_blog(self):
+        """
+        Test the feed of a blog that does not exist.
+
+        PURPOSE: Verifica que pedir los posts de un blog inexistente
+        devuelve 404 en lugar de una lista vacía.
+        """
+        response = self.client.get('/api/blogs/9999/posts/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_feed_is_cacheable(self):
+        """
+        Test the caching headers of the feed.
+
+        PURPOSE: Verifica que la respuesta lleva ETag y Cache-Control, y que
+        una petición condicional con el mismo ETag recibe 304 Not Modified.
+        """
+        url = f'/api/blogs/{self.blog.id}/posts/'
+        response = self.client.get(url)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase, override_settings
+from ..checks import LOCMEM_BACKEND, check_shared_cache
+
+LOCMEM = {'default': {'BACKEND': LOCMEM_BACKEND}}
+DATABASE_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'django_cache'}}
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    """Test the warning for per-process caches with several workers"""
+
+    def test_locmem_with_several_workers(self):
+        """
+        Test the core.W001 system check.
+
+        PURPOSE: Verifica que se avisa cuando la caché es local a cada
+        proceso y gunicorn arranca varios workers (las invalidaciones de un
+        worker no llegarían a los demás), y que no se avisa con un solo
+        worker ni con una caché compartida.
+        """
+        with override_settings(CACHES=LOCMEM, WEB_CONCURRENCY=3, TESTING=False):
+            self.assertEqual([warning.id for warning in check_shared_cache(None)], ['core.W001'])
+        with override_settings(CACHES=LOCMEM, WEB_CONCURRENCY=1, TESTING=False):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(CACHES=DATABASE_CACHE, WEB_CONCURRENCY=3, TESTING=False):
+            self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from ..content import make_summary, render_content
+from ..models import Blog, Post
+
+
+class RenderContentTest(TestCase):
+    """Test HTML sanitizing and text extraction"""
+
+    def test_sanitize_removes_scripts_and_handlers(self):
+        """
+        Test that unsafe markup is removed.
+
+        PURPOSE: Verifica que el HTML de TinyMCE se sanea: se eliminan los
+        <script>, los atributos de eventos (onclick...) y las URLs javascript:,
+        pero se conserva el formato permitido.
+        """
+        html, text, words = render_content(
+            '<p onclick="x()">Hola <strong>mundo</strong><script>alert(1)</script></p>'
+            '<a href="javascript:alert(1)">malo</a><a href="https://example.com">bueno</a>'
+        )
+        self.assertEqual(
+            html,
+            '<p>Hola <strong>mundo</strong></p><a>malo</a><a href="https://example.com">bueno</a>'
+        )
+        self.assertNotIn('alert', text)
+
+    def test_plain_text_and_word_count(self):
+        """
+        Test plain text extraction.
+
+        PURPOSE: Verifica que la versión en texto plano separa los bloques
+        en líneas, decodifica entidades y cuenta las palabras.
+        """
+        html, text, words = render_content('<h1>Título</h1><p>Uno &amp; dos<br>tres</p>')
+        self.assertEqual(text, 'Título\nUno & dos\ntres')
+        self.assertEqual(words, 5)
+
+    def test_summary_truncates_words(self):
+        """
+        Test summary truncation.
+
+        PURPOSE: Verifica que el resumen automático se corta por palabras
+        completas y añade puntos suspensivos.
+        """
+        self.assertEqual(make_summary('uno dos tres', words=2), 'uno dos…')
+        self.assertEqual(make_summary('uno dos', words=2), 'uno dos')
+
+
+class PostContentTest(APITestCase):
+    """Test the derived content columns of Post"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()  # Post, blog and tag objects are cached by id
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+
+    def test_derived_fields_on_save(self):
+        """
+        Test that saving a post renders its content.
+
+        PURPOSE: Verifica que al guardar un post se generan el HTML saneado,
+        el texto plano, el resumen automático (si no hay excerpt), el número
+        de palabras y el tiempo de lectura, y que se recalculan al editar.
+        """
+        post = Post.objects.create(
+            blog=self.blog,
+            title='Test Post',
+            content='<p>' + 'palabra ' * 250 + '</p><script>x</script>'
+        )
+        self.assertEqual(post.word_count, 250)
+        self.assertEqual(post.reading_time, 2)
+        self.assertNotIn('script', post.content_html)
+        self.assertTrue(post.summary.endswith('…'))
+
+        post = Post.objects.get(pk=post.pk)
+        post.content = '<p>Corto</p>'
+        post.excerpt = 'Mi resumen'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.content_text, 'Corto')
+        self.assertEqual(post.summary, 'Mi resumen')
+
+    def test_list_does_not_serve_content(self):
+        """
+        Test that listings omit the large content fields.
+
+        PURPOSE: Verifica que el listado de posts sirve el resumen y las
+        estadísticas precalculadas sin incluir el contenido HTML completo,
+        que sigue disponible en el detalle.
+        """
+        post = Post.objects.create(blog=self.blog, title='Test Post', content='<p>Texto</p>')
+        item = self.client.get('/api/posts/').data['results'][0]
+        self.assertNotIn('content', item)
+        self.assertEqual(item['summary'], 'Texto')
+        detail = self.client.get(f'/api/posts/{post.id}/').data
+        self.assertEqual(detail['content_html'], '<p>Texto</p>')
@@ -0,0 +1,139 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache.backends.db import DatabaseCache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from mysite.db_router import (
+    PIN_COOKIE_NAME, PrimaryPinningMiddleware, PrimaryReplicaRouter, use_replicas
+)
+from ..models import Blog, Post
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    """Test read/write routing decisions"""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def run_request(self, view, cookies=None):
+        request = self.factory.get('/api/posts/')
+        request.COOKIES.update(cookies or {})
+        return PrimaryPinningMiddleware(view)(request)
+
+    def test_reads_use_primary_outside_requests(self):
+        """
+        Test that reads default to the primary.
+
+        PURPOSE: Verifica que fuera de una petición (comandos, shell, admin)
+        todas las lecturas van a la base de datos principal.
+        """
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_safe_reads_use_replica(self):
+        """
+        Test that reads of a safe API request go to a replica.
+
+        PURPOSE: Verifica que cuando una vista de solo lectura activa las
+        réplicas, las lecturas se envían a una de ellas.
+        """
+        def view(request):
+            use_replicas()
+            return HttpResponse(self.router.db_for_read(Post))
+
+        response = self.run_request(view)
+        self.assertEqual(response.content, b'replica_1')
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_write_pins_request_to_primary(self):
+        """
+        Test read-your-writes after a write.
+
+        PURPOSE: Verifica que tras una escritura, el resto de la petición
+        lee de la base de datos principal y que se envía la cookie que
+        mantiene al cliente en el primario durante unos segundos.
+        """
+        def view(request):
+            use_replicas()
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            return HttpResponse(self.router.db_for_read(Post) or 'default')
+
+        response = self.run_request(view)
+        self.assertEqual(response.content, b'default')
+        self.assertEqual(response.cookies[PIN_COOKIE_NAME]['max-age'], 5)
+
+    def test_pin_cookie_keeps_client_on_primary(self):
+        """
+        Test that a pinned client keeps reading from the primary.
+
+        PURPOSE: Verifica que un cliente con la cookie de fijación lee del
+        primario aunque la petición sea de solo lectura.
+        """
+        def view(request):
+            use_replicas()
+            return HttpResponse(self.router.db_for_read(Post) or 'default')
+
+        response = self.run_request(view, cookies={PIN_COOKIE_NAME: '1'})
+        self.assertEqual(response.content, b'default')
+
+    def test_database_cache_uses_primary_without_pinning(self):
+        """
+        Test routing of DatabaseCache entries.
+
+        PURPOSE: Verifica que la caché en base de datos (contadores de
+        versión incluidos) se lee siempre del primario, para no ver
+        invalidaciones con retraso, y que escribir en ella no fija al
+        cliente en el primario.
+        """
+        cache_model = DatabaseCache('django_cache', {}).cache_model_class
+
+        def view(request):
+            use_replicas()
+            self.assertEqual(self.router.db_for_write(cache_model), 'default')
+            return HttpResponse(self.router.db_for_read(cache_model))
+
+        response = self.run_request(view)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_replicas_are_not_migrated(self):
+        """
+        Test that migrations never run on replicas.
+
+        PURPOSE: Verifica que las réplicas reciben el esquema por replicación
+        y no se migran directamente.
+        """
+        self.assertFalse(self.router.allow_migrate('replica_1', 'core'))
+        self.assertIsNone(self.router.allow_migrate('default', 'core'))
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'Set DATABASE_REPLICA_URLS to run replica integration tests')
+class ReplicaIntegrationTest(TransactionTestCase):
+    """Test routing against real replica connections (test mirrors)"""
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        Post.objects.create(blog=self.blog, title='Test Post', content='<p>Test</p>')
+
+    def test_post_list_reads_from_replica(self):
+        """
+        Test that GET /api/posts/ queries a replica.
+
+        PURPOSE: Verifica con dos conexiones reales que el listado de posts
+        se lee de la réplica configurada y no del primario.
+        """
+        replica = connections[settings.DATABASE_REPLICAS[0]]
+        with override_settings(DATABASE_REPLICAS=settings.DATABASE_REPLICAS[:1]):
+            with CaptureQueriesContext(replica) as queries:
+                response = self.client.get('/api/posts/', HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any('core_post' in query['sql'] for query in queries.captured_queries))
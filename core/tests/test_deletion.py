@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from ..cache import get_version
+from ..deletion import schedule_blog_deletion
+from ..models import Blog, CoverBlob, DeletionJob, Post, PostTombstone, Tag
+from .test_storage import make_image
+
+
+class BlogDeletionTest(APITestCase):
+    """Test background deletion of blogs"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.tag = Tag.objects.create(name='python')
+        for i in range(5):
+            post = Post.objects.create(blog=self.blog, title=f'Post {i}', content='<p>x</p>', is_published=True)
+            post.tags.add(self.tag)
+        self.post = post
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_delete_is_synchronous_by_default(self):
+        """
+        Test that DELETE /api/blogs/{id}/ deletes the blog and its posts.
+
+        PURPOSE: Verifica que, sin pedir el borrado en segundo plano, la
+        petición borra el blog y sus posts y devuelve 204 sin crear ningún
+        trabajo de borrado.
+        """
+        response = self.client.delete(f'/api/blogs/{self.blog.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Blog.objects.filter(pk=self.blog.pk).exists())
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(DeletionJob.objects.exists())
+
+    def test_background_delete_hides_blog_immediately(self):
+        """
+        Test that DELETE /api/blogs/{id}/?background=true answers 202.
+
+        PURPOSE: Verifica que el borrado en segundo plano no borra nada en
+        la petición: devuelve 202 con el trabajo de borrado, y el blog y sus
+        posts dejan de aparecer en la API aunque sigan en la base de datos.
+        """
+        response = self.client.delete(f'/api/blogs/{self.blog.pk}/?background=true')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], DeletionJob.PENDING)
+        self.assertEqual(response.data['total_posts'], 5)
+        self.assertEqual(response['Location'], response.data['url'])
+        self.assertEqual(Post.objects.count(), 5)
+
+        self.assertEqual(self.client.get('/api/blogs/').data['count'], 0)
+        self.assertEqual(self.client.get('/api/posts/').data['count'], 0)
+        response = self.client.get(f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post('/api/posts/', {'title': 'Late', 'content': '<p>x</p>'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_job_status_endpoint(self):
+        """
+        Test GET /api/deletion-jobs/{id}/ during and after the deletion.
+
+        PURPOSE: Verifica que la URL devuelta con el 202 permite seguir el
+        progreso del borrado hasta que termina (aunque el blog ya no
+        exista), y que otros usuarios no ven el trabajo.
+        """
+        response = self.client.delete(f'/api/blogs/{self.blog.pk}/?background=true')
+        url = response['Location']
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['status'], response.data['progress']), (DeletionJob.PENDING, 0))
+
+        call_command('process_deletions', stdout=StringIO())
+        response = self.client.get(url)
+        self.assertEqual((response.data['status'], response.data['progress']), (DeletionJob.DONE, 100))
+        self.assertEqual(self.client.get('/api/deletion-jobs/').data['count'], 1)
+
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=other).key)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/deletion-jobs/').data['count'], 0)
+        self.assertEqual(self.client.put(url, {}).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_process_deletions_in_batches(self):
+        """
+        Test that process_deletions removes posts in batches, then the blog.
+
+        PURPOSE: Verifica que el comando borra los posts en lotes del tamaño
+        indicado registrando el progreso, deja tombstones para la
+        sincronización, invalida los feeds de los tags de los posts
+        borrados, elimina las portadas que ya no se usan y, si se pidió,
+        también el usuario.
+        """
+        self.post.cover = make_image()
+        self.post.save()
+        cover = self.post.cover.name
+        # Uploaded long ago: recently written files are left to gc_covers
+        old = time.time() - 2 * CoverBlob.GRACE_SECONDS
+        os.utime(self.post.cover.path, (old, old))
+        job = schedule_blog_deletion(self.blog, delete_user=True)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_active)
+
+        tag_feed_version = get_version(f'feed:tag:{self.tag.pk}')
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('process_deletions', batch_size=2, stdout=out)
+        self.assertNotEqual(get_version(f'feed:tag:{self.tag.pk}'), tag_feed_version)
+        self.assertIn('2/5 posts', out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual(job.status, DeletionJob.DONE)
+        self.assertEqual((job.deleted_posts, job.deleted_covers, job.progress), (5, 1, 100))
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Post.tags.through.objects.exists())
+        self.assertEqual(PostTombstone.objects.count(), 5)
+        self.assertFalse(Blog.objects.filter(pk=self.blog.pk).exists())
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(CoverBlob.objects.filter(name=cover).exists())
+        self.assertFalse(self.post.cover.storage.exists(cover))
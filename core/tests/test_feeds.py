@@ -0,0 +1,107 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from ..models import Blog, Post, Tag
+
+
+class FeedTest(TestCase):
+    """Test RSS, Atom and JSON Feed output"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.tag = Tag.objects.create(name='Django')
+        self.post = Post.objects.create(
+            blog=self.blog,
+            title='Published Post',
+            content='<p>Full content</p>',
+            excerpt='Short excerpt',
+            is_published=True
+        )
+        self.post.tags.add(self.tag)
+        Post.objects.create(blog=self.blog, title='Draft Post', content='<p>Draft</p>')
+
+    def test_rss_feed(self):
+        """
+        Test the site-wide RSS feed.
+
+        PURPOSE: Verifica que el feed RSS es público, contiene solo los posts
+        publicados e incluye el HTML completo en content:encoded.
+        """
+        response = self.client.get('/feeds/rss/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Published Post')
+        self.assertContains(response, '<content:encoded>&lt;p&gt;Full content&lt;/p&gt;</content:encoded>')
+        self.assertNotContains(response, 'Draft Post')
+
+    def test_atom_and_json_feeds(self):
+        """
+        Test the Atom and JSON Feed formats.
+
+        PURPOSE: Verifica que los formatos Atom y JSON Feed se generan
+        con los mismos posts que el RSS.
+        """
+        response = self.client.get('/feeds/atom/')
+        self.assertContains(response, '<content type="html">')
+        response = self.client.get('/feeds/json/')
+        data = json.loads(response.content)
+        self.assertEqual(data['version'], 'https://jsonfeed.org/version/1.1')
+        self.assertEqual([item['title'] for item in data['items']], ['Published Post'])
+        self.assertEqual(data['items'][0]['tags'], ['Django'])
+
+    def test_item_links_resolve(self):
+        """
+        Test that the feed items link to an existing page.
+
+        PURPOSE: Verifica que el enlace de cada entrada del feed
+        (Post.get_absolute_url) apunta a la página pública del post y que
+        esa página responde, en lugar de un enlace sin ruta.
+        """
+        data = json.loads(self.client.get('/feeds/json/').content)
+        url = data['items'][0]['url']
+        self.assertTrue(url.endswith(reverse('post_detail', args=[self.post.slug])))
+        response = self.client.get(url)
+        self.assertContains(response, 'Published Post')
+
+    def test_blog_and_tag_feeds(self):
+        """
+        Test the per-blog and per-tag feeds.
+
+        PURPOSE: Verifica que los feeds por blog y por tag devuelven sus
+        posts y que un blog o tag inexistente devuelve 404.
+        """
+        self.assertContains(self.client.get(f'/feeds/blogs/{self.blog.id}/rss/'), 'Published Post')
+        self.assertContains(self.client.get('/feeds/tags/Django/json/'), 'Published Post')
+        self.assertEqual(self.client.get('/feeds/tags/Nope/rss/').status_code, 404)
+        self.assertEqual(self.client.get('/feeds/xml/').status_code, 404)
+
+    def test_if_modified_since(self):
+        """
+        Test conditional requests.
+
+        PURPOSE: Verifica que un lector que envía If-Modified-Since con la
+        fecha de la última respuesta recibe 304 Not Modified.
+        """
+        response = self.client.get('/feeds/rss/')
+        response = self.client.get('/feeds/rss/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_invalidated_on_publish(self):
+        """
+        Test that publishing a post refreshes the cached feed.
+
+        PURPOSE: Verifica que el feed cacheado se invalida al publicar un
+        post, de modo que el nuevo post aparece en la siguiente petición.
+        """
+        self.assertNotContains(self.client.get('/feeds/rss/'), 'Draft Post')
+        draft = Post.objects.get(title='Draft Post')
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.is_published = True
+            draft.save()
+        self.assertContains(self.client.get('/feeds/rss/'), 'Draft Post')
+        self.assertContains(self.client.get(f'/feeds/blogs/{self.blog.id}/rss/'), 'Draft Post')
@@ -0,0 +1,33 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Post
+
+
+class HotQueriesTest(TestCase):
+    """Test the EXPLAIN checks for the registered hot queries"""
+
+    def test_hot_queries_use_indexes(self):
+        """
+        Test that no hot query falls back to a sequential scan.
+
+        PURPOSE: Verifica que las consultas más frecuentes (feed publicado,
+        feed por blog, posts por tag y búsqueda por slug) se resuelven con
+        los índices de las migraciones sobre un conjunto de datos sembrado.
+        Si alguna hace un escaneo secuencial, el comando falla.
+        """
+        out = StringIO()
+        call_command('explain_hot_queries', seed=500, stdout=out)
+        self.assertNotIn('sequential scan', out.getvalue())
+
+    def test_seeded_dataset_is_rolled_back(self):
+        """
+        Test that the seeded dataset does not persist.
+
+        PURPOSE: Verifica que los datos creados con --seed se descartan al
+        terminar el comando, para poder ejecutarlo contra bases de datos reales.
+        """
+        call_command('explain_hot_queries', seed=100, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 0)
@@ -0,0 +1,91 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from prometheus_client import REGISTRY
+from ..models import Blog, Post
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(APITestCase):
+    """Test the Prometheus metrics endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.staff_token = Token.objects.create(user=self.staff)
+        blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.post = Post.objects.create(blog=blog, title='Post', content='<p>x</p>')
+
+    def test_metrics_restricted_to_staff_and_allowed_ips(self):
+        """
+        Test who can read /metrics.
+
+        PURPOSE: Verifica que /metrics solo es accesible para usuarios staff
+        (por sesión o token) o desde las IPs configuradas en
+        METRICS_ALLOWED_IPS, y que devuelve el formato de Prometheus.
+        """
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.staff_token.key)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'http_requests_total', response.content)
+
+        self.client.credentials()
+        with override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8']):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='10.1.2.3').status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_requests_queries_cache_and_auth_failures_recorded(self):
+        """
+        Test the recorded request, database, cache and auth samples.
+
+        PURPOSE: Verifica que cada petición suma en el contador y el
+        histograma de su vista, que se registran las consultas SQL, que la
+        caché de objetos cuenta aciertos y fallos, y que un token inválido
+        cuenta como fallo de autenticación.
+        """
+        requests = sample('http_requests_total', view='post-detail', method='GET', status='200')
+        latency = sample('http_request_duration_seconds_count', view='post-detail')
+        queries = sample('http_request_db_queries_sum', view='post-detail')
+        misses = sample('cache_requests_total', cache='object:post', result='miss')
+        hits = sample('cache_requests_total', cache='object:post', result='hit')
+        failures = sample('auth_failures_total', reason='invalid_credentials')
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.client.get(f'/api/posts/{self.post.pk}/')
+        self.client.get(f'/api/posts/{self.post.pk}/')
+        self.client.credentials(HTTP_AUTHORIZATION='Token wrong')
+        self.client.get('/api/posts/')
+
+        self.assertEqual(sample('http_requests_total', view='post-detail', method='GET', status='200'), requests + 2)
+        self.assertEqual(sample('http_request_duration_seconds_count', view='post-detail'), latency + 2)
+        self.assertGreater(sample('http_request_db_queries_sum', view='post-detail'), queries)
+        self.assertEqual(sample('cache_requests_total', cache='object:post', result='miss'), misses + 1)
+        self.assertEqual(sample('cache_requests_total', cache='object:post', result='hit'), hits + 1)
+        self.assertEqual(sample('auth_failures_total', reason='invalid_credentials'), failures + 1)
+
+    def test_unknown_methods_share_one_label(self):
+        """
+        Test that non-standard HTTP methods are recorded as 'other'.
+
+        PURPOSE: Verifica que un método arbitrario enviado por el cliente
+        no crea una serie nueva en http_requests_total, sino que se cuenta
+        con method="other".
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        other = sample('http_requests_total', view='post-detail', method='other', status='405')
+        response = self.client.generic('FOOBAR', f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(sample('http_requests_total', view='post-detail', method='other', status='405'), other + 1)
+        self.assertEqual(sample('http_requests_total', view='post-detail', method='FOOBAR', status='405'), 0)
@@ -0,0 +1,141 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from ..cache import get_version
+from ..models import Blog, Post, Tag
+from ..object_cache import blog_cache, post_cache
+
+
+class ObjectCacheTest(TestCase):
+    """Test the Post/Blog/Tag object cache"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.tag = Tag.objects.create(name='python')
+        self.first = Post.objects.create(blog=self.blog, title='First', content='<p>1</p>')
+        self.second = Post.objects.create(blog=self.blog, title='Second', content='<p>2</p>')
+        self.first.tags.add(self.tag)
+
+    def test_get_many_uses_cache_after_first_load(self):
+        """
+        Test that objects are loaded once and then served from the cache.
+
+        PURPOSE: Verifica que la primera lectura múltiple carga todos los
+        posts con una sola consulta (más la de los tags) y que las
+        siguientes no tocan la base de datos.
+        """
+        with self.assertNumQueries(2):  # Posts with blog and user, then tags
+            posts = post_cache.get_many([self.first.pk, self.second.pk, 999999])
+        self.assertEqual(set(posts), {self.first.pk, self.second.pk})
+        with self.assertNumQueries(0):
+            posts = post_cache.get_many([str(self.first.pk), self.second.pk])
+        self.assertEqual(posts[self.first.pk].blog.user.username, 'testuser')
+        self.assertEqual([tag.name for tag in posts[self.first.pk].tags.all()], ['python'])
+
+    def test_invalidated_by_own_and_related_saves(self):
+        """
+        Test that saving a post, its blog or its tags refreshes cached posts.
+
+        PURPOSE: Verifica que las señales invalidan el post cacheado cuando
+        cambia el propio post o los objetos que incluye (blog y tags).
+        """
+        post_cache.get(self.first.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.title = 'Renamed'
+            self.first.save()
+        self.assertEqual(post_cache.get(self.first.pk).title, 'Renamed')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.title = 'New Blog Title'
+            self.blog.save()
+        self.assertEqual(post_cache.get(self.first.pk).blog.title, 'New Blog Title')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = 'django'
+            self.tag.save()
+        self.assertEqual([tag.name for tag in post_cache.get(self.first.pk).tags.all()], ['django'])
+
+    def test_lookup_by_slug_and_user(self):
+        """
+        Test lookups by Post.slug and Blog.user_id.
+
+        PURPOSE: Verifica las búsquedas por slug y por usuario, y que un
+        slug que ya no corresponde al post no devuelve el objeto antiguo.
+        """
+        self.assertEqual(post_cache.get_by('slug', 'first').pk, self.first.pk)
+        self.assertEqual(blog_cache.get_by('user_id', self.user.pk).pk, self.blog.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.slug = 'moved'
+            self.first.save()
+        self.assertIsNone(post_cache.get_by('slug', 'first'))
+        self.assertEqual(post_cache.get_many_by('slug', ['moved', 'second']).keys(), {'moved', 'second'})
+
+    def test_last_login_does_not_invalidate(self):
+        """
+        Test that logging in does not invalidate the user's cached objects.
+
+        PURPOSE: Verifica que actualizar solo last_login (lo que hace el
+        login) no invalida la caché de los objetos del usuario.
+        """
+        version = get_version(f'obj:user:{self.user.pk}')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(get_version(f'obj:user:{self.user.pk}'), version)
+
+
+class CachedRetrieveTest(APITestCase):
+    """Test post retrieval through the object cache"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.post = Post.objects.create(blog=self.blog, title='Cached', content='<p>x</p>')
+
+    @override_settings(VIEW_COUNT_FLUSH_SECONDS=3600)  # No view counter flush in between
+    def test_retrieve_is_served_from_cache(self):
+        """
+        Test that a repeated GET /api/posts/{id}/ does not query the posts.
+
+        PURPOSE: Verifica que el detalle de un post se sirve desde la caché
+        de objetos (solo queda la consulta de autenticación) y que un id
+        inexistente sigue devolviendo 404.
+        """
+        self.client.get(f'/api/posts/{self.post.pk}/')
+        with self.assertNumQueries(1):  # Token authentication
+            response = self.client.get(f'/api/posts/{self.post.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Cached')
+        response = self.client.get('/api/posts/999999/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_by_slug(self):
+        """
+        Test GET /api/posts/by-slug/{slug}/ and the multi-slug lookup.
+
+        PURPOSE: Verifica que un post se puede obtener por su slug sin
+        conocer su id, que la búsqueda múltiple devuelve los posts en el
+        orden pedido omitiendo los inexistentes, y los errores 404/400.
+        """
+        other = Post.objects.create(blog=self.blog, title='Other', content='<p>y</p>')
+        response = self.client.get('/api/posts/by-slug/cached/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], self.post.pk)
+        self.assertEqual(response.data['content_html'], '<p>x</p>')
+        response = self.client.get('/api/posts/by-slug/missing/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/api/posts/by-slug/', {'slugs': 'other,missing,cached'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['id'] for post in response.data], [other.pk, self.post.pk])
+        response = self.client.get('/api/posts/by-slug/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,94 @@
+from rest_framework import status
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from ..cache import bump_version
+from ..models import Blog, Post, Tag
+from ..view_counts import flush_views
+
+
+@override_settings(PUBLIC_PAGE_SIZE=2, VIEW_COUNT_FLUSH_SECONDS=3600)
+class PublicPagesTest(TestCase):
+    """Test the server-rendered public pages"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog', bio='Sobre Python')
+        self.tag = Tag.objects.create(name='python')
+        self.posts = []
+        for i in range(3):
+            post = Post.objects.create(
+                blog=self.blog, title=f'Post {i}', content=f'<p>Cuerpo {i}</p><script>x</script>',
+                is_published=True,
+            )
+            post.tags.add(self.tag)
+            self.posts.append(post)
+        self.draft = Post.objects.create(blog=self.blog, title='Draft', content='<p>x</p>')
+
+    def tearDown(self):
+        flush_views()
+
+    def test_pages_render_published_posts(self):
+        """
+        Test the home, blog, tag and post pages.
+
+        PURPOSE: Verifica que las páginas públicas muestran solo posts
+        publicados, paginados, con enlaces entre ellas; que el post se
+        muestra con el HTML saneado y que un borrador o un blog en borrado
+        devuelven 404.
+        """
+        response = self.client.get('/blog/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertContains(response, 'Post 2')
+        self.assertNotContains(response, 'Post 0')  # second page
+        self.assertNotContains(response, 'Draft')
+        self.assertContains(response, f'href="/blog/{self.posts[2].slug}/"')
+        self.assertContains(response, '/blog/tags/python/')
+        self.assertContains(self.client.get('/blog/', {'page': 2}), 'Post 0')
+
+        self.assertContains(self.client.get(f'/blog/blogs/{self.blog.pk}/'), 'Sobre Python')
+        self.assertContains(self.client.get('/blog/tags/python/'), 'Post 2')
+
+        response = self.client.get(self.posts[0].get_absolute_url())
+        self.assertContains(response, '<p>Cuerpo 0</p>')
+        self.assertNotContains(response, '<script>')
+        self.assertEqual(self.client.get(f'/blog/{self.draft.slug}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/blog/tags/nope/').status_code, status.HTTP_404_NOT_FOUND)
+
+        self.blog.deleted_at = self.blog.created_at
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.save()
+        self.assertNotContains(self.client.get('/blog/'), 'Post 2')
+        self.assertEqual(self.client.get(self.posts[0].get_absolute_url()).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_listing_queries_and_fragment_cache(self):
+        """
+        Test eager loading and fragment caching.
+
+        PURPOSE: Verifica que el número de consultas de un listado no
+        depende del número de posts, que el total para la paginación sale
+        del archivo precalculado y no de un COUNT, y que, al editar un post,
+        su fragmento en caché se renueva porque la clave incluye updated_at.
+        """
+        self.client.get('/blog/')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/blog/')
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+        with override_settings(PUBLIC_PAGE_SIZE=3), CaptureQueriesContext(connection) as more:
+            self.client.get('/blog/')
+        self.assertEqual(len(queries), len(more))
+
+        url = self.posts[0].get_absolute_url()
+        self.client.get(url)
+        # Same updated_at, reloaded from the database: the fragment is reused
+        Post.objects.filter(pk=self.posts[0].pk).update(content_html='<p>Sin señal</p>')
+        bump_version(f'obj:post:{self.posts[0].pk}')
+        self.assertContains(self.client.get(url), 'Cuerpo 0')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.posts[0].content = '<p>Editado</p>'
+            self.posts[0].save()
+        self.assertContains(self.client.get(url), 'Editado')
@@ -1,6 +1,7 @@
 # core/tests/test_permissions.py
 from django.test import TestCase
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework.authtoken.models import Token
@@ -12,6 +13,7 @@ class PermissionTest(APITestCase):
     
     def setUp(self):
         """Set up test data"""
+        cache.clear()  # Post, blog and tag objects are cached by id
         # Limpiar datos existentes de forma más agresiva
         try:
             Post.objects.all().delete()
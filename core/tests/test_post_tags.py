@@ -0,0 +1,103 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..cache import get_version
+from ..models import Blog, Post, Tag
+
+
+class PostTagsTest(APITestCase):
+    """Test tag resolution by id or name on post writes"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.python = Tag.objects.create(name='python')
+        self.django = Tag.objects.create(name='django')
+
+    def test_create_with_ids_and_names(self):
+        """
+        Test creating a post with existing ids and new tag names.
+
+        PURPOSE: Verifica que al crear un post se aceptan tags por id o por
+        nombre, que los nombres desconocidos se crean automáticamente y que
+        la respuesta devuelve los ids de los tags.
+        """
+        data = {'title': 'Tagged', 'content': '<p>x</p>', 'tags': [self.python.pk, 'django', 'rust']}
+        response = self.client.post('/api/posts/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        rust = Tag.objects.get(name='rust')
+        self.assertEqual(sorted(response.data['tags']), sorted([self.python.pk, self.django.pk, rust.pk]))
+        post = Post.objects.get(title='Tagged')
+        self.assertEqual(set(post.tags.values_list('name', flat=True)), {'python', 'django', 'rust'})
+
+    def test_update_writes_only_the_difference(self):
+        """
+        Test that updating tags resolves them in one query and writes a diff.
+
+        PURPOSE: Verifica que al actualizar los tags de un post se resuelven
+        todos con una sola consulta IN, y que la tabla intermedia se modifica
+        con un único INSERT y un único DELETE. También comprueba que se
+        invalida la caché de los feeds de los tags afectados.
+        """
+        post = Post.objects.create(blog=self.blog, title='Post', content='<p>x</p>', is_published=True)
+        post.tags.add(self.python)
+        tag_feed_version = get_version(f'feed:tag:{self.python.pk}')
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(f'/api/posts/{post.pk}/', {'tags': ['django']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tags'], [self.django.pk])
+        sql = [query['sql'] for query in queries]
+        tag_lookups = [q for q in sql if q.startswith('SELECT') and 'FROM "core_tag"' in q and 'INNER JOIN' not in q]
+        self.assertEqual(len(tag_lookups), 1)
+        self.assertEqual(len([q for q in sql if q.startswith('INSERT') and '"core_post_tags"' in q]), 1)
+        self.assertEqual(len([q for q in sql if q.startswith('DELETE FROM "core_post_tags"')]), 1)
+        self.assertEqual(list(post.tags.all()), [self.django])
+        self.assertNotEqual(get_version(f'feed:tag:{self.python.pk}'), tag_feed_version)
+
+    def test_existing_name_is_not_duplicated(self):
+        """
+        Test that naming an existing tag reuses it.
+
+        PURPOSE: Verifica que referenciar por nombre un tag existente no
+        crea uno nuevo (el nombre es único) y que un id inexistente
+        devuelve un error de validación 400.
+        """
+        data = {'title': 'Named', 'content': '<p>x</p>', 'tags': ['python', 'python']}
+        response = self.client.post('/api/posts/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['tags'], [self.python.pk])
+        self.assertEqual(Tag.objects.filter(name='python').count(), 1)
+
+        data = {'title': 'Broken', 'content': '<p>x</p>', 'tags': [999999]}
+        response = self.client.post('/api/posts/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tags', response.data)
+
+    def test_numeric_names_and_invalid_references(self):
+        """
+        Test referencing a tag whose name is made of digits.
+
+        PURPOSE: Verifica que un tag con nombre numérico ("2024") se puede
+        referenciar con {"name": ...} sin confundirlo con un id, que los
+        dígitos no ASCII ("²") son un nombre y no provocan un error 500, y
+        que una referencia mal formada devuelve 400.
+        """
+        year = Tag.objects.create(name='2024')
+        data = {'title': 'Numeric', 'content': '<p>x</p>', 'tags': [{'name': '2024'}, {'id': self.python.pk}, '²']}
+        response = self.client.post('/api/posts/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        squared = Tag.objects.get(name='²')
+        self.assertEqual(sorted(response.data['tags']), sorted([year.pk, self.python.pk, squared.pk]))
+
+        for tags in ([{'id': 1, 'name': 'x'}], [True], [{'name': ''}], ['0']):
+            response = self.client.post('/api/posts/', {'title': 'Bad', 'content': '<p>x</p>', 'tags': tags}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, tags)
+            self.assertIn('tags', response.data)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from ..models import Blog, Post, PostRelations, Tag
+from ..related import compute_related
+
+
+class RelatedPostsTest(APITestCase):
+    """Test precomputed related posts"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.python, self.django, self.rare = (Tag.objects.create(name=n) for n in ('python', 'django', 'rare'))
+        self.post = self.create('Main', self.python, self.django, self.rare)
+        self.both = self.create('Both', self.python, self.django)
+        self.rare_one = self.create('Rare', self.rare)
+        self.common = self.create('Common', self.python)
+        for i in range(3):
+            self.create(f'Filler {i}', self.python, days=30)
+        self.unrelated = self.create('Other')
+
+    def create(self, title, *tags, days=0):
+        post = Post.objects.create(
+            blog=self.blog, title=title, content='<p>x</p>', is_published=True,
+            published_at=timezone.now() - timedelta(days=days),
+        )
+        post.tags.add(*tags)
+        return post
+
+    def test_ranking_by_weighted_overlap(self):
+        """
+        Test the similarity ranking.
+
+        PURPOSE: Verifica que los posts con más tags en común van primero,
+        que un tag poco usado pesa más que uno muy frecuente y que no se
+        incluyen el propio post ni posts sin tags compartidos.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            related = compute_related(self.post)
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(related[:3], [self.both.pk, self.rare_one.pk, self.common.pk])
+        self.assertNotIn(self.post.pk, related)
+        self.assertNotIn(self.unrelated.pk, related)
+
+    def test_related_endpoint_stores_and_refreshes(self):
+        """
+        Test GET /api/posts/{id}/related/ and incremental invalidation.
+
+        PURPOSE: Verifica que el endpoint guarda la lista precalculada y la
+        siguiente lectura no la recalcula, que cambiar los tags de un post
+        marca como obsoletas su lista y las de sus vecinos, y que despublicar
+        un post lo quita de los resultados.
+        """
+        response = self.client.get(f'/api/posts/{self.post.pk}/related/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['id'], self.both.pk)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/posts/{self.post.pk}/related/')
+        self.assertFalse([q for q in queries if 'core_post_tags' in q['sql']])
+
+        self.client.get(f'/api/posts/{self.both.pk}/related/')
+        self.both.tags.set([])
+        self.assertTrue(PostRelations.objects.get(post=self.post).stale)
+        self.assertTrue(PostRelations.objects.get(post=self.both).stale)
+        response = self.client.get(f'/api/posts/{self.post.pk}/related/')
+        self.assertNotIn(self.both.pk, [post['id'] for post in response.data])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rare_one.is_published = False
+            self.rare_one.save()
+        response = self.client.get(f'/api/posts/{self.post.pk}/related/')
+        self.assertNotIn(self.rare_one.pk, [post['id'] for post in response.data])
+
+    def test_rebuild_command(self):
+        """
+        Test rebuild_related_posts.
+
+        PURPOSE: Verifica que el comando calcula las listas que faltan o
+        están obsoletas y que, después, no queda ninguna pendiente.
+        """
+        call_command('rebuild_related_posts', stdout=StringIO())
+        self.assertEqual(PostRelations.objects.count(), Post.objects.count())
+        self.assertFalse(PostRelations.objects.filter(stale=True).exists())
+        self.assertEqual(PostRelations.objects.get(post=self.post).related_ids[0], self.both.pk)
+
+    def test_new_post_sharing_tags_reaches_existing_lists(self):
+        """
+        Test that a new post enters the lists of the posts it relates to.
+
+        PURPOSE: Verifica que al crear un post con los mismos tags que otro
+        cuya lista ya estaba calculada (vacía), esa lista se marca como
+        obsoleta y la siguiente lectura incluye el nuevo post.
+        """
+        first, second = (Tag.objects.create(name=n) for n in ('first', 'second'))
+        alone = self.create('Alone', first, second)
+        response = self.client.get(f'/api/posts/{alone.pk}/related/')
+        self.assertEqual(response.data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer = self.create('Newcomer', first, second)
+        self.assertTrue(PostRelations.objects.get(post=alone).stale)
+        response = self.client.get(f'/api/posts/{alone.pk}/related/')
+        self.assertEqual([post['id'] for post in response.data], [newcomer.pk])
@@ -0,0 +1,107 @@
+from diff_match_patch import diff_match_patch
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from ..models import Blog, Post, PostRevision
+
+
+def make_patch(old, new):
+    dmp = diff_match_patch()
+    return dmp.patch_toText(dmp.patch_make(old, new))
+
+
+class RevisionTest(APITestCase):
+    """Test patch-based editing and the revision history"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.post = Post.objects.create(blog=self.blog, title='Draft', content='<p>Hello world</p>')
+
+    def test_patch_content(self):
+        """
+        Test updating the content with a patch against its version.
+
+        PURPOSE: Verifica que se puede editar el contenido enviando solo un
+        parche diff-match-patch junto con la versión de partida, que la
+        versión avanza y que un parche sobre una versión antigua se
+        rechaza con 409 sin modificar el post.
+        """
+        patch = make_patch('<p>Hello world</p>', '<p>Hello brave world</p>')
+        response = self.client.patch(
+            f'/api/posts/{self.post.pk}/', {'content_patch': patch, 'base_version': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content'], '<p>Hello brave world</p>')
+        self.assertEqual(response.data['content_version'], 2)
+
+        stale = make_patch('<p>Hello world</p>', '<p>Bye world</p>')
+        response = self.client.patch(
+            f'/api/posts/{self.post.pk}/', {'content_patch': stale, 'base_version': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['content_version'], 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content, '<p>Hello brave world</p>')
+
+        response = self.client.patch(f'/api/posts/{self.post.pk}/', {'content_patch': patch}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(POST_REVISION_SNAPSHOT_INTERVAL=3)
+    def test_revision_history(self):
+        """
+        Test that every version can be rebuilt from snapshots and patches.
+
+        PURPOSE: Verifica que cada cambio de contenido guarda una revisión
+        (una copia completa cada N y parches entre medias) y que cualquier
+        versión se reconstruye correctamente a través de la API.
+        """
+        contents = ['<p>Hello world</p>']
+        for i in range(1, 7):
+            self.post.content = f'<p>Hello world, edit {i}</p>'
+            self.post.save()
+            contents.append(self.post.content)
+        self.post.title = 'Only the title'
+        self.post.save()
+        self.assertEqual(self.post.content_version, 7)
+        snapshots = PostRevision.objects.filter(post=self.post, is_snapshot=True).values_list('version', flat=True)
+        self.assertEqual(sorted(snapshots), [1, 4, 7])
+
+        response = self.client.get(f'/api/posts/{self.post.pk}/revisions/')
+        self.assertEqual([item['version'] for item in response.data['results']], [7, 6, 5, 4, 3, 2, 1])
+        for version, content in enumerate(contents, start=1):
+            response = self.client.get(f'/api/posts/{self.post.pk}/revisions/{version}/')
+            self.assertEqual(response.data['content'], content)
+        response = self.client.get(f'/api/posts/{self.post.pk}/revisions/8/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_concurrent_edits_get_consecutive_versions(self):
+        """
+        Test two edits of the same loaded version without base_version.
+
+        PURPOSE: Verifica que dos escrituras que partieron de la misma
+        versión del contenido (dos PATCH concurrentes sin base_version)
+        reciben versiones consecutivas en lugar de chocar con la
+        restricción única de las revisiones, y que el historial sigue
+        permitiendo reconstruir cada versión.
+        """
+        first = Post.objects.get(pk=self.post.pk)
+        second = Post.objects.get(pk=self.post.pk)
+        first.content = '<p>Hello there</p>'
+        first.save()
+        second.content = '<p>Goodbye world</p>'
+        second.save()
+        self.assertEqual((first.content_version, second.content_version), (2, 3))
+        self.assertEqual(PostRevision.content_at(self.post.pk, 2), '<p>Hello there</p>')
+        self.assertEqual(PostRevision.content_at(self.post.pk, 3), '<p>Goodbye world</p>')
+
+        response = self.client.patch(f'/api/posts/{self.post.pk}/', {'content': '<p>Third</p>'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content_version'], 4)
@@ -0,0 +1,91 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from .. import schema
+
+
+class CachedSchemaTest(TestCase):
+    """Test the precomputed OpenAPI schema"""
+
+    def setUp(self):
+        """Use a temporary schema directory"""
+        self.schema_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(OPENAPI_SCHEMA_DIR=self.schema_dir, CODE_VERSION='v1')
+        self.settings_override.enable()
+        schema.code_version.cache_clear()
+        schema._documents.clear()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        schema.code_version.cache_clear()
+        schema._documents.clear()
+        shutil.rmtree(self.schema_dir, ignore_errors=True)
+
+    def test_schema_generated_once_and_served_with_etag(self):
+        """
+        Test that /api/schema/ is generated once and answers If-None-Match.
+
+        PURPOSE: Verifica que el esquema se genera en la primera petición,
+        se guarda en disco, las siguientes peticiones (YAML o JSON) no lo
+        vuelven a generar y un ETag coincidente devuelve 304.
+        """
+        with mock.patch.object(schema, 'render_schema', wraps=schema.render_schema) as render:
+            response = self.client.get('/api/schema/')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'openapi:', response.content)
+            self.assertTrue(os.path.exists(os.path.join(self.schema_dir, 'openapi-v1.yaml')))
+            self.client.get('/api/schema/')
+            self.assertEqual(render.call_count, 1)
+            response = self.client.get('/api/schema/', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            response = self.client.get('/api/schema/', HTTP_ACCEPT='application/json')
+            self.assertEqual(response.json()['info']['title'], 'Blog CMS API')
+            self.assertEqual(render.call_count, 2)
+
+    def test_build_schema_command_and_code_version(self):
+        """
+        Test build_schema and regeneration when the code version changes.
+
+        PURPOSE: Verifica que el comando genera los ficheros YAML y JSON de
+        la versión actual (que la vista sirve sin regenerar) y que con otra
+        versión del código el esquema se vuelve a generar y los ficheros
+        antiguos se eliminan.
+        """
+        call_command('build_schema', stdout=StringIO())
+        self.assertEqual(sorted(os.listdir(self.schema_dir)), ['openapi-v1.json', 'openapi-v1.yaml'])
+        with mock.patch.object(schema, 'render_schema') as render:
+            self.client.get('/api/schema/')
+            render.assert_not_called()
+
+        schema.code_version.cache_clear()
+        with override_settings(CODE_VERSION='v2'):
+            call_command('build_schema', stdout=StringIO())
+            self.assertEqual(sorted(os.listdir(self.schema_dir)), ['openapi-v2.json', 'openapi-v2.yaml'])
+            with mock.patch.object(schema, 'render_schema', wraps=schema.render_schema) as render:
+                self.assertEqual(self.client.get('/api/schema/').status_code, 200)
+                render.assert_not_called()  # Read from the new file, not the v1 copy in memory
+
+    def test_operation_ids(self):
+        """
+        Test the operationIds of actions sharing a URL prefix.
+
+        PURPOSE: Verifica que las acciones con el mismo prefijo de URL
+        (by-slug, revisions) tienen operationIds distintos y que no hay
+        ninguno repetido, en lugar de los sufijos numéricos que añade
+        drf-spectacular al detectar una colisión.
+        """
+        paths = json.loads(schema.render_schema('json'))['paths']
+        operation_ids = [operation['operationId'] for path in paths.values() for operation in path.values()]
+        self.assertEqual(len(operation_ids), len(set(operation_ids)))
+        self.assertEqual(paths['/api/posts/{id}/revisions/']['get']['operationId'], 'posts_revisions_retrieve')
+        self.assertEqual(
+            paths['/api/posts/{id}/revisions/{version}/']['get']['operationId'], 'posts_revision_retrieve'
+        )
+        self.assertEqual(paths['/api/posts/by-slug/']['get']['operationId'], 'posts_by_slugs_list')
+        self.assertEqual(paths['/api/posts/by-slug/{slug}/']['get']['operationId'], 'posts_by_slug_retrieve')
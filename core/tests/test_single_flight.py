@@ -0,0 +1,85 @@
+from unittest import mock
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from ..cache import bump_version, single_flight
+from ..models import Blog, Post
+
+
+class SingleFlightTest(TestCase):
+    """Test the single-flight cache helper"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.compute = mock.Mock(side_effect=['first', 'second'])
+
+    def test_computes_once_until_invalidated(self):
+        """
+        Test that the value is computed once and refreshed after a bump.
+
+        PURPOSE: Verifica que single_flight solo ejecuta el cálculo la
+        primera vez y que lo repite cuando se incrementa la versión del
+        namespace del que depende.
+        """
+        self.assertEqual(single_flight('k', self.compute, ['ns'], timeout=60), 'first')
+        self.assertEqual(single_flight('k', self.compute, ['ns'], timeout=60), 'first')
+        self.assertEqual(self.compute.call_count, 1)
+        bump_version('ns')
+        self.assertEqual(single_flight('k', self.compute, ['ns'], timeout=60), 'second')
+
+    def test_serves_stale_value_while_locked(self):
+        """
+        Test that concurrent requests get the stale value instead of recomputing.
+
+        PURPOSE: Verifica que, mientras otro worker tiene el lock de
+        regeneración, las demás peticiones reciben el valor anterior sin
+        volver a ejecutar la consulta costosa.
+        """
+        single_flight('k', self.compute, ['ns'], timeout=60)
+        bump_version('ns')
+        cache.add('lock:k', True)  # Another worker is recomputing
+        self.assertEqual(single_flight('k', self.compute, ['ns'], timeout=60), 'first')
+        self.assertEqual(self.compute.call_count, 1)
+
+    def test_waits_then_computes_without_stale_value(self):
+        """
+        Test the fallback when there is nothing to serve.
+
+        PURPOSE: Verifica que si no hay valor anterior y otro worker tiene
+        el lock, se espera como máximo `wait` segundos y después se calcula
+        igualmente para no dejar al cliente sin respuesta.
+        """
+        cache.add('lock:k', True)
+        self.assertEqual(single_flight('k', self.compute, ['ns'], timeout=60, wait=0), 'first')
+
+
+class PublishedCacheTest(APITestCase):
+    """Test the cached published posts endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        Post.objects.create(blog=self.blog, title='First', content='<p>1</p>', is_published=True)
+
+    def test_published_is_cached_and_invalidated(self):
+        """
+        Test that /api/posts/published/ is cached until a post is published.
+
+        PURPOSE: Verifica que la segunda petición se sirve desde la caché
+        sin consultar los posts, y que publicar un post invalida la caché.
+        """
+        self.assertEqual(len(self.client.get('/api/posts/published/').data), 1)
+        with self.assertNumQueries(1):  # Token authentication only
+            response = self.client.get('/api/posts/published/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(blog=self.blog, title='Second', content='<p>2</p>', is_published=True)
+        self.assertEqual(len(self.client.get('/api/posts/published/').data), 2)
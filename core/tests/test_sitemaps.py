@@ -0,0 +1,88 @@
+import re
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from ..models import Blog, Post
+
+
+@override_settings(SITEMAP_SIZE=3)
+class SitemapTest(APITestCase):
+    """Test the sitemap index and the streamed sitemap chunks"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.posts = [
+            Post.objects.create(blog=self.blog, title=f'Post {i}', content='<p>x</p>', is_published=i != 1)
+            for i in range(5)
+        ]
+        Post.objects.filter(pk=self.posts[0].pk).update(cover='posts/covers/ab/cover.png')
+
+    def chunk(self, number):
+        response = self.client.get(f'/sitemap-posts-{number}.xml')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def number(self, post):
+        return (post.pk - 1) // 3 + 1
+
+    def test_index_lists_chunks_within_the_size_limit(self):
+        """
+        Test GET /sitemap.xml and /sitemap-posts-{n}.xml.
+
+        PURPOSE: Verifica que el índice enumera un fichero por rango de ids
+        con posts publicados, que cada fichero tiene como máximo
+        SITEMAP_SIZE URLs, que no incluye borradores y que añade la portada
+        como imagen.
+        """
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        numbers = sorted({self.number(post) for post in self.posts})
+        locs = re.findall(rb'<loc>http://testserver/sitemap-posts-(\d+)\.xml</loc>', response.content)
+        self.assertEqual([int(n) for n in locs], numbers)
+
+        urls = []
+        for number in numbers:
+            content = self.chunk(number)
+            entries = re.findall(rb'<loc>http://testserver/blog/([^<]+)/</loc>', content)
+            self.assertLessEqual(len(entries), 3)
+            urls += entries
+        self.assertEqual(sorted(urls), sorted(p.slug.encode() for p in self.posts if p.is_published))
+        self.assertIn(
+            b'<image:image><image:loc>http://testserver/media/posts/covers/ab/cover.png</image:loc>',
+            self.chunk(self.number(self.posts[0])),
+        )
+        self.assertEqual(self.client.get('/sitemap-posts-999.xml').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_chunks_are_cached_and_invalidated_per_chunk(self):
+        """
+        Test the per-chunk cache.
+
+        PURPOSE: Verifica que un fichero ya generado se sirve desde la caché
+        sin consultar la base de datos, y que editar un post publicado
+        regenera solo el fichero de su rango.
+        """
+        first, last = self.posts[0], self.posts[-1]
+        self.assertNotEqual(self.number(first), self.number(last))
+        self.chunk(self.number(first))
+        self.chunk(self.number(last))
+        with self.assertNumQueries(0):
+            self.chunk(self.number(first))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            last.title = 'Edited'
+            last.slug = 'edited'
+            last.save()
+        with self.assertNumQueries(0):
+            self.chunk(self.number(first))
+        with CaptureQueriesContext(connection) as queries:
+            content = self.chunk(self.number(last))
+        self.assertTrue(queries)
+        self.assertIn(b'/blog/edited/', content)
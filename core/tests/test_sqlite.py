@@ -0,0 +1,25 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite-only settings')
+class SQLiteSettingsTest(TestCase):
+    """Test the production SQLite connection settings"""
+
+    def test_connection_pragmas(self):
+        """
+        Test that the tuned pragmas are applied on connect.
+
+        PURPOSE: Verifica que cada conexión SQLite usa transacciones
+        BEGIN IMMEDIATE, el busy_timeout configurado y synchronous=NORMAL,
+        para que varios workers puedan escribir sin "database is locked".
+        """
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_BUSY_TIMEOUT)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from whitenoise.compress import Compressor
+from whitenoise.middleware import WhiteNoiseMiddleware
+from mysite.static_storage import CachedCompressedManifestStaticFilesStorage
+
+
+class StaticPipelineTest(TestCase):
+    """Test the precompressed static files pipeline"""
+
+    def setUp(self):
+        """Set up a tiny static tree"""
+        self.tmp = tempfile.mkdtemp()
+        source = os.path.join(self.tmp, 'src')
+        os.makedirs(os.path.join(source, 'js'))
+        with open(os.path.join(source, 'js', 'editor.js'), 'w') as f:
+            f.write('function editor() { return "editor"; }\n' * 200)
+        self.settings_override = override_settings(
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=os.path.join(self.tmp, 'root'),
+            STATIC_COMPRESSION_CACHE=os.path.join(self.tmp, 'cache'),
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def collect(self):
+        shutil.rmtree(os.path.join(self.tmp, 'root'), ignore_errors=True)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_unchanged_files_are_not_recompressed(self):
+        """
+        Test that a second collectstatic reuses the compressed variants.
+
+        PURPOSE: Verifica que collectstatic genera las variantes comprimidas
+        de los ficheros con y sin hash, y que en una segunda ejecución
+        (con STATIC_ROOT vacío, como en un build nuevo) las copia de la
+        caché por hash de contenido en lugar de volver a comprimir.
+        """
+        with mock.patch.object(Compressor, 'compress', autospec=True, side_effect=Compressor.compress) as compress:
+            self.collect()
+            self.assertEqual(compress.call_count, 1)  # Original and hashed copy share the content
+            self.collect()
+            self.assertEqual(compress.call_count, 1)
+        files = os.listdir(os.path.join(self.tmp, 'root', 'js'))
+        self.assertIn('editor.js.gz', files)
+        self.assertTrue(any(name.endswith('.js.gz') and name != 'editor.js.gz' for name in files))
+
+    def test_hashed_files_are_immutable(self):
+        """
+        Test the Cache-Control headers WhiteNoise sends for collected files.
+
+        PURPOSE: Verifica que los ficheros con hash en el nombre se sirven
+        con caché inmutable de larga duración y comprimidos si el cliente lo
+        acepta, mientras que los nombres sin hash (que TinyMCE carga por
+        ruta) conservan una caché corta.
+        """
+        self.collect()
+        hashed = next(
+            name for name in os.listdir(os.path.join(self.tmp, 'root', 'js'))
+            if name.startswith('editor.') and name.endswith('.js') and name != 'editor.js'
+        )
+        middleware = WhiteNoiseMiddleware(lambda request: None)
+        factory = RequestFactory()
+
+        response = middleware(factory.get(f'/static/js/{hashed}', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = middleware(factory.get('/static/js/editor.js'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_missing_manifest_fails_in_production(self):
+        """
+        Test the fallback to unhashed names without a manifest.
+
+        PURPOSE: Verifica que sin manifiesto (collectstatic sin ejecutar)
+        se usan los nombres sin hash solo si STATIC_MANIFEST_OPTIONAL está
+        activo (desarrollo y tests); en producción la plantilla falla en
+        lugar de enlazar ficheros que no tienen caché inmutable.
+        """
+        with override_settings(STATIC_MANIFEST_OPTIONAL=True):
+            storage = CachedCompressedManifestStaticFilesStorage()
+            self.assertEqual(storage.stored_name('js/editor.js'), 'js/editor.js')
+        with override_settings(STATIC_MANIFEST_OPTIONAL=False):
+            storage = CachedCompressedManifestStaticFilesStorage()
+            with self.assertRaises(ValueError):
+                storage.stored_name('js/editor.js')
@@ -0,0 +1,127 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from ..models import Blog, CoverBlob, Post
+
+
+def make_image(color='red'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4), color).save(buffer, format='PNG')
+    return SimpleUploadedFile('cover.png', buffer.getvalue(), content_type='image/png')
+
+
+class CoverStorageTest(APITestCase):
+    """Test content-addressed cover storage"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()  # Post, blog and tag objects are cached by id
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_post(self, image):
+        response = self.client.post(
+            '/api/posts/',
+            {'title': 'Cover Post', 'content': '<p>x</p>', 'cover': image},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, 201)
+        return Post.objects.latest('id')
+
+    def cover_files(self):
+        return [
+            name for _, _, names in os.walk(self.media_root)
+            for name in names
+        ]
+
+    def test_identical_uploads_share_one_file(self):
+        """
+        Test upload deduplication.
+
+        PURPOSE: Verifica que subir dos veces la misma imagen guarda un único
+        fichero, nombrado por su hash, compartido por ambos posts y con un
+        contador de referencias igual a 2.
+        """
+        first = self.create_post(make_image())
+        second = self.create_post(make_image())
+        self.assertEqual(first.cover.name, second.cover.name)
+        self.assertRegex(first.cover.name, r'^posts/covers/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(len(self.cover_files()), 1)
+        self.assertEqual(CoverBlob.objects.get(name=first.cover.name).ref_count, 2)
+
+    def test_gc_deletes_unreferenced_covers(self):
+        """
+        Test garbage collection of orphaned covers.
+
+        PURPOSE: Verifica que el comando gc_covers conserva las imágenes que
+        siguen en uso y borra las que ya no usa ningún post.
+        """
+        first = self.create_post(make_image())
+        second = self.create_post(make_image())
+        first.delete()
+        call_command('gc_covers', grace_minutes=0, stdout=StringIO())
+        self.assertEqual(len(self.cover_files()), 1)
+
+        second.delete()
+        self.assertEqual(CoverBlob.objects.get(name=second.cover.name).ref_count, 0)
+        call_command('gc_covers', grace_minutes=0, stdout=StringIO())
+        self.assertEqual(self.cover_files(), [])
+        self.assertFalse(CoverBlob.objects.exists())
+
+    def test_gc_keeps_covers_reused_by_an_upload(self):
+        """
+        Test that a deduplicated upload protects its file from gc.
+
+        PURPOSE: Verifica que si se sube una imagen idéntica a un fichero
+        sin referencias, el fichero se marca como recién usado y gc_covers
+        no lo borra aunque el post todavía no se haya guardado.
+        """
+        post = self.create_post(make_image())
+        name = post.cover.name
+        post.delete()
+        path = os.path.join(self.media_root, name)
+        old = time.time() - 7200
+        os.utime(path, (old, old))
+        CoverBlob.objects.filter(name=name).update(updated_at=timezone.now() - timedelta(hours=2))
+
+        # The upload is stored, but the post that will reference it is not saved yet
+        self.assertEqual(Post._meta.get_field('cover').storage.save('posts/covers/cover.png', make_image()), name)
+        call_command('gc_covers', grace_minutes=60, stdout=StringIO())
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(CoverBlob.objects.filter(name=name).exists())
+
+    def test_covers_served_immutable(self):
+        """
+        Test cover caching headers.
+
+        PURPOSE: Verifica que las portadas se sirven con Cache-Control
+        inmutable de larga duración, ya que su nombre depende del contenido.
+        """
+        post = self.create_post(make_image('blue'))
+        response = self.client.get(post.cover.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
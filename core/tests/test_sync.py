@@ -0,0 +1,139 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from ..models import Blog, Post, PostTombstone
+from ..pagination import encode_cursor
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTest(APITestCase):
+    """Test the incremental sync endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.first = Post.objects.create(blog=self.blog, title='First', content='<p>1</p>', is_published=True)
+        self.second = Post.objects.create(blog=self.blog, title='Second', content='<p>2</p>', is_published=True)
+        Post.objects.create(blog=self.blog, title='Draft', content='<p>3</p>')
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['since'] = cursor
+        response = self.client.get('/api/posts/changes/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync(self):
+        """
+        Test a sync without cursor.
+
+        PURPOSE: Verifica que la primera sincronización devuelve todos los
+        posts publicados (sin borradores ni tombstones) y un cursor.
+        """
+        data = self.sync()
+        self.assertEqual([post['title'] for post in data['changes']], ['First', 'Second'])
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+        self.assertTrue(data['cursor'])
+
+    def test_incremental_sync_with_tombstones(self):
+        """
+        Test that a second sync only returns what changed.
+
+        PURPOSE: Verifica que con el cursor de la sincronización anterior
+        solo se devuelven los posts modificados, y que los posts borrados
+        o despublicados aparecen como tombstones.
+        """
+        cursor = self.sync()['cursor']
+        self.assertEqual(self.sync(cursor)['changes'], [])
+
+        self.first.title = 'First (edited)'
+        self.first.save()
+        self.second.is_published = False
+        self.second.save()
+        deleted_id = self.first.id
+        Post.objects.create(blog=self.blog, title='New', content='<p>4</p>', is_published=True)
+        self.first.delete()
+        self.assertTrue(PostTombstone.objects.filter(post_id=deleted_id).exists())
+
+        data = self.sync(cursor)
+        self.assertEqual([post['title'] for post in data['changes']], ['New'])
+        self.assertEqual(data['deleted'], [
+            {'id': self.second.id, 'reason': 'unpublished'},
+            {'id': deleted_id, 'reason': 'deleted'},
+        ])
+
+    def test_sync_pages_with_limit(self):
+        """
+        Test paging through changes.
+
+        PURPOSE: Verifica que con ?limit se devuelven los cambios por páginas
+        y que has_more indica si quedan cambios por leer.
+        """
+        data = self.sync(limit=1)
+        self.assertEqual(len(data['changes']), 1)
+        self.assertTrue(data['has_more'])
+        data = self.sync(data['cursor'], limit=1)
+        self.assertEqual(data['changes'][0]['title'], 'Second')
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor is rejected.
+
+        PURPOSE: Verifica que un cursor inválido devuelve 400, también si
+        su fecha no tiene zona horaria (no se puede comparar con las de la
+        base de datos).
+        """
+        response = self.client.get('/api/posts/changes/', {'since': 'nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        naive = encode_cursor(['2099-01-01T00:00:00', 1])
+        response = self.client.get('/api/posts/changes/', {'since': naive})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['since'], ['Invalid cursor'])
+
+    def test_sync_reads_from_the_primary(self):
+        """
+        Test that the sync endpoint never reads from a replica.
+
+        PURPOSE: Verifica que /api/posts/changes/ lee siempre del primario:
+        con réplicas retrasadas el cursor avanzaría más allá de filas que
+        la réplica todavía no tiene y el cliente no las vería nunca.
+        """
+        with mock.patch('mysite.db_router.use_replicas') as use_replicas:
+            self.sync()
+            use_replicas.assert_not_called()
+            self.client.get('/api/posts/')
+            use_replicas.assert_called_once()
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_tombstone_retention(self):
+        """
+        Test pruning old tombstones and expiring old cursors.
+
+        PURPOSE: Verifica que prune_tombstones borra los tombstones más
+        antiguos que la retención y conserva los recientes, y que un cursor
+        anterior a la retención recibe 410 para forzar una sincronización
+        completa en lugar de perder borrados.
+        """
+        cursor = self.sync()['cursor']
+        old_id, recent_id = self.first.pk, self.second.pk
+        self.first.delete()
+        self.second.delete()
+        PostTombstone.objects.filter(post_id=old_id).update(deleted_at=timezone.now() - timedelta(days=31))
+        call_command('prune_tombstones', stdout=StringIO())
+        self.assertEqual(list(PostTombstone.objects.values_list('post_id', flat=True)), [recent_id])
+
+        with override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=0):
+            response = self.client.get('/api/posts/changes/', {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
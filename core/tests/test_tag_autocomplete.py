@@ -0,0 +1,90 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import Blog, Post, Tag
+from ..tag_index import TagIndex
+
+
+class TagAutocompleteTest(APITestCase):
+    """Test the tag autocomplete endpoint and its prefix index"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.python, self.pytest, self.pandas, self.django = (
+            Tag.objects.create(name=n) for n in ('Python', 'pytest', 'pandas', 'django')
+        )
+        for i, tags in enumerate([(self.pytest,), (self.pytest, self.python), (self.pytest, self.pandas)]):
+            Post.objects.create(blog=blog, title=f'Post {i}', content='<p>x</p>').tags.add(*tags)
+
+    def names(self, **params):
+        response = self.client.get('/api/tags/autocomplete/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [tag['name'] for tag in response.data]
+
+    def test_prefix_matches_ranked_by_usage(self):
+        """
+        Test GET /api/tags/autocomplete/?q=.
+
+        PURPOSE: Verifica que devuelve solo los tags que empiezan por el
+        prefijo sin distinguir mayúsculas, ordenados por número de posts
+        (y por nombre en caso de empate), y que respeta ?limit=.
+        """
+        self.assertEqual(self.names(q='p'), ['pytest', 'pandas', 'Python'])
+        self.assertEqual(self.names(q='PY'), ['pytest', 'Python'])
+        self.assertEqual(self.names(q='pyt'), ['pytest', 'Python'])
+        self.assertEqual(self.names(q='pyth'), ['Python'])
+        self.assertEqual(self.names(q='pyx'), [])
+        self.assertEqual(self.names(q='', limit=1), ['pytest'])
+        response = self.client.get('/api/tags/autocomplete/', {'q': 'pyt'})
+        self.assertEqual(response.data[0], {'id': self.pytest.pk, 'name': 'pytest', 'posts': 3})
+
+    def test_index_is_refreshed_on_tag_changes(self):
+        """
+        Test that creating, renaming and deleting tags updates the index.
+
+        PURPOSE: Verifica que el índice en memoria se reconstruye al
+        confirmarse un cambio en los tags y que, mientras no cambian, las
+        consultas no tocan la base de datos.
+        """
+        self.names(q='dj')
+        with CaptureQueriesContext(connection) as queries:
+            self.names(q='dj')
+        self.assertFalse([q for q in queries if 'core_tag' in q['sql']])
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='djangorestframework')
+        self.assertEqual(self.names(q='dj'), ['django', 'djangorestframework'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.name = 'Django-5'
+            self.django.save()
+        self.assertEqual(self.names(q='django-'), ['Django-5'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.django.delete()
+        self.assertEqual(self.names(q='dj'), ['djangorestframework'])
+
+    def test_long_prefixes_match_the_short_prefix_tables(self):
+        """
+        Test the precomputed and binary-search paths against each other.
+
+        PURPOSE: Verifica que las listas precalculadas de prefijos cortos y
+        la búsqueda binaria de prefijos largos dan el mismo resultado que
+        filtrar todo el vocabulario.
+        """
+        rows = [(i, f'{a}{b}{c}', (i * 7) % 11) for i, (a, b, c) in enumerate(
+            (a, b, c) for a in 'abC' for b in 'aBc' for c in 'abc'
+        )]
+        index = TagIndex(rows, version=1)
+        for prefix in ('', 'a', 'cB', 'abc', 'CBA', 'b', 'ca', 'zz'):
+            expected = sorted(
+                (row for row in rows if row[1].casefold().startswith(prefix.casefold())),
+                key=lambda row: (-row[2], row[1].casefold()),
+            )[:5]
+            self.assertEqual(index.search(prefix, 5), expected)
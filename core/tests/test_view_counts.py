@@ -0,0 +1,98 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from ..models import Blog, Post, PostViewCount
+from .. import view_counts
+from ..view_counts import flush_views
+
+
+@override_settings(VIEW_COUNT_FLUSH_SECONDS=3600, VIEW_COUNT_FLUSH_SIZE=1000)
+class ViewCountTest(APITestCase):
+    """Test buffered view counters and the popular posts ranking"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        flush_views()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.blog = Blog.objects.create(user=self.user, title='Test Blog')
+        self.first = Post.objects.create(blog=self.blog, title='First', content='<p>1</p>', is_published=True)
+        self.second = Post.objects.create(blog=self.blog, title='Second', content='<p>2</p>', is_published=True)
+
+    def tearDown(self):
+        flush_views()
+
+    def test_reads_are_buffered_and_flushed_in_one_statement(self):
+        """
+        Test that GET /api/posts/{id}/ does not write until the flush.
+
+        PURPOSE: Verifica que leer un post no escribe en la base de datos,
+        que el vaciado del buffer suma todas las lecturas pendientes con una
+        única sentencia y que un post borrado entre medias se ignora.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(3):
+                self.client.get(f'/api/posts/{self.first.pk}/')
+            self.client.get(f'/api/posts/{self.second.pk}/')
+        self.assertFalse([q for q in queries if 'core_postviewcount' in q['sql']])
+        deleted = Post.objects.create(blog=self.blog, title='Gone', content='<p>x</p>')
+        self.client.get(f'/api/posts/{deleted.pk}/')
+        deleted.delete()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(flush_views(), 3)
+        self.client.get(f'/api/posts/{self.first.pk}/')
+        flush_views()
+        counts = dict(PostViewCount.objects.values_list('post_id', 'views'))
+        self.assertEqual(counts, {self.first.pk: 4, self.second.pk: 1})
+
+    @override_settings(VIEW_COUNT_FLUSH_SECONDS=0, VIEW_COUNT_FLUSH_SIZE=2)
+    def test_flusher_thread_keeps_writes_off_reads(self):
+        """
+        Test that reads never flush while the flusher thread runs.
+
+        PURPOSE: Verifica que, con el hilo de vaciado de gunicorn en marcha,
+        una lectura nunca escribe los contadores aunque el buffer esté
+        vencido o lleno: solo despierta al hilo cuando se llena.
+        """
+        with mock.patch.object(view_counts, '_flusher', object()), CaptureQueriesContext(connection) as queries:
+            view_counts._flush_due.clear()
+            self.client.get(f'/api/posts/{self.first.pk}/')
+            self.assertFalse(view_counts._flush_due.is_set())
+            self.client.get(f'/api/posts/{self.second.pk}/')
+            self.assertTrue(view_counts._flush_due.is_set())
+        view_counts._flush_due.clear()
+        self.assertFalse([q for q in queries if 'core_postviewcount' in q['sql']])
+        self.assertEqual(flush_views(), 2)
+
+    def test_popular_posts(self):
+        """
+        Test GET /api/posts/popular/.
+
+        PURPOSE: Verifica que el ranking devuelve los posts publicados más
+        leídos en orden con su número de lecturas, que respeta ?limit= y
+        que un post despublicado desaparece del resultado.
+        """
+        for _ in range(2):
+            self.client.get(f'/api/posts/{self.second.pk}/')
+        self.client.get(f'/api/posts/{self.first.pk}/')
+        flush_views()
+
+        response = self.client.get('/api/posts/popular/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(p['id'], p['views']) for p in response.data], [(self.second.pk, 2), (self.first.pk, 1)])
+        self.assertEqual(len(self.client.get('/api/posts/popular/', {'limit': 1}).data), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.is_published = False
+            self.second.save()
+        self.assertEqual([p['id'] for p in self.client.get('/api/posts/popular/').data], [self.first.pk])
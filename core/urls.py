@@ -6,10 +6,13 @@ from . import views
 router = DefaultRouter()
 router.register(r'users', views.UserViewSet, basename='user')
 router.register(r'blogs', views.BlogViewSet, basename='blog')
+router.register(r'blogs/(?P<blog_pk>\d+)/posts', views.BlogPostViewSet, basename='blog-post')
 router.register(r'posts', views.PostViewSet, basename='post')
 router.register(r'tags', views.TagViewSet)
+router.register(r'deletion-jobs', views.DeletionJobViewSet, basename='deletionjob')
 
 urlpatterns = [
+    path('batch/', views.batch, name='batch'),
     path('', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,121 @@
+# core/view_counts.py
+"""
+Buffered post view counters.
+
+Reads call record_view(), which only bumps an in-memory counter of the
+current worker. The buffer is written with a single ``INSERT ... ON CONFLICT
+DO UPDATE`` adding the pending counts to PostViewCount, so a popular post
+costs one upsert per worker and interval instead of a contended row update
+per read.
+
+Under gunicorn each worker starts a flusher thread (gunicorn.conf.py) that
+writes the buffer every VIEW_COUNT_FLUSH_SECONDS, or as soon as
+VIEW_COUNT_FLUSH_SIZE distinct posts are pending, so no read waits for the
+write. Without it (runserver, tests, management commands) the read that
+finds the buffer due flushes it itself. Workers flush on a normal exit;
+a worker that is killed (SIGKILL, out of memory) loses at most the reads
+of the last VIEW_COUNT_FLUSH_SECONDS.
+
+The "most read" ranking is read from the counts table (through its views
+index) by single_flight and kept for POPULAR_POSTS_TIMEOUT seconds.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .cache import single_flight
+from .models import Post, PostViewCount
+
+logger = logging.getLogger(__name__)
+
+_pending = Counter()
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+# Background flusher of this process, if started, and its early wake-up
+_flusher = None
+_flush_due = threading.Event()
+
+
+def record_view(post_id):
+    """Count one read of a post; flushes only if no flusher thread runs."""
+    with _lock:
+        _pending[post_id] += 1
+        full = len(_pending) >= settings.VIEW_COUNT_FLUSH_SIZE
+        due = full or time.monotonic() - _last_flush >= settings.VIEW_COUNT_FLUSH_SECONDS
+    if _flusher is not None:
+        if full:
+            _flush_due.set()
+    elif due:
+        flush_views()
+
+
+def start_flusher():
+    """Start this process's flusher thread (once)."""
+    global _flusher
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='view-count-flusher', daemon=True)
+            _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        _flush_due.wait(settings.VIEW_COUNT_FLUSH_SECONDS)
+        _flush_due.clear()
+        try:
+            flush_views()
+        except Exception:
+            logger.exception('View count flusher failed')
+        finally:
+            # The thread's own connection: do not keep it open between flushes
+            connection.close()
+
+
+def flush_views():
+    """Add the buffered counts to the database in one statement."""
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    table = connection.ops.quote_name(PostViewCount._meta.db_table)
+    posts = connection.ops.quote_name(Post._meta.db_table)
+    values = ', '.join(['(%s, %s)'] * len(pending))
+    # Posts deleted since they were read are skipped instead of failing the
+    # batch ("WHERE" also lets SQLite parse INSERT ... SELECT ... ON CONFLICT)
+    sql = (
+        f'INSERT INTO {table} (post_id, views) '
+        f'SELECT v.column1, v.column2 FROM (VALUES {values}) AS v '
+        f'WHERE v.column1 IN (SELECT id FROM {posts}) '
+        f'ON CONFLICT (post_id) DO UPDATE SET views = {table}.views + excluded.views'
+    )
+    params = [item for pair in pending.items() for item in pair]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+    except DatabaseError:
+        logger.exception('Could not flush %d view counters', len(pending))
+        with _lock:
+            _pending.update(pending)
+        return 0
+    return len(pending)
+
+
+def popular_post_ids():
+    """[(post_id, views)] of the most read visible published posts."""
+    def compute():
+        return list(
+            PostViewCount.objects
+            .filter(post__in=Post.objects.visible().filter(is_published=True))
+            .order_by('-views')
+            .values_list('post_id', 'views')[:settings.POPULAR_POSTS_SIZE]
+        )
+
+    return single_flight('posts:popular', compute, ['posts:popular'], timeout=settings.POPULAR_POSTS_TIMEOUT)
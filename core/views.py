@@ -1,17 +1,44 @@
 # core/views.py
-from rest_framework import viewsets, permissions, status
+import heapq
+import itertools
+import json
+from io import BytesIO
+from datetime import timedelta
+
+from rest_framework import viewsets, mixins, permissions, status
 from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db.models import Q
-from django.urls import reverse
-from .models import Blog, Post, Tag
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.views.static import serve
+from drf_spectacular.utils import extend_schema
+from .archive import blog_archive, site_archive
+from .cache import single_flight
+from .deletion import schedule_blog_deletion
+from .models import Blog, DeletionJob, Post, PostRevision, PostTombstone, Tag
+from .object_cache import blog_cache, post_cache
+from .related import get_related_ids
+from .pagination import KeysetPagination, decode_cursor, encode_cursor
+from .storage import is_content_addressed
+from .tag_index import MAX_RESULTS, get_tag_index
+from .view_counts import popular_post_ids, record_view
 from .serializers import (
-    UserSerializer, BlogSerializer, PostSerializer, 
-    PostCreateSerializer, TagSerializer, UserRegistrationSerializer, UserLoginSerializer
+    UserSerializer, BlogSerializer, DeletionJobSerializer, PostSerializer, PostListSerializer,
+    PostCreateSerializer, PostRevisionSerializer, TagSerializer, UserRegistrationSerializer,
+    UserLoginSerializer
 )
 from .permissions import IsOwnerOrSuperuser, IsOwnerOrSuperuserForBlog, IsSuperuserOrReadOnly
+from mysite.db_router import ReplicaReadMixin, use_primary
+
+BATCH_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -32,19 +59,16 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Register new users with automatic blog creation.
         """
+        # The username uniqueness check is an indexed lookup; a concurrent
+        # registration that slips past it is caught by the unique constraint
+        # (reported by the serializer as a username error)
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
+            # User, blog and token are created atomically
             user = serializer.save()
-            # Automatically create blog for new user
-            Blog.objects.create(
-                user=user,
-                title=f"Blog de {user.username}"
-            )
-            # Create token for user
-            token, created = Token.objects.get_or_create(user=user)
             return Response({
                 'user': UserSerializer(user).data,
-                'token': token.key,
+                'token': user.auth_token.key,
                 'message': 'User registered successfully'
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -65,7 +89,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class BlogViewSet(viewsets.ModelViewSet):
+class BlogViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for blog management with owner-based permissions.
     """
@@ -75,14 +99,52 @@ class BlogViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         # Superusers can see all blogs, others only their own
         if self.request.user.is_superuser:
-            return Blog.objects.all()
-        return Blog.objects.filter(user=self.request.user)
+            return Blog.objects.visible()
+        return Blog.objects.visible().filter(user=self.request.user)
     
     def perform_create(self, serializer):
         # Automatically assign user to blog
         serializer.save(user=self.request.user)
+    
+    def destroy(self, request, *args, **kwargs):
+        """
+        Delete the blog and its posts. With ?background=true the blog is
+        hidden at once and the deletion of its posts is queued for
+        process_deletions, which performs it in batches (202 with the job,
+        whose status URL is also sent in the Location header).
+        """
+        if request.query_params.get('background', '').lower() in ('1', 'true'):
+            job = schedule_blog_deletion(self.get_object())
+            data = DeletionJobSerializer(job, context=self.get_serializer_context()).data
+            return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['url']})
+        return super().destroy(request, *args, **kwargs)
+    
+    @action(detail=True, methods=['get'])
+    def archive(self, request, pk=None):
+        """
+        Published posts of the blog per year and month, newest first. Open
+        to any authenticated user, like the posts themselves.
+        """
+        blog = blog_cache.get(pk)
+        if blog is None or blog.deleted_at:
+            raise Http404('No Blog matches the given query.')
+        return Response(blog_archive(blog.pk))
 
-class TagViewSet(viewsets.ModelViewSet):
+class DeletionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only progress of background blog deletions. Owners see the jobs
+    of their blogs, superusers all of them. Read from the primary, where
+    process_deletions records the progress.
+    """
+    serializer_class = DeletionJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        if self.request.user.is_superuser:
+            return DeletionJob.objects.all()
+        return DeletionJob.objects.filter(owner_id=self.request.user.id)
+
+class TagViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for tag management.
     Any authenticated user can create tags, but only superusers can modify/delete.
@@ -90,26 +152,70 @@ class TagViewSet(viewsets.ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticated, IsSuperuserOrReadOnly]
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Tags whose name starts with ?q= (case-insensitive), most used first;
+        ?limit= defaults to 10, at most 50. Served from the in-memory index.
+        """
+        limit = min(_positive_int(request.query_params.get('limit'), 10), MAX_RESULTS)
+        matches = get_tag_index().search(request.query_params.get('q', '').strip(), limit)
+        return Response([{'id': pk, 'name': name, 'posts': uses} for pk, name, uses in matches])
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for post management with custom permissions and actions.
     """
     permission_classes = [permissions.IsAuthenticated, IsOwnerOrSuperuser]
+    list_actions = ['list', 'published', 'by_tag', 'popular']
+    cached_actions = ['retrieve', 'revisions', 'revision', 'related']
+    # A lagging replica would move the sync cursor past rows it has not received
+    primary_actions = ['changes']
+    max_slugs = 100
     
     def get_queryset(self):
-        # Any authenticated user can see all posts
-        return Post.objects.all()
+        # Any authenticated user can see all posts (except deleted blogs')
+        posts = Post.objects.visible()
+        if self.action in self.list_actions:
+            # Listings serve the precomputed summary, never the large content columns
+            posts = (
+                posts.defer(*PostListSerializer.deferred_fields)
+                .select_related('blog__user')
+                .prefetch_related('tags')
+            )
+        return posts
+    
+    def get_object(self):
+        # Single-post reads come from the object cache; writes load the row
+        # so save() and the signals compare against the stored values
+        if self.action not in self.cached_actions:
+            return super().get_object()
+        post = post_cache.get(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if post is None or post.blog.deleted_at:
+            raise Http404('No Post matches the given query.')
+        self.check_object_permissions(self.request, post)
+        return post
+    
+    def retrieve(self, request, *args, **kwargs):
+        post = self.get_object()
+        record_view(post.pk)
+        return Response(self.get_serializer(post).data)
     
     def get_serializer_class(self):
         # Use different serializer for create/update operations
         if self.action in ['create', 'update', 'partial_update']:
             return PostCreateSerializer
+        if self.action in self.list_actions:
+            return PostListSerializer
         return PostSerializer
     
     def perform_create(self, serializer):
-        # Automatically assign user's blog to post
-        user_blog = Blog.objects.filter(user=self.request.user).first()
+        # Automatically assign user's blog to post (registration always creates
+        # one; users made elsewhere, e.g. createsuperuser, may not have it)
+        user_blog = blog_cache.get_by('user_id', self.request.user.pk)
+        if user_blog and user_blog.deleted_at:
+            raise ValidationError({'detail': 'Your blog is being deleted.'})
         if user_blog:
             serializer.save(blog=user_blog)
         else:
@@ -125,9 +231,101 @@ class PostViewSet(viewsets.ModelViewSet):
         """
         Endpoint to get only published posts.
         """
-        posts = self.get_queryset().filter(is_published=True)
-        serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data)
+        def compute():
+            posts = self.get_queryset().filter(is_published=True)
+            return list(self.get_serializer(posts, many=True).data)
+        
+        # Same for every user; cover URLs are absolute, so keyed by host
+        key = f'posts:published:{request.scheme}://{request.get_host()}'
+        data = single_flight(
+            key, compute, ['posts:published'], timeout=settings.PUBLISHED_CACHE_TIMEOUT
+        )
+        return Response(data)
+    
+    @action(detail=False, methods=['get'])
+    def popular(self, request):
+        """
+        Most read published posts (?limit=, at most POPULAR_POSTS_SIZE),
+        from the periodically refreshed ranking and the object cache.
+        """
+        limit = min(_positive_int(request.query_params.get('limit'), 10), settings.POPULAR_POSTS_SIZE)
+        ranking = popular_post_ids()
+        posts = post_cache.get_many(post_id for post_id, _ in ranking)
+        ranked = [
+            (posts[post_id], views) for post_id, views in ranking
+            if post_id in posts and posts[post_id].is_published and not posts[post_id].blog.deleted_at
+        ][:limit]
+        data = self.get_serializer([post for post, _ in ranked], many=True).data
+        return Response([{**item, 'views': views} for item, (_, views) in zip(data, ranked)])
+    
+    @action(detail=False, methods=['get'])
+    def archive(self, request):
+        """
+        Published posts of every blog per year and month, newest first,
+        added up from the precomputed monthly rollups.
+        """
+        return Response(site_archive())
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Incremental sync: posts created/updated after ?since=<cursor>, plus
+        tombstones for posts deleted or unpublished since then. Both streams
+        are read in (timestamp, id) order from their indexes and merged, so
+        a sync costs O(changes) instead of O(posts). Cursors older than the
+        tombstone retention get 410 Gone.
+        """
+        limit = min(
+            _positive_int(request.query_params.get('limit'), settings.SYNC_PAGE_SIZE),
+            settings.SYNC_MAX_PAGE_SIZE
+        )
+        since = request.query_params.get('since')
+        # Leave rows from still-committing transactions for the next sync
+        settled = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+
+        posts = Post.objects.visible().filter(updated_at__lte=settled).select_related('blog__user').prefetch_related('tags')
+        tombstones = PostTombstone.objects.filter(deleted_at__lte=settled)
+        if since:
+            try:
+                timestamp, last_id = decode_cursor(since)
+                timestamp = parse_datetime(timestamp)
+                # Cursors always carry an offset: a naive time cannot be compared
+                if timestamp is None or timezone.is_naive(timestamp) or not isinstance(last_id, int):
+                    raise ValueError
+            except (TypeError, ValueError):
+                return Response({'since': ['Invalid cursor']}, status=status.HTTP_400_BAD_REQUEST)
+            if timestamp < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+                # Older tombstones may have been pruned: the client must sync from scratch
+                return Response({'since': ['Cursor expired, sync again without it']}, status=status.HTTP_410_GONE)
+            posts = posts.filter(Q(updated_at__gt=timestamp) | Q(updated_at=timestamp, id__gt=last_id))
+            tombstones = tombstones.filter(Q(deleted_at__gt=timestamp) | Q(deleted_at=timestamp, post_id__gt=last_id))
+        else:
+            # A first sync has nothing to delete locally
+            tombstones = tombstones.none()
+
+        rows = heapq.merge(
+            ((post.updated_at, post.id, post) for post in posts.order_by('updated_at', 'id')[:limit + 1]),
+            ((tomb.deleted_at, tomb.post_id, None) for tomb in tombstones.order_by('deleted_at', 'post_id')[:limit + 1]),
+            key=lambda row: row[:2],
+        )
+        rows = list(itertools.islice(rows, limit + 1))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        changed, deleted = [], []
+        for timestamp, pk, post in rows:
+            if post is None:
+                deleted.append({'id': pk, 'reason': 'deleted'})
+            elif post.is_published:
+                changed.append(post)
+            elif since:
+                deleted.append({'id': pk, 'reason': 'unpublished'})
+        return Response({
+            'changes': PostSerializer(changed, many=True, context=self.get_serializer_context()).data,
+            'deleted': deleted,
+            'cursor': encode_cursor(rows[-1][:2]) if rows else since,
+            'has_more': has_more,
+        })
     
     @action(detail=False, methods=['get'])
     def by_tag(self, request):
@@ -141,6 +339,222 @@ class PostViewSet(viewsets.ModelViewSet):
             posts = self.get_queryset()
         serializer = self.get_serializer(posts, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, pk=None):
+        """
+        Content history of a post, newest first (paginated).
+        """
+        post = self.get_object()
+        page = self.paginate_queryset(PostRevision.objects.filter(post=post).order_by('-version'))
+        return self.get_paginated_response(PostRevisionSerializer(page, many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """
+        Published posts most related to this one by shared tags, from the
+        precomputed list (recomputed here if it is stale).
+        """
+        post = self.get_object()
+        related_ids = get_related_ids(post)
+        posts = post_cache.get_many(related_ids)
+        found = [
+            posts[pk] for pk in related_ids
+            if pk in posts and posts[pk].is_published and not posts[pk].blog.deleted_at
+        ]
+        return Response(PostListSerializer(found, many=True, context=self.get_serializer_context()).data)
+    
+    @extend_schema(operation_id='posts_revision_retrieve')
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<version>\d+)')
+    def revision(self, request, pk=None, version=None):
+        """
+        Content of one version, rebuilt from the closest snapshot.
+        """
+        post = self.get_object()
+        content = PostRevision.content_at(post.pk, int(version))
+        if content is None:
+            raise Http404('No such revision.')
+        return Response({'version': int(version), 'content': content})
+    
+    @action(detail=False, methods=['get'], url_path=r'by-slug/(?P<slug>[-\w]+)')
+    def by_slug(self, request, slug=None):
+        """
+        Retrieve a post by its slug, through the object cache (the unique
+        slug index on a miss).
+        """
+        post = post_cache.get_by('slug', slug)
+        if post is None or post.blog.deleted_at:
+            raise Http404('No Post matches the given query.')
+        self.check_object_permissions(request, post)
+        record_view(post.pk)
+        return Response(self.get_serializer(post).data)
+    
+    @extend_schema(operation_id='posts_by_slugs_list')
+    @action(detail=False, methods=['get'], url_path='by-slug')
+    def by_slugs(self, request):
+        """
+        Retrieve several posts at once: ?slugs=a,b,c. Returns the posts
+        found, in the requested order.
+        """
+        slugs = [slug for slug in request.query_params.get('slugs', '').split(',') if slug]
+        if not slugs:
+            return Response({'detail': 'The slugs parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(slugs) > self.max_slugs:
+            return Response(
+                {'detail': f'At most {self.max_slugs} slugs per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        posts = post_cache.get_many_by('slug', slugs)
+        found = [posts[slug] for slug in slugs if slug in posts and not posts[slug].blog.deleted_at]
+        return Response(self.get_serializer(found, many=True).data)
+
+class BlogPostViewSet(ReplicaReadMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Posts of a single blog, routed under /api/blogs/<blog_pk>/posts/.
+    Served from the per-blog indexes with keyset pagination, so rendering
+    an author page is one indexed range scan however deep the client pages.
+    """
+    serializer_class = PostListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_max_age = 60
+
+    def get_queryset(self):
+        posts = (
+            Post.objects.visible().filter(blog_id=self.kwargs['blog_pk'])
+            .defer(*PostListSerializer.deferred_fields)
+            .select_related('blog__user')
+            .prefetch_related('tags')
+        )
+        if self.action == 'published':
+            return posts.filter(is_published=True).order_by('-published_at', '-created_at', '-id')
+        return posts.order_by('-created_at', '-id')
+
+    def list(self, request, *args, **kwargs):
+        if not Blog.objects.visible().filter(pk=self.kwargs['blog_pk']).exists():
+            raise Http404
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def published(self, request, *args, **kwargs):
+        """
+        Endpoint to get only the blog's published posts.
+        """
+        return self.list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            # Responses depend on the caller's credentials; ETag/304 handling
+            # is done by ConditionalGetMiddleware
+            patch_cache_control(response, private=True, max_age=self.cache_max_age)
+            patch_vary_headers(response, ['Authorization'])
+        return response
+
+def serve_cover(request, path):
+    """
+    Serve a post cover in development (SERVE_MEDIA). Content-addressed
+    covers never change under the same name, so they can be cached by
+    browsers and CDNs forever; in production the web server in front of the
+    app serves MEDIA_URL with the same headers.
+    """
+    field = Post._meta.get_field('cover')
+    response = serve(request, path, document_root=field.storage.path(field.upload_to))
+    if is_content_addressed(path):
+        patch_cache_control(response, public=True, max_age=settings.COVER_MAX_AGE, immutable=True)
+    return response
+
+def _positive_int(value, default):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+@api_view(['POST'])
+def batch(request):
+    """
+    Run several API requests in one round trip:
+    {"requests": [{"method": "GET", "path": "/api/posts/1/"}, ...]}.
+    Sub-requests run in order against the API's own URLconf, as the
+    already authenticated user, and share this request's object cache.
+    Returns {"responses": [{"status": 200, "body": ...}, ...]}.
+
+    Sub-requests call the views directly, so the middleware only runs once,
+    for the batch request: they share its primary pinning (a write in any of
+    them pins the client) and the metrics record a single request to this
+    view.
+    """
+    subrequests = request.data.get('requests') if isinstance(request.data, dict) else None
+    if not isinstance(subrequests, list) or not subrequests:
+        return Response({'detail': 'Expected a non-empty "requests" list.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(subrequests) > settings.BATCH_MAX_REQUESTS:
+        return Response(
+            {'detail': f'At most {settings.BATCH_MAX_REQUESTS} requests per batch.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    responses = [_run_subrequest(request, subrequest) for subrequest in subrequests]
+    return Response({'responses': responses})
+
+class SubRequest(HttpRequest):
+    """
+    A batch sub-request, built from the batch request: same host, scheme
+    and client address, the given method and path, and a JSON body.
+    """
+
+    def __init__(self, parent, method, path, body):
+        super().__init__()
+        path, _, query = path.partition('?')
+        data = json.dumps(body).encode() if body is not None else b''
+        self.method = method
+        self.path = self.path_info = path
+        self.GET = QueryDict(query)
+        self.META = {
+            'SERVER_NAME': parent.META.get('SERVER_NAME', ''),
+            'SERVER_PORT': parent.META.get('SERVER_PORT', ''),
+            'REMOTE_ADDR': parent.META.get('REMOTE_ADDR', ''),
+            'HTTP_HOST': parent.get_host(),
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(data)),
+        }
+        self._stream = BytesIO(data)
+        self._read_started = False
+        self._scheme = parent.scheme
+
+    def _get_scheme(self):
+        return self._scheme
+
+def _run_subrequest(request, subrequest):
+    if not isinstance(subrequest, dict):
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'detail': 'Invalid sub-request.'}}
+    method = str(subrequest.get('method', 'GET')).upper()
+    path = str(subrequest.get('path', ''))
+    batch_path = reverse('batch')
+    if method not in BATCH_METHODS or not path.startswith('/api/') or path.split('?')[0] == batch_path:
+        return {'status': status.HTTP_400_BAD_REQUEST, 'body': {'detail': 'Unsupported method or path.'}}
+    try:
+        match = resolve(path.split('?')[0])
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND, 'body': {'detail': 'Not found.'}}
+
+    sub = SubRequest(request, method, path, subrequest.get('body'))
+    # Authenticated once by the batch request itself
+    sub.user = request.user
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    # Each sub-request decides again whether its reads may use a replica
+    use_primary()
+    response = match.func(sub, *match.args, **match.kwargs)
+    if hasattr(response, 'data'):
+        response_body = response.data
+    else:
+        # Plain Django views (e.g. the browsable API login) may answer with
+        # a TemplateResponse, rendered by the handler in a normal request
+        if hasattr(response, 'render'):
+            response.render()
+        response_body = response.getvalue().decode(response.charset or 'utf-8', errors='replace')
+    return {'status': response.status_code, 'body': response_body}
 
 @api_view(['GET'])
 def api_root(request):
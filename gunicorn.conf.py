@@ -0,0 +1,55 @@
+# gunicorn.conf.py
+"""
+gunicorn settings, loaded automatically from the working directory.
+
+Each worker is a separate process, so Prometheus metrics are written to
+memory-mapped files under PROMETHEUS_MULTIPROC_DIR and summed by the
+/metrics view (core/metrics.py). The directory is emptied when the master
+starts and the files of exited workers are marked dead, so live gauges
+only report running workers.
+
+Workers write their buffered post view counts from a background thread
+(core/view_counts.py) and flush them once more when they exit.
+
+The number of workers comes from WEB_CONCURRENCY (3 by default). The master
+warns at start if they would not share the cache (core/checks.py).
+"""
+import os
+import shutil
+
+from decouple import config
+
+workers = config('WEB_CONCURRENCY', default=3, cast=int)
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus_multiproc')
+
+from prometheus_client import multiprocess  # noqa: E402  (reads the variable on import)
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    from django.conf import settings
+    from core.checks import LOCMEM_BACKEND
+    if server.cfg.workers > 1 and settings.CACHES['default']['BACKEND'] == LOCMEM_BACKEND:
+        server.log.warning(
+            'CACHE_BACKEND=locmem with %d workers: cache invalidations will not reach the other '
+            'workers. Set REDIS_URL or CACHE_BACKEND=db.', server.cfg.workers
+        )
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    from core.view_counts import start_flusher
+    start_flusher()
+
+
+def worker_exit(server, worker):
+    from core.view_counts import flush_views
+    flush_views()
@@ -0,0 +1,124 @@
+"""
+Primary/replica database routing.
+
+Reads issued while serving a safe (GET/HEAD/OPTIONS) API request are sent to
+one of ``settings.DATABASE_REPLICAS``; everything else uses ``default``.
+As soon as a request writes, it is pinned to the primary for the rest of the
+request, and ``PrimaryPinningMiddleware`` keeps that client on the primary for
+``REPLICA_PIN_SECONDS`` afterwards so it reads its own writes while the
+replicas catch up.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework import permissions
+
+PIN_COOKIE_NAME = 'pin_primary'
+# DatabaseCache entries: version counters must be read from the primary
+CACHE_APP_LABEL = 'django_cache'
+
+
+class RoutingState:
+    """Per-request routing flags."""
+
+    def __init__(self, pinned=False):
+        self.use_replicas = False
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def use_replicas():
+    """Allow the current request's reads to go to a replica."""
+    state = _state.get()
+    if state is not None:
+        state.use_replicas = True
+
+
+def use_primary():
+    """Send the current request's reads back to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.use_replicas = False
+
+
+class PrimaryReplicaRouter:
+    """
+    Route reads to a random replica when the current request allows it.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            return 'default'
+        state = _state.get()
+        if state is None or not state.use_replicas or state.pinned:
+            return None
+        if settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == CACHE_APP_LABEL:
+            # Cache writes are not data writes: they must not pin the client
+            return 'default'
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        pool = {'default', *settings.DATABASE_REPLICAS}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive their schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class PrimaryPinningMiddleware:
+    """
+    Reset routing state per request and pin recent writers to the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(pinned=request.COOKIES.get(PIN_COOKIE_NAME) == '1')
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE_NAME, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin sending the reads of safe-method requests to replicas.
+    Authentication and permission checks still run against the primary, so
+    new and revoked tokens take effect without waiting for replication.
+    Actions listed in ``primary_actions`` always read from the primary.
+    """
+    primary_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS and self.action not in self.primary_actions:
+            use_replicas()
@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -68,10 +70,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',  # Métricas Prometheus (/metrics)
     'django.middleware.security.SecurityMiddleware',
+    'mysite.db_router.PrimaryPinningMiddleware',  # Enrutado primario/réplicas
+    'core.object_cache.ObjectCacheMiddleware',  # Caché de objetos por petición
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para servir archivos estáticos
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',  # ETag / 304 para respuestas GET
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -101,6 +107,25 @@ WSGI_APPLICATION = 'mysite.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite en modo producción (varios workers de gunicorn):
+# - WAL: los lectores no bloquean al escritor ni al revés
+# - BEGIN IMMEDIATE: las transacciones de escritura toman el lock al empezar,
+#   en lugar de fallar con "database is locked" al pasar de lectura a escritura
+# - busy_timeout: esperar al lock en vez de fallar inmediatamente
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int)  # ms
+SQLITE_OPTIONS = {
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': SQLITE_BUSY_TIMEOUT / 1000,
+    'init_command': ';'.join([
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}',
+        f"PRAGMA mmap_size={config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int)}",
+        f"PRAGMA cache_size=-{config('SQLITE_CACHE_KB', default=20000, cast=int)}",
+        'PRAGMA temp_store=MEMORY',
+    ]),
+}
+
 # Configuración de base de datos con fallback a SQLite
 if os.environ.get('DATABASE_URL'):
     import dj_database_url
@@ -113,8 +138,64 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': SQLITE_OPTIONS,
+        }
+    }
+
+# Réplicas de lectura: DATABASE_REPLICA_URLS="postgres://...,postgres://..."
+# Las lecturas de peticiones GET de la API van a una réplica (ver mysite/db_router.py)
+DATABASE_REPLICAS = []
+_replica_urls = _split_csv(config('DATABASE_REPLICA_URLS', default=''))
+if _replica_urls:
+    import dj_database_url
+for _index, _url in enumerate(_replica_urls, start=1):
+    _alias = f'replica_{_index}'
+    DATABASES[_alias] = dj_database_url.parse(_url)
+    # En tests, las réplicas apuntan a la base de datos de test principal
+    DATABASES[_alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['mysite.db_router.PrimaryReplicaRouter']
+
+# Segundos que un cliente sigue leyendo del primario tras escribir
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# Caché compartida entre workers: las invalidaciones (contadores de versión de
+# core/cache.py) deben llegar a todos los procesos de gunicorn, así que el
+# backend depende del despliegue y no de DEBUG.
+# - CACHE_BACKEND=redis (por defecto si hay REDIS_URL="redis://host:6379/0")
+# - CACHE_BACKEND=db (por defecto sin REDIS_URL): tabla de la base de datos
+#   (manage.py createcachetable)
+# - CACHE_BACKEND=locmem: memoria de cada proceso, solo para un único proceso
+#   (runserver; es el valor por defecto de manage.py test). core/checks.py avisa
+#   si se combina con WEB_CONCURRENCY > 1
+REDIS_URL = config('REDIS_URL', default='')
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem' if TESTING else 'redis' if REDIS_URL else 'db')
+# Workers de gunicorn (gunicorn.conf.py)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=3, cast=int)
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
         }
     }
+elif CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'CACHE_BACKEND must be redis, db or locmem, not {CACHE_BACKEND!r}')
 
 
 # Password validation
@@ -166,7 +247,23 @@ STATICFILES_FINDERS = [
 ]
 
 # WhiteNoise configuration
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# (Django 5.1+ ignora STATICFILES_STORAGE; el backend se declara en STORAGES)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'mysite.static_storage.CachedCompressedManifestStaticFilesStorage',
+    },
+}
+
+# Las variantes .br/.gz se guardan por hash de contenido fuera de STATIC_ROOT,
+# así collectstatic solo comprime los ficheros que han cambiado
+STATIC_COMPRESSION_CACHE = config('STATIC_COMPRESSION_CACHE', default=str(BASE_DIR / '.static_cache'))
+
+# Sin manifiesto (sin collectstatic) se sirven los nombres sin hash solo en
+# desarrollo y tests; en producción falta el manifiesto = error visible
+STATIC_MANIFEST_OPTIONAL = config('STATIC_MANIFEST_OPTIONAL', default=DEBUG, cast=bool)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -211,12 +308,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'EXCEPTION_HANDLER': 'core.metrics.exception_handler',
 }
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Las portadas se guardan una sola vez por contenido (core/storage.py);
+# su nombre no cambia nunca, así que se pueden cachear indefinidamente
+COVER_MAX_AGE = 60 * 60 * 24 * 365
+# Django solo sirve los ficheros subidos en desarrollo (django.views.static no
+# es apto para producción); en producción MEDIA_URL lo sirve el servidor web o
+# la CDN delante de la app, con la misma caché inmutable para posts/covers/
+SERVE_MEDIA = config('SERVE_MEDIA', default=DEBUG, cast=bool)
+
 # Swagger/OpenAPI Documentation
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -264,4 +370,71 @@ SPECTACULAR_SETTINGS = {
 # Configuración para Docker
 if os.environ.get('DATABASE_URL'):
     import dj_database_url
-    DATABASES['default'] = dj_database_url.parse(os.environ.get('DATABASE_URL'))
\ No newline at end of file
+    DATABASES['default'] = dj_database_url.parse(os.environ.get('DATABASE_URL'))
+
+# Blog público y feeds (RSS / Atom / JSON Feed)
+PUBLIC_SITE_PREFIX = config('PUBLIC_SITE_PREFIX', default='blog/')
+FEED_MAX_ITEMS = config('FEED_MAX_ITEMS', default=20, cast=int)
+FEED_CACHE_TIMEOUT = config('FEED_CACHE_TIMEOUT', default=60 * 60, cast=int)
+FEED_MAX_AGE = config('FEED_MAX_AGE', default=5 * 60, cast=int)
+
+# Sincronización incremental (/api/posts/changes/)
+SYNC_PAGE_SIZE = config('SYNC_PAGE_SIZE', default=100, cast=int)
+SYNC_MAX_PAGE_SIZE = config('SYNC_MAX_PAGE_SIZE', default=1000, cast=int)
+SYNC_SETTLE_SECONDS = config('SYNC_SETTLE_SECONDS', default=2, cast=int)
+# Días que se guardan los tombstones (manage.py prune_tombstones); un cursor más antiguo recibe 410
+SYNC_TOMBSTONE_RETENTION_DAYS = config('SYNC_TOMBSTONE_RETENTION_DAYS', default=90, cast=int)
+
+# Caché de /api/posts/published/ (una sola regeneración concurrente, ver core/cache.py)
+PUBLISHED_CACHE_TIMEOUT = config('PUBLISHED_CACHE_TIMEOUT', default=5 * 60, cast=int)
+
+# Caché de objetos Post/Blog/Tag por id y slug (ver core/object_cache.py)
+OBJECT_CACHE_TIMEOUT = config('OBJECT_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Peticiones agrupadas (/api/batch/)
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=20, cast=int)
+
+# Historial de revisiones: una copia completa del contenido cada N revisiones
+# (el resto son parches), para que reconstruir una versión sea acotado
+POST_REVISION_SNAPSHOT_INTERVAL = config('POST_REVISION_SNAPSHOT_INTERVAL', default=10, cast=int)
+
+# Esquema OpenAPI precalculado (core/schema.py): se regenera solo cuando cambia
+# la versión del código (CODE_VERSION o, si no se define, un hash del código)
+CODE_VERSION = config('CODE_VERSION', default='')
+OPENAPI_SCHEMA_DIR = config('OPENAPI_SCHEMA_DIR', default=str(BASE_DIR / 'openapi'))
+
+# Métricas Prometheus (/metrics): accesible para usuarios staff y para estas
+# IPs o redes (p. ej. el servidor Prometheus). Con gunicorn se agregan los
+# workers a través de PROMETHEUS_MULTIPROC_DIR (ver gunicorn.conf.py)
+METRICS_ALLOWED_IPS = _split_csv(config('METRICS_ALLOWED_IPS', default=''))
+
+# Contadores de lecturas de posts: cada worker acumula en memoria y los suma
+# a la base de datos en una sola sentencia cada N segundos o M posts
+VIEW_COUNT_FLUSH_SECONDS = config('VIEW_COUNT_FLUSH_SECONDS', default=10, cast=int)
+VIEW_COUNT_FLUSH_SIZE = config('VIEW_COUNT_FLUSH_SIZE', default=500, cast=int)
+# Ranking de /api/posts/popular/ (se recalcula cada POPULAR_POSTS_TIMEOUT segundos)
+POPULAR_POSTS_SIZE = config('POPULAR_POSTS_SIZE', default=50, cast=int)
+POPULAR_POSTS_TIMEOUT = config('POPULAR_POSTS_TIMEOUT', default=5 * 60, cast=int)
+
+# Posts relacionados (core/related.py): cuántos se guardan por post y vida
+# media, en días, del peso de un post según su antigüedad
+RELATED_POSTS_COUNT = config('RELATED_POSTS_COUNT', default=5, cast=int)
+RELATED_POSTS_HALF_LIFE_DAYS = config('RELATED_POSTS_HALF_LIFE_DAYS', default=180, cast=int)
+
+# Autocompletado de tags (/api/tags/autocomplete/): índice en memoria por
+# worker; se reconstruye al cambiar los tags o cada N segundos (uso por tag)
+TAG_INDEX_REFRESH_SECONDS = config('TAG_INDEX_REFRESH_SECONDS', default=5 * 60, cast=int)
+
+# Archivo mensual (/api/posts/archive/): se lee de los totales precalculados
+# por blog y mes; la suma de todo el sitio se guarda en caché hasta que cambia
+ARCHIVE_CACHE_TIMEOUT = config('ARCHIVE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Sitemaps (/sitemap.xml): posts por fichero (como máximo 50.000, el límite
+# del protocolo) y duración en caché de cada fichero
+SITEMAP_SIZE = config('SITEMAP_SIZE', default=50000, cast=int)
+SITEMAP_CACHE_TIMEOUT = config('SITEMAP_CACHE_TIMEOUT', default=24 * 60 * 60, cast=int)
+
+# Páginas públicas (core/pages.py): posts por página y duración de los
+# fragmentos de plantilla en caché (la clave incluye updated_at del post)
+PUBLIC_PAGE_SIZE = config('PUBLIC_PAGE_SIZE', default=10, cast=int)
+PAGE_FRAGMENT_TIMEOUT = config('PAGE_FRAGMENT_TIMEOUT', default=24 * 60 * 60, cast=int)
@@ -0,0 +1,97 @@
+"""
+Static files storage with an incremental compression step.
+
+WhiteNoise's CompressedManifestStaticFilesStorage compresses every collected
+file with Brotli and gzip on each ``collectstatic`` run, which for the admin
+and TinyMCE bundles is most of the command's time. This storage keeps the
+compressed variants in ``STATIC_COMPRESSION_CACHE`` keyed by the SHA-256 of
+the source file, together with an index recording which encodings were
+worth keeping; unchanged files are copied from there instead of being
+compressed again. The cache directory lives outside ``STATIC_ROOT`` so it
+can be kept between image builds (a BuildKit cache mount in the Dockerfile).
+"""
+import hashlib
+import json
+import os
+import shutil
+
+from django.conf import settings
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+INDEX_NAME = 'index.json'
+
+
+class CachedCompressedManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """CompressedManifestStaticFilesStorage that reuses earlier compressions."""
+
+    def stored_name(self, name):
+        # Until collectstatic writes the manifest (development, test runs)
+        # serve the unhashed names; in production a missing manifest must fail
+        optional = getattr(settings, 'STATIC_MANIFEST_OPTIONAL', False)
+        if optional and not self.hashed_files and not self.exists(self.manifest_name):
+            return name
+        return super().stored_name(name)
+
+    def compress_files(self, names):
+        cache_dir = getattr(settings, 'STATIC_COMPRESSION_CACHE', None)
+        if not cache_dir:
+            yield from super().compress_files(names)
+            return
+        extensions = getattr(settings, 'WHITENOISE_SKIP_COMPRESS_EXTENSIONS', None)
+        compressor = self.create_compressor(extensions=extensions, quiet=True)
+        # Entries made without Brotli must not be reused once it is installed
+        encodings = 'br,gz' if compressor.use_brotli else 'gz'
+        index = self._load_index(cache_dir)
+
+        for name in names:
+            if not compressor.should_compress(name):
+                continue
+            path = self.path(name)
+            digest = _file_digest(path)
+            key = f'{digest}:{encodings}'
+            suffixes = index.get(key)
+            if suffixes is None or not all(os.path.exists(_cached(cache_dir, digest, s)) for s in suffixes):
+                suffixes = []
+                for compressed_path in compressor.compress(path):
+                    suffix = os.path.splitext(compressed_path)[1]
+                    os.makedirs(os.path.dirname(_cached(cache_dir, digest, suffix)), exist_ok=True)
+                    shutil.copyfile(compressed_path, _cached(cache_dir, digest, suffix))
+                    suffixes.append(suffix)
+                index[key] = suffixes
+            else:
+                stat_result = os.stat(path)
+                for suffix in suffixes:
+                    shutil.copyfile(_cached(cache_dir, digest, suffix), path + suffix)
+                    os.utime(path + suffix, (stat_result.st_atime, stat_result.st_mtime))
+            for suffix in suffixes:
+                yield name, name + suffix
+
+        self._save_index(cache_dir, index)
+
+    @staticmethod
+    def _load_index(cache_dir):
+        try:
+            with open(os.path.join(cache_dir, INDEX_NAME)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_index(cache_dir, index):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = os.path.join(cache_dir, INDEX_NAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, os.path.join(cache_dir, INDEX_NAME))
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cached(cache_dir, digest, suffix):
+    return os.path.join(cache_dir, digest[:2], digest + suffix)
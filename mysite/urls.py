@@ -2,20 +2,50 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
-from core.views import api_root
+from drf_spectacular.views import SpectacularSwaggerView, SpectacularRedocView
+from core.feeds import post_feed
+from core.metrics import metrics_view
+from core.pages import blog_page, post_detail, post_list, tag_page
+from core.schema import CachedSpectacularAPIView
+from core.sitemaps import sitemap_chunk, sitemap_index
+from core.views import api_root, serve_cover
 
 urlpatterns = [
     path('', api_root, name='api-root'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),  # Prometheus (staff o METRICS_ALLOWED_IPS)
     path('api/', include('core.urls')),
+
+    # Feeds RSS / Atom / JSON Feed (feed_format: rss, atom o json)
+    path('feeds/<str:feed_format>/', post_feed, name='feed'),
+    path('feeds/blogs/<int:blog_pk>/<str:feed_format>/', post_feed, name='blog-feed'),
+    path('feeds/tags/<str:tag_name>/<str:feed_format>/', post_feed, name='tag-feed'),
+
+    # Sitemaps de los posts publicados (índice + un fichero por rango de ids)
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-posts-<int:number>.xml', sitemap_chunk, name='sitemap-posts'),
     
     # drf-spectacular URLs
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', CachedSpectacularAPIView.as_view(), name='schema'),
     path('swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
 ]
 
+# Portadas de posts (content-addressed, con cabeceras de caché inmutables),
+# solo en desarrollo: en producción las sirve el servidor web (SERVE_MEDIA)
+if settings.SERVE_MEDIA:
+    urlpatterns += [
+        path(f"{settings.MEDIA_URL.strip('/')}/posts/covers/<path:path>", serve_cover, name='post-cover'),
+    ]
+
+# Páginas públicas renderizadas en el servidor (PUBLIC_SITE_PREFIX, por defecto blog/)
+urlpatterns += [
+    path(settings.PUBLIC_SITE_PREFIX, post_list, name='post_list'),
+    path(f'{settings.PUBLIC_SITE_PREFIX}blogs/<int:pk>/', blog_page, name='blog_page'),
+    path(f'{settings.PUBLIC_SITE_PREFIX}tags/<path:name>/', tag_page, name='tag_page'),
+    path(f'{settings.PUBLIC_SITE_PREFIX}<slug:slug>/', post_detail, name='post_detail'),
+]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file